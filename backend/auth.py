@@ -1,32 +1,234 @@
-"""Auth: password hashing, token creation, and get_current_user dependency."""
+"""Auth: token creation, token cache, and get_current_user dependency.
 
+Two token formats are accepted. Opaque tokens are random strings looked up (and cached) via
+the access_tokens table. Signed tokens (``v1.<claims>.<signature>``) carry user id, username
+and expiry under an HMAC-SHA256 signature and are verified without touching the database;
+revoked ones are rejected through ``token_denylist``. Password hashing lives in
+password_hashing.py.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
 import secrets
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from passlib.context import CryptContext
+from sqlalchemy import delete, event, insert, select, update
 from sqlalchemy.orm import Session
 
+from config import (
+    ACCESS_TOKEN_FORMAT,
+    ACCESS_TOKEN_REFRESH_INTERVAL_SECONDS,
+    ACCESS_TOKEN_TTL_SECONDS,
+    AUTH_CACHE_MAX_ENTRIES,
+    AUTH_CACHE_TTL_SECONDS,
+    TOKEN_DENYLIST_REFRESH_SECONDS,
+    TOKEN_SIGNING_KEY,
+)
 from database import SessionLocal
 from models.access_tokens import AccessToken
+from models.token_revocation import TokenRevocation
 from models.user import User
+from ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer(auto_error=False)
 
+SIGNED_TOKEN_PREFIX = "v1."
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """The authenticated user as seen by request handlers (detached from any session)."""
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    id: int
+    username: str
 
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+# token -> CurrentUser
+token_cache: TTLCache[str, CurrentUser] = TTLCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)
 
 
 def create_token() -> str:
     return secrets.token_urlsafe(32)
 
 
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+if TOKEN_SIGNING_KEY:
+    _signing_key = TOKEN_SIGNING_KEY.encode()
+else:
+    _signing_key = secrets.token_bytes(32)
+    if ACCESS_TOKEN_FORMAT == "signed":
+        logger.warning("TOKEN_SIGNING_KEY is not set; signed tokens are only valid in this process")
+
+
+def _sign(message: str) -> str:
+    return _b64encode(hmac.new(_signing_key, message.encode("ascii"), hashlib.sha256).digest())
+
+
+def create_signed_token(user_id: int, username: str, ttl: float = ACCESS_TOKEN_TTL_SECONDS) -> str:
+    now = int(time.time())
+    claims = {
+        "sub": user_id,
+        "name": username,
+        "iat": now,
+        "exp": now + int(ttl),
+        "jti": secrets.token_hex(16),
+    }
+    body = SIGNED_TOKEN_PREFIX + _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{body}.{_sign(body)}"
+
+
+def verify_signed_token(token: str, now: float | None = None) -> dict | None:
+    """Claims of a well-formed, correctly signed, unexpired token; None otherwise. Does not
+    consult the deny-list."""
+    # Client-supplied; _sign and compare_digest only take ASCII
+    if not token.isascii():
+        return None
+    body, _, signature = token.rpartition(".")
+    if not body.startswith(SIGNED_TOKEN_PREFIX) or not hmac.compare_digest(signature, _sign(body)):
+        return None
+    try:
+        claims = json.loads(_b64decode(body[len(SIGNED_TOKEN_PREFIX) :]))
+    except ValueError:
+        return None
+    if claims.get("exp", 0) <= (time.time() if now is None else now):
+        return None
+    return claims
+
+
+def _epoch(dt: datetime) -> float:
+    return (dt - datetime(1970, 1, 1)).total_seconds()
+
+
+class TokenDenyList:
+    """Revoked signed tokens (by jti) and per-user revocation times, mirrored from the
+    token_revocations table by a background thread every ``refresh_interval`` seconds.
+    Revocations made in this process take effect immediately."""
+
+    def __init__(self, refresh_interval: float = TOKEN_DENYLIST_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self._jtis: set[str] = set()
+        self._users: dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.refreshes = 0
+        self.last_refresh_at: datetime | None = None
+
+    def is_denied(self, claims: dict) -> bool:
+        if claims["jti"] in self._jtis:
+            return True
+        revoked_at = self._users.get(claims["sub"])
+        return revoked_at is not None and claims["iat"] <= revoked_at
+
+    def deny_jti(self, jti: str) -> None:
+        with self._lock:
+            self._jtis.add(jti)
+
+    def deny_user(self, user_id: int, revoked_at: datetime) -> None:
+        ts = _epoch(revoked_at)
+        with self._lock:
+            self._users[user_id] = max(ts, self._users.get(user_id, ts))
+
+    def refresh(self) -> None:
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(
+                    TokenRevocation.jti, TokenRevocation.user_id, TokenRevocation.revoked_at
+                ).where(TokenRevocation.expires_at > now)
+            ).all()
+        finally:
+            db.close()
+        jtis = {r.jti for r in rows if r.jti is not None}
+        users: dict[int, float] = {}
+        for r in rows:
+            if r.jti is None:
+                users[r.user_id] = max(_epoch(r.revoked_at), users.get(r.user_id, 0.0))
+        with self._lock:
+            self._jtis, self._users = jtis, users
+            self.refreshes += 1
+            self.last_refresh_at = now
+
+    def clear(self) -> None:
+        with self._lock:
+            self._jtis, self._users = set(), {}
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Token deny-list refresh failed")
+
+    def start(self) -> None:
+        self.refresh()
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="token-denylist", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "jtis": len(self._jtis),
+                "users": len(self._users),
+                "refresh_interval_s": self.refresh_interval,
+                "refreshes": self.refreshes,
+                "last_refresh_at": self.last_refresh_at.isoformat()
+                if self.last_refresh_at
+                else None,
+            }
+
+
+token_denylist = TokenDenyList()
+
+
+def issue_token(db: Session, user_id: int, username: str) -> str:
+    """Create an access token in ACCESS_TOKEN_FORMAT. Opaque tokens are added to the session
+    (the caller commits)."""
+    if ACCESS_TOKEN_FORMAT == "signed":
+        return create_signed_token(user_id, username)
+    now = datetime.utcnow()
+    token = create_token()
+    db.add(
+        AccessToken(
+            token=token,
+            user_id=user_id,
+            created=now,
+            expires_at=now + timedelta(seconds=ACCESS_TOKEN_TTL_SECONDS),
+            last_used_at=now,
+        )
+    )
+    return token
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -35,10 +237,53 @@ def get_db():
         db.close()
 
 
+def revoke_token(db: Session, token: str) -> None:
+    """Delete an opaque token and drop it from the cache, or deny-list a signed one."""
+    claims = verify_signed_token(token)
+    if claims is not None:
+        db.add(
+            TokenRevocation(
+                jti=claims["jti"],
+                user_id=claims["sub"],
+                expires_at=datetime.utcfromtimestamp(claims["exp"]),
+            )
+        )
+        db.commit()
+        token_denylist.deny_jti(claims["jti"])
+        return
+    db.execute(delete(AccessToken).where(AccessToken.token == token))
+    db.commit()
+    token_cache.pop(token)
+
+
+def invalidate_user(user_id: int) -> int:
+    """Drop every cached token of ``user_id``; returns how many were dropped."""
+    return token_cache.discard_where(lambda _token, user: user.id == user_id)
+
+
+@event.listens_for(AccessToken, "after_delete")
+def _access_token_deleted(_mapper, _connection, target: AccessToken) -> None:
+    token_cache.pop(target.token)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(_mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
+    now = datetime.utcnow()
+    connection.execute(
+        insert(TokenRevocation).values(
+            user_id=target.id,
+            revoked_at=now,
+            expires_at=now + timedelta(seconds=ACCESS_TOKEN_TTL_SECONDS),
+        )
+    )
+    token_denylist.deny_user(target.id, now)
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
     db: Session = Depends(get_db),
-) -> User:
+) -> CurrentUser:
     if not credentials or not credentials.credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -46,18 +291,52 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     token = credentials.credentials
-    access = db.query(AccessToken).filter(AccessToken.token == token).first()
-    if not access or access.user_id is None:
+    if token.startswith(SIGNED_TOKEN_PREFIX):
+        claims = verify_signed_token(token)
+        if claims is None or token_denylist.is_denied(claims):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return CurrentUser(id=claims["sub"], username=claims["name"])
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+    now = datetime.utcnow()
+    row = db.execute(
+        select(User.id, User.username, AccessToken.expires_at, AccessToken.last_used_at)
+        .join(AccessToken, AccessToken.user_id == User.id)
+        .where(AccessToken.token == token, AccessToken.expires_at > now)
+    ).first()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = db.query(User).filter(User.id == access.user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
+    expires_at = row.expires_at
+    refresh_due = now - timedelta(seconds=ACCESS_TOKEN_REFRESH_INTERVAL_SECONDS)
+    if row.last_used_at is None or row.last_used_at < refresh_due:
+        expires_at = now + timedelta(seconds=ACCESS_TOKEN_TTL_SECONDS)
+        db.execute(
+            update(AccessToken)
+            .where(AccessToken.token == token)
+            .values(expires_at=expires_at, last_used_at=now)
         )
+        db.commit()
+    user = CurrentUser(id=row.id, username=row.username)
+    # Never serve a token from the cache past its expiry
+    remaining = (expires_at - now).total_seconds()
+    token_cache.set(token, user, ttl=min(token_cache.ttl, remaining))
     return user
+
+
+def authenticate(credentials: HTTPAuthorizationCredentials | None) -> CurrentUser:
+    """``get_current_user`` with its own short-lived session, for long-lived responses that
+    must not keep a pooled connection checked out."""
+    db = SessionLocal()
+    try:
+        return get_current_user(credentials, db)
+    finally:
+        db.close()
@@ -0,0 +1,203 @@
+"""Roll latency while a burst of users logs in at once.
+
+One player rolls continuously while ``--logins`` concurrent POST /auth/login requests hit the
+app. Roll latency is reported for a quiet baseline window and for the burst, once with bcrypt
+in the dedicated process pool ("process") and once on plain threads ("thread", approximating
+the old behaviour of hashing on FastAPI's threadpool). Runs in-process against a throwaway
+SQLite database unless --database-url is given.
+
+    cd backend
+    python -m benchmarks.login_burst_bench --logins 200 --rounds 10 --output burst.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.transcribe_bench import percentile  # noqa: E402
+
+PASSWORD = "burst-password"
+
+
+def _latency_ms(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50) * 1000,
+        "p95": percentile(values, 95) * 1000,
+        "p99": percentile(values, 99) * 1000,
+        "max": max(values, default=0.0) * 1000,
+    }
+
+
+def _seed_users(count: int) -> None:
+    """Create burst users directly (one shared hash) so setup does not itself take a burst."""
+    from database import SessionLocal
+    from models.user import User
+    from password_hashing import hash_password
+
+    password_hash = hash_password(PASSWORD)
+    db = SessionLocal()
+    try:
+        db.add_all(User(username=f"burst{i}", password_hash=password_hash) for i in range(count))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _roller(client: httpx.AsyncClient, headers: dict, venue_id: int, samples, stop):
+    while not stop.is_set():
+        started = time.perf_counter()
+        r = await client.post(f"/venues/{venue_id}/roll", json={"mode": "normal"}, headers=headers)
+        samples.append(time.perf_counter() - started)
+        if r.status_code != 200 or r.json()["won"] or r.json()["gameOver"]:
+            await client.post(f"/venues/{venue_id}/start_new_race", headers=headers)
+
+
+async def run_mode(client: httpx.AsyncClient, mode: str, logins: int, baseline_s: float) -> dict:
+    import routers.auth as auth_router
+    from password_hashing import PasswordHasher
+
+    hasher = (
+        PasswordHasher()
+        if mode == "process"
+        else PasswordHasher(workers=40, max_pending=10**6, processes=False)
+    )
+    original = auth_router.password_hasher
+    auth_router.password_hasher = hasher
+    try:
+        r = await client.post(
+            "/auth/register", json={"username": f"roller-{mode}", "password": PASSWORD}
+        )
+        headers = {"Authorization": f"Bearer {r.json()['token']}"}
+        venue_id = (await client.get("/venues", headers=headers)).json()[0]["id"]
+        await client.post(f"/venues/{venue_id}/enter", headers=headers)
+
+        baseline: list[float] = []
+        stop = asyncio.Event()
+        roller = asyncio.create_task(_roller(client, headers, venue_id, baseline, stop))
+        await asyncio.sleep(baseline_s)
+        stop.set()
+        await roller
+        burst: list[float] = []
+        stop = asyncio.Event()
+        roller = asyncio.create_task(_roller(client, headers, venue_id, burst, stop))
+
+        async def login(i: int) -> int:
+            r = await client.post(
+                "/auth/login", json={"username": f"burst{i}", "password": PASSWORD}
+            )
+            return r.status_code
+
+        started = time.perf_counter()
+        codes = await asyncio.gather(*(login(i) for i in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await roller
+    finally:
+        auth_router.password_hasher = original
+        hasher.close()
+
+    return {
+        "mode": mode,
+        "logins": logins,
+        "burst_s": elapsed,
+        "logins_per_s": logins / elapsed if elapsed else 0.0,
+        "login_ok": codes.count(200),
+        "login_busy": codes.count(503),
+        "login_errors": sum(c not in (200, 503) for c in codes),
+        "roll_baseline_ms": _latency_ms(baseline),
+        "roll_burst_ms": _latency_ms(burst),
+    }
+
+
+async def run_benchmark(
+    logins: int, modes: list[str], baseline_s: float = 2.0, database_url: str | None = None
+) -> dict:
+    if "main" not in sys.modules:
+        os.environ.setdefault(
+            "DATABASE_URL",
+            database_url or f"sqlite:///{tempfile.mkdtemp(prefix='burst')}/bench.db",
+        )
+    from config import BCRYPT_ROUNDS, DATABASE_URL, RATE_LIMIT_ENABLED
+    from main import app
+    from rate_limit import set_limits_enabled
+
+    # The roller deliberately exceeds the per-user roll limit
+    set_limits_enabled(False)
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    async with httpx.AsyncClient(base_url="http://bench", transport=transport, timeout=None) as c:
+        await c.post("/testability/reset-db")
+        _seed_users(logins)
+        try:
+            for mode in modes:
+                results.append(await run_mode(c, mode, logins, baseline_s))
+        finally:
+            set_limits_enabled(RATE_LIMIT_ENABLED)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+            "database_url": DATABASE_URL,
+        },
+        "modes": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--modes", default="process,thread")
+    parser.add_argument("--baseline-seconds", type=float, default=2.0)
+    parser.add_argument("--rounds", type=int, help="bcrypt cost factor (BCRYPT_ROUNDS)")
+    parser.add_argument("--database-url", help="default: a temporary SQLite file")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument(
+        "--max-p99-ratio",
+        type=float,
+        help="fail if process-mode burst p99 roll latency exceeds baseline p99 by this factor",
+    )
+    args = parser.parse_args(argv)
+    if args.rounds:
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+
+    results = asyncio.run(
+        run_benchmark(
+            args.logins,
+            [m for m in args.modes.split(",") if m],
+            args.baseline_seconds,
+            args.database_url,
+        )
+    )
+    for m in results["modes"]:
+        base, burst = m["roll_baseline_ms"], m["roll_burst_ms"]
+        print(
+            f"{m['mode']:>8}: {m['logins']} logins in {m['burst_s']:.1f}s "
+            f"(ok={m['login_ok']} busy={m['login_busy']} err={m['login_errors']})  "
+            f"roll p50 {base['p50']:.1f} -> {burst['p50']:.1f}ms  "
+            f"p99 {base['p99']:.1f} -> {burst['p99']:.1f}ms"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.max_p99_ratio:
+        for m in results["modes"]:
+            if m["mode"] != "process":
+                continue
+            base, burst = m["roll_baseline_ms"]["p99"], m["roll_burst_ms"]["p99"]
+            if base and burst > base * args.max_p99_ratio:
+                print(f"REGRESSION roll p99 {burst:.1f}ms > {args.max_p99_ratio}x {base:.1f}ms")
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
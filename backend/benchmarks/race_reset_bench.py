@@ -0,0 +1,207 @@
+"""Time POST /venues/{id}/start_new_race for a venue with many participants.
+
+Seeds ``--participants`` players into one venue, marks the round complete directly in the
+database and times ``--repeats`` resets through the API ("set", one UPDATE for the whole
+venue). For comparison it times the same resets done the old way on the same rows ("orm",
+every participant loaded and reset attribute by attribute). Runs in-process against a
+throwaway SQLite database unless --database-url is given.
+
+    cd backend
+    python -m benchmarks.race_reset_bench --participants 10000 --repeats 5 --output reset.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.transcribe_bench import percentile  # noqa: E402
+
+
+def _seed(participants: int) -> tuple[int, str]:
+    """Create the players with bulk inserts and return the venue id and a member's token."""
+    from sqlalchemy import insert, select
+
+    from auth import issue_token
+    from database import SessionLocal
+    from models.user import User
+    from models.venue import Venue, VenueParticipant, VenueRound
+
+    db = SessionLocal()
+    try:
+        venue_id = db.scalars(select(Venue.id)).first()
+        db.execute(
+            insert(User),
+            [{"username": f"racer{i}", "password_hash": "!"} for i in range(participants)],
+        )
+        user_ids = db.scalars(select(User.id).order_by(User.id)).all()
+        db.execute(
+            insert(VenueParticipant), [{"venue_id": venue_id, "user_id": u} for u in user_ids]
+        )
+        db.add(VenueRound(venue_id=venue_id, round_number=1, participant_count=participants))
+        token = issue_token(db, user_ids[0], "racer0")
+        db.commit()
+        return venue_id, token
+    finally:
+        db.close()
+
+
+def _finish_round(venue_id: int) -> None:
+    """Mark every participant won and the current round recorded, without playing it."""
+    from sqlalchemy import update
+
+    from database import SessionLocal
+    from models.venue import Venue, VenueParticipant, VenueRound
+    from racing_engine import TRACK_LENGTH
+
+    now = datetime.now(UTC)
+    db = SessionLocal()
+    try:
+        current = db.get(Venue, venue_id).current_round
+        db.execute(
+            update(VenueParticipant)
+            .where(VenueParticipant.venue_id == venue_id)
+            .values(position=TRACK_LENGTH, won=True, roll_count=12, finished_at=now)
+        )
+        db.execute(
+            update(VenueRound)
+            .where(VenueRound.venue_id == venue_id, VenueRound.round_number == current)
+            .values(completed_at=now, finished_count=VenueRound.participant_count)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _orm_reset(venue_id: int) -> None:
+    """start_new_race before the set-based reset: load every participant, reset each one."""
+    from database import SessionLocal
+    from models.venue import Venue, VenueParticipant, VenueRound
+
+    db = SessionLocal()
+    try:
+        venue = db.get(Venue, venue_id)
+        participants = (
+            db.query(VenueParticipant).filter(VenueParticipant.venue_id == venue_id).all()
+        )
+        new_round = venue.current_round + 1
+        db.add(
+            VenueRound(
+                venue_id=venue_id,
+                round_number=new_round,
+                started_at=datetime.now(UTC),
+                participant_count=len(participants),
+            )
+        )
+        venue.current_round = new_round
+        venue.state_version += 1
+        for p in participants:
+            p.position = 0
+            p.condition = 6
+            p.mode = "normal"
+            p.won = False
+            p.game_over = False
+            p.roll_count = 0
+            p.finished_at = None
+        db.commit()
+    finally:
+        db.close()
+
+
+def _summary_ms(values: list[float]) -> dict:
+    return {
+        "p50": percentile(values, 50) * 1000,
+        "mean": sum(values) / len(values) * 1000 if values else 0.0,
+        "max": max(values, default=0.0) * 1000,
+    }
+
+
+async def run_benchmark(
+    participants: int, repeats: int, modes: list[str], database_url: str | None = None
+) -> dict:
+    if "main" not in sys.modules:
+        os.environ.setdefault(
+            "DATABASE_URL",
+            database_url or f"sqlite:///{tempfile.mkdtemp(prefix='reset')}/bench.db",
+        )
+    from config import DATABASE_URL
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    async with httpx.AsyncClient(base_url="http://bench", transport=transport, timeout=None) as c:
+        await c.post("/testability/reset-db")
+        started = time.perf_counter()
+        venue_id, token = await asyncio.to_thread(_seed, participants)
+        seed_s = time.perf_counter() - started
+        headers = {"Authorization": f"Bearer {token}"}
+        for mode in modes:
+            times, errors = [], 0
+            for _ in range(repeats):
+                await asyncio.to_thread(_finish_round, venue_id)
+                started = time.perf_counter()
+                if mode == "set":
+                    r = await c.post(f"/venues/{venue_id}/start_new_race", headers=headers)
+                    errors += r.status_code != 200
+                else:
+                    await asyncio.to_thread(_orm_reset, venue_id)
+                times.append(time.perf_counter() - started)
+            results.append(
+                {
+                    "mode": mode,
+                    "participants": participants,
+                    "repeats": repeats,
+                    "errors": errors,
+                    "reset_ms": _summary_ms(times),
+                }
+            )
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "database_url": DATABASE_URL,
+            "seed_s": seed_s,
+        },
+        "modes": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--participants", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--modes", default="set,orm")
+    parser.add_argument("--database-url", help="default: a temporary SQLite file")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(
+        run_benchmark(
+            args.participants,
+            args.repeats,
+            [m for m in args.modes.split(",") if m],
+            args.database_url,
+        )
+    )
+    for m in results["modes"]:
+        ms = m["reset_ms"]
+        print(
+            f"{m['mode']:>4}: {m['participants']} participants, {m['repeats']} resets "
+            f"(err={m['errors']})  p50 {ms['p50']:.1f}ms  mean {ms['mean']:.1f}ms  "
+            f"max {ms['max']:.1f}ms"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
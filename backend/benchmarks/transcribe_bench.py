@@ -0,0 +1,250 @@
+"""Throughput/latency benchmark for POST /transcribe against a latency-simulating fake backend.
+
+Drives the app in-process (httpx ASGI transport, so no server is needed) or a running server
+with --url. Reports throughput, p50/p95/p99 latency, peak RSS and event-loop lag per
+(audio length, concurrency) scenario, writes JSON, and optionally compares with a previous
+run, exiting non-zero on regression.
+
+    cd backend
+    python -m benchmarks.transcribe_bench --audio-seconds 10,60 --concurrency 1,8,32 \\
+        --requests 64 --latency per_second:0.01,0.2 --output bench.json
+    python -m benchmarks.transcribe_bench ... --baseline bench.json --max-regression 0.15
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import wave
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def synthetic_wav(seconds: float, rate: int = 16000) -> bytes:
+    """Speech-like 16-bit mono WAV: 2.5 s tone bursts separated by 0.5 s of silence."""
+    t = np.arange(int(seconds * rate)) / rate
+    signal = 0.4 * np.sin(2 * np.pi * 220 * t) * ((t % 3.0) < 2.5)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes((signal * 32767).astype("<i2").tobytes())
+    return buf.getvalue()
+
+
+def unique_variant(wav: bytes) -> bytes:
+    """Randomize the first four samples so every upload misses the transcript cache."""
+    return wav[:44] + os.urandom(8) + wav[52:]
+
+
+def percentile(values: list[float], p: float) -> float:
+    return float(np.percentile(values, p)) if values else 0.0
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+async def _sample_loop_lag(lags: list[float], stop: asyncio.Event, interval: float = 0.01):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, audio_seconds: float, concurrency: int, requests: int
+) -> dict:
+    wav = synthetic_wav(audio_seconds)
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            body = unique_variant(wav)
+            started = time.perf_counter()
+            try:
+                r = await client.post(
+                    "/transcribe", files={"file": ("bench.wav", body, "audio/wav")}
+                )
+                ok = r.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    lags: list[float] = []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_loop_lag(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+    return {
+        "audio_seconds": audio_seconds,
+        "audio_bytes": len(wav),
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": max(latencies, default=0.0) * 1000,
+        },
+        "loop_lag_ms": {
+            "p99": percentile(lags, 99) * 1000,
+            "max": max(lags, default=0.0) * 1000,
+        },
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(
+    audio_seconds: list[float],
+    concurrency: list[int],
+    requests: int,
+    latency: str,
+    url: str | None = None,
+) -> dict:
+    """Run every (audio_seconds, concurrency) scenario and return the results document."""
+    if url:
+        base_url = url
+        client_kwargs = {}
+    else:
+        from config import RATE_LIMIT_ENABLED
+        from database import Base, engine
+        from main import app
+        from rate_limit import set_limits_enabled
+        from transcription.backends import FakeBackend, set_backend_override
+
+        Base.metadata.create_all(bind=engine)
+        set_backend_override(FakeBackend(latency=latency))
+        # Measure the pipeline, not per-IP admission control
+        set_limits_enabled(False)
+        base_url = "http://bench"
+        client_kwargs = {"transport": httpx.ASGITransport(app=app)}
+
+    scenarios = []
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=None, **client_kwargs) as client:
+            for seconds in audio_seconds:
+                for c in concurrency:
+                    scenarios.append(await run_scenario(client, seconds, c, requests))
+    finally:
+        if not url:
+            set_backend_override(None)
+            set_limits_enabled(RATE_LIMIT_ENABLED)
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "target": url or "in-process",
+            "latency": latency,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Regressions of throughput or p99 latency beyond ``max_regression`` (a fraction)."""
+    base = {(s["audio_seconds"], s["concurrency"]): s for s in baseline.get("scenarios", [])}
+    problems = []
+    for s in current["scenarios"]:
+        b = base.get((s["audio_seconds"], s["concurrency"]))
+        if b is None:
+            continue
+        label = f"audio={s['audio_seconds']}s concurrency={s['concurrency']}"
+        if s["throughput_rps"] < b["throughput_rps"] * (1 - max_regression):
+            problems.append(
+                f"{label}: throughput {s['throughput_rps']:.2f} < baseline "
+                f"{b['throughput_rps']:.2f} rps"
+            )
+        if s["latency_ms"]["p99"] > b["latency_ms"]["p99"] * (1 + max_regression):
+            problems.append(
+                f"{label}: p99 {s['latency_ms']['p99']:.1f} > baseline "
+                f"{b['latency_ms']['p99']:.1f} ms"
+            )
+        if s["errors"] > b["errors"]:
+            problems.append(f"{label}: {s['errors']} errors (baseline {b['errors']})")
+    return problems
+
+
+def _csv(kind):
+    return lambda value: [kind(v) for v in value.split(",") if v]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--audio-seconds", type=_csv(float), default=[10.0, 60.0])
+    parser.add_argument("--concurrency", type=_csv(int), default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=64, help="requests per scenario")
+    parser.add_argument(
+        "--latency",
+        default="per_second:0.01,0.2",
+        help="fake backend latency spec (in-process mode only)",
+    )
+    parser.add_argument("--url", help="benchmark a running server instead of in-process")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(
+        run_benchmark(args.audio_seconds, args.concurrency, args.requests, args.latency, args.url)
+    )
+    for s in results["scenarios"]:
+        print(
+            f"audio={s['audio_seconds']:>6.1f}s c={s['concurrency']:>3} "
+            f"{s['throughput_rps']:8.2f} rps  p50={s['latency_ms']['p50']:8.1f}ms "
+            f"p95={s['latency_ms']['p95']:8.1f}ms p99={s['latency_ms']['p99']:8.1f}ms "
+            f"lag_max={s['loop_lag_ms']['max']:6.1f}ms rss={s['peak_rss_mb']:.0f}MB "
+            f"errors={s['errors']}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        problems = compare(results, json.loads(args.baseline.read_text()), args.max_regression)
+        for p in problems:
+            print(f"REGRESSION {p}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
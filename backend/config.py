@@ -10,9 +10,149 @@ load_dotenv(_backend_dir / ".env")
 # OpenAI Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# One process-wide OpenAI client: HTTP connection pool limits, keep-alive and timeouts, plus
+# jittered exponential retry (base * 2**attempt, capped) on 429, 5xx and connection errors.
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+OPENAI_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY_SECONDS", "120"))
+OPENAI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "10"))
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "600"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "4"))
+OPENAI_RETRY_BASE_DELAY_SECONDS = float(os.getenv("OPENAI_RETRY_BASE_DELAY_SECONDS", "0.5"))
+OPENAI_RETRY_MAX_DELAY_SECONDS = float(os.getenv("OPENAI_RETRY_MAX_DELAY_SECONDS", "30"))
+
 # Database: default to backend/meeting_plunger.db so path is stable regardless of cwd
 _default_db = f"sqlite:///{_backend_dir / 'meeting_plunger.db'}"
 DATABASE_URL = os.getenv("DATABASE_URL", _default_db)
 
+# Transcription backend: "openai" (default) or "fake" (offline, deterministic output derived
+# from the audio hash). FAKE_TRANSCRIBE_LATENCY is e.g. "fixed:0.5", "uniform:0.2,1.5",
+# "normal:0.8,0.2", "lognormal:-0.5,0.4" or "per_second:0.05[,base]".
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "openai")
+FAKE_TRANSCRIBE_LATENCY = os.getenv("FAKE_TRANSCRIBE_LATENCY", "fixed:0")
+
+# Transcription uploads: streamed into a spooled temp file, kept in memory up to
+# TRANSCRIBE_SPOOL_MAX_MEMORY bytes and rolled over to disk beyond that.
+TRANSCRIBE_UPLOAD_CHUNK_SIZE = int(os.getenv("TRANSCRIBE_UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+TRANSCRIBE_SPOOL_MAX_MEMORY = int(os.getenv("TRANSCRIBE_SPOOL_MAX_MEMORY", str(4 * 1024 * 1024)))
+TRANSCRIBE_MAX_UPLOAD_BYTES = int(os.getenv("TRANSCRIBE_MAX_UPLOAD_BYTES", str(500 * 1024 * 1024)))
+
+# Blocking transcription calls run in a dedicated pool of this many threads, so at most
+# this many upstream calls are in flight per process and the event loop is never blocked.
+TRANSCRIBE_MAX_CONCURRENCY = int(os.getenv("TRANSCRIBE_MAX_CONCURRENCY", "4"))
+
+# Long recordings are split into segments of at most TRANSCRIBE_MAX_SEGMENT_SECONDS, cut in
+# the longest silence (below TRANSCRIBE_SILENCE_THRESHOLD_DB dBFS) found within the last
+# TRANSCRIBE_SILENCE_SEARCH_SECONDS before the limit. Forced cuts overlap the next segment by
+# TRANSCRIBE_SEGMENT_OVERLAP_SECONDS. Up to TRANSCRIBE_SEGMENT_PARALLELISM segments of one
+# request are transcribed at a time.
+TRANSCRIBE_MAX_SEGMENT_SECONDS = float(os.getenv("TRANSCRIBE_MAX_SEGMENT_SECONDS", "300"))
+TRANSCRIBE_SEGMENT_OVERLAP_SECONDS = float(os.getenv("TRANSCRIBE_SEGMENT_OVERLAP_SECONDS", "1.0"))
+TRANSCRIBE_SILENCE_SEARCH_SECONDS = float(os.getenv("TRANSCRIBE_SILENCE_SEARCH_SECONDS", "30"))
+TRANSCRIBE_SILENCE_THRESHOLD_DB = float(os.getenv("TRANSCRIBE_SILENCE_THRESHOLD_DB", "-40"))
+TRANSCRIBE_SEGMENT_PARALLELISM = int(os.getenv("TRANSCRIBE_SEGMENT_PARALLELISM", "4"))
+
+# PCM WAV uploads are downmixed to mono, downsampled to TRANSCRIBE_TARGET_SAMPLE_RATE and
+# trimmed of leading/trailing silence (keeping TRANSCRIBE_TRIM_PADDING_SECONDS) before being
+# sent upstream. TRANSCRIBE_PREPROCESS is the default; requests can override it.
+TRANSCRIBE_PREPROCESS = os.getenv("TRANSCRIBE_PREPROCESS", "true").lower() == "true"
+TRANSCRIBE_TARGET_SAMPLE_RATE = int(os.getenv("TRANSCRIBE_TARGET_SAMPLE_RATE", "16000"))
+TRANSCRIBE_TRIM_PADDING_SECONDS = float(os.getenv("TRANSCRIBE_TRIM_PADDING_SECONDS", "0.25"))
+
+# Transcript cache keyed by (audio SHA-256, model): an in-process LRU tier of
+# TRANSCRIPT_CACHE_MEMORY_ENTRIES plus a database tier capped at TRANSCRIPT_CACHE_MAX_ENTRIES.
+# Entries older than TRANSCRIPT_CACHE_TTL_SECONDS are ignored and evicted. The database tier
+# is swept every TRANSCRIPT_CACHE_EVICT_EVERY stores, so it can run that many rows over the cap.
+TRANSCRIPT_CACHE_ENABLED = os.getenv("TRANSCRIPT_CACHE_ENABLED", "true").lower() == "true"
+TRANSCRIPT_CACHE_MEMORY_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MEMORY_ENTRIES", "256"))
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "10000"))
+TRANSCRIPT_CACHE_TTL_SECONDS = float(os.getenv("TRANSCRIPT_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+TRANSCRIPT_CACHE_EVICT_EVERY = int(os.getenv("TRANSCRIPT_CACHE_EVICT_EVERY", "100"))
+
+# Asynchronous transcription jobs: uploaded audio is kept under TRANSCRIPTION_JOBS_DIR until
+# the job finishes, and TRANSCRIPTION_JOB_WORKERS jobs are processed in parallel. A job still
+# running after TRANSCRIPTION_JOB_MAX_ATTEMPTS process restarts is marked failed.
+TRANSCRIPTION_JOBS_DIR = Path(
+    os.getenv("TRANSCRIPTION_JOBS_DIR", str(_backend_dir / "transcription_jobs"))
+)
+TRANSCRIPTION_JOB_WORKERS = int(os.getenv("TRANSCRIPTION_JOB_WORKERS", "2"))
+TRANSCRIPTION_JOB_MAX_ATTEMPTS = int(os.getenv("TRANSCRIPTION_JOB_MAX_ATTEMPTS", "3"))
+
+# Bearer token -> user lookups are cached in-process for AUTH_CACHE_TTL_SECONDS. Logout and
+# deletions in this process invalidate immediately; other workers notice within the TTL.
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+
+# Access tokens expire ACCESS_TOKEN_TTL_SECONDS after their last use (sliding expiry; the
+# expiry is pushed forward at most once per ACCESS_TOKEN_REFRESH_INTERVAL_SECONDS). Expired
+# rows are deleted every TOKEN_SWEEP_INTERVAL_SECONDS in batches of TOKEN_SWEEP_BATCH_SIZE,
+# each in its own short transaction.
+ACCESS_TOKEN_TTL_SECONDS = float(os.getenv("ACCESS_TOKEN_TTL_SECONDS", str(14 * 24 * 3600)))
+ACCESS_TOKEN_REFRESH_INTERVAL_SECONDS = float(
+    os.getenv("ACCESS_TOKEN_REFRESH_INTERVAL_SECONDS", "3600")
+)
+TOKEN_SWEEP_INTERVAL_SECONDS = float(os.getenv("TOKEN_SWEEP_INTERVAL_SECONDS", "600"))
+TOKEN_SWEEP_BATCH_SIZE = int(os.getenv("TOKEN_SWEEP_BATCH_SIZE", "500"))
+
+# ACCESS_TOKEN_FORMAT selects what login/register issue: "opaque" (random string looked up in
+# access_tokens) or "signed" (HMAC-SHA256 over user id, username and expiry, verified without
+# the database). Both formats are accepted either way. Signed tokens do not slide; they are
+# revoked through a deny-list reloaded from token_revocations every
+# TOKEN_DENYLIST_REFRESH_SECONDS. Set TOKEN_SIGNING_KEY to the same secret on every instance;
+# without it each process signs with a random key.
+ACCESS_TOKEN_FORMAT = os.getenv("ACCESS_TOKEN_FORMAT", "opaque")
+TOKEN_SIGNING_KEY = os.getenv("TOKEN_SIGNING_KEY", "")
+TOKEN_DENYLIST_REFRESH_SECONDS = float(os.getenv("TOKEN_DENYLIST_REFRESH_SECONDS", "30"))
+
+# Per-process token-bucket rate limits, "COUNT/SECONDS": login per (client IP, username),
+# register and transcribe per client IP, roll per user. Set RATE_LIMIT_TRUST_PROXY=true behind
+# a reverse proxy so the client IP is taken from X-Forwarded-For.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_LOGIN = os.getenv("RATE_LIMIT_LOGIN", "10/60")
+RATE_LIMIT_REGISTER = os.getenv("RATE_LIMIT_REGISTER", "20/60")
+RATE_LIMIT_TRANSCRIBE = os.getenv("RATE_LIMIT_TRANSCRIBE", "30/60")
+RATE_LIMIT_ROLL = os.getenv("RATE_LIMIT_ROLL", "60/10")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+
+# GET /venues/{id}/events (Server-Sent Events): a subscriber more than VENUE_EVENTS_QUEUE_SIZE
+# events behind is disconnected, and an idle stream gets a comment every
+# VENUE_EVENTS_KEEPALIVE_SECONDS so proxies keep it open.
+VENUE_EVENTS_QUEUE_SIZE = int(os.getenv("VENUE_EVENTS_QUEUE_SIZE", "256"))
+VENUE_EVENTS_KEEPALIVE_SECONDS = float(os.getenv("VENUE_EVENTS_KEEPALIVE_SECONDS", "15"))
+
+# Opt-in in-memory venue engine: rolls are applied to participant state held in this process
+# and written to the database every VENUE_ENGINE_FLUSH_INTERVAL_SECONDS. Each roll is also
+# appended to VENUE_ENGINE_JOURNAL_PATH, which is replayed into the database on startup, so a
+# crashed process loses no rolls; set it empty to accept losing up to one flush interval.
+# Only use it with a single backend process.
+VENUE_ENGINE_ENABLED = os.getenv("VENUE_ENGINE_ENABLED", "false").lower() == "true"
+VENUE_ENGINE_FLUSH_INTERVAL_SECONDS = float(os.getenv("VENUE_ENGINE_FLUSH_INTERVAL_SECONDS", "1"))
+VENUE_ENGINE_JOURNAL_PATH = os.getenv(
+    "VENUE_ENGINE_JOURNAL_PATH", str(_backend_dir / "venue_engine.journal")
+)
+
+# Password hashing runs in a dedicated pool of PASSWORD_HASH_WORKERS processes. At most
+# PASSWORD_HASH_MAX_PENDING hashes may be queued or running; beyond that, or when a hash takes
+# longer than PASSWORD_HASH_TIMEOUT_SECONDS, register/login answer 503. Existing hashes with a
+# different BCRYPT_ROUNDS cost are upgraded on the next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) // 2))))
+)
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+PASSWORD_HASH_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "10"))
+
+# Bulk user provisioning (POST /admin/users/bulk with X-Provisioning-Key, or manage.py
+# provision-users). The endpoint is disabled while PROVISIONING_API_KEY is empty. Passwords are
+# hashed on PROVISIONING_HASH_WORKERS processes with PROVISIONING_BCRYPT_ROUNDS (a lower cost
+# speeds up large imports; the hash is upgraded to BCRYPT_ROUNDS at the user's first login)
+# and users are inserted PROVISIONING_BATCH_SIZE rows per statement.
+PROVISIONING_API_KEY = os.getenv("PROVISIONING_API_KEY", "")
+PROVISIONING_HASH_WORKERS = int(os.getenv("PROVISIONING_HASH_WORKERS", str(os.cpu_count() or 1)))
+PROVISIONING_BCRYPT_ROUNDS = int(os.getenv("PROVISIONING_BCRYPT_ROUNDS", str(BCRYPT_ROUNDS)))
+PROVISIONING_BATCH_SIZE = int(os.getenv("PROVISIONING_BATCH_SIZE", "1000"))
+PROVISIONING_MAX_USERS = int(os.getenv("PROVISIONING_MAX_USERS", "20000"))
+
 # Note: OPENAI_API_KEY validation is deferred to runtime when actually needed.
 # This allows importing the module (e.g., for OpenAPI schema generation) without requiring the key.
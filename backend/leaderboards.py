@@ -0,0 +1,160 @@
+"""Cross-round leaderboards per venue and across all venues.
+
+``record_results`` folds a completed round into ``venue_leaderboard`` and
+``player_leaderboard`` with one upsert per table, inside the transaction that records the
+round's results, so the totals always agree with ``venue_round_results``. The upserts add and
+take minimums in SQL instead of reading the rows first, so rounds completing at the same time
+in different venues cannot overwrite each other's totals. SQLite and PostgreSQL use
+``INSERT ... ON CONFLICT``; other databases update the existing row in SQL and insert when
+there was none. ``rebuild`` recomputes both tables from ``venue_round_results``.
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models.leaderboard import PlayerLeaderboardEntry, VenueLeaderboardEntry
+from models.venue import VenueRoundResult
+
+_TOTALS = (
+    "username",
+    "rounds_played",
+    "wins",
+    "total_roll_count",
+    "best_roll_count",
+    "best_duration_seconds",
+    "updated_at",
+)
+
+
+_UPSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def _min_ignoring_null(current, new):
+    # Spelled out: SQLite's min() and PostgreSQL's LEAST() disagree about NULLs
+    return case(
+        (current.is_(None), new),
+        (new.is_(None), current),
+        (new < current, new),
+        else_=current,
+    )
+
+
+def _merged(table, new) -> dict:
+    """SET clause folding one round's totals (``new``) into an existing row."""
+    return {
+        "username": new.username,
+        "rounds_played": table.c.rounds_played + new.rounds_played,
+        "wins": table.c.wins + new.wins,
+        "total_roll_count": table.c.total_roll_count + new.total_roll_count,
+        "best_roll_count": _min_ignoring_null(table.c.best_roll_count, new.best_roll_count),
+        "best_duration_seconds": _min_ignoring_null(
+            table.c.best_duration_seconds, new.best_duration_seconds
+        ),
+        "updated_at": new.updated_at,
+    }
+
+
+def _add_totals(db: Session, model, keys: list[str], rows: list[dict]) -> None:
+    table = model.__table__
+    upsert = _UPSERTS.get(db.get_bind().dialect.name)
+    if upsert is not None:
+        stmt = upsert(table)
+        stmt = stmt.on_conflict_do_update(index_elements=keys, set_=_merged(table, stmt.excluded))
+        db.execute(stmt, rows)
+        return
+    for row in rows:
+        new = SimpleNamespace(**{c: literal(row[c], table.c[c].type) for c in _TOTALS})
+        matched = db.execute(
+            update(table).where(*(table.c[k] == row[k] for k in keys)).values(_merged(table, new))
+        ).rowcount
+        if not matched:
+            db.execute(insert(table).values(row))
+
+
+def record_results(db: Session, results: list[VenueRoundResult]) -> None:
+    """Add one round's results to both leaderboards; the caller commits."""
+    if not results:
+        return
+    now = datetime.utcnow()
+    player_rows = [
+        {
+            "user_id": r.user_id,
+            "username": r.username,
+            "rounds_played": 1,
+            "wins": int(r.won),
+            "total_roll_count": r.roll_count,
+            "best_roll_count": r.roll_count if r.won else None,
+            "best_duration_seconds": r.duration_seconds if r.won else None,
+            "updated_at": now,
+        }
+        for r in results
+    ]
+    venue_rows = [
+        {"venue_id": r.venue_id, **row} for r, row in zip(results, player_rows, strict=True)
+    ]
+    _add_totals(db, VenueLeaderboardEntry, ["venue_id", "user_id"], venue_rows)
+    _add_totals(db, PlayerLeaderboardEntry, ["user_id"], player_rows)
+
+
+def _aggregate(*keys):
+    r = VenueRoundResult
+    return select(
+        *keys,
+        func.max(r.username),
+        func.count(),
+        func.sum(case((r.won, 1), else_=0)),
+        func.sum(r.roll_count),
+        # min() skips the NULLs that lost rounds produce here
+        func.min(case((r.won, r.roll_count))),
+        func.min(case((r.won, r.duration_seconds))),
+        literal(datetime.utcnow()),
+    ).group_by(*keys)
+
+
+def rebuild(db: Session) -> tuple[int, int]:
+    """Recompute both leaderboards from every recorded round. Returns the number of venue and
+    player entries written."""
+    r = VenueRoundResult
+    db.execute(delete(VenueLeaderboardEntry))
+    db.execute(delete(PlayerLeaderboardEntry))
+    db.execute(
+        insert(VenueLeaderboardEntry).from_select(
+            ["venue_id", "user_id", *_TOTALS], _aggregate(r.venue_id, r.user_id)
+        )
+    )
+    db.execute(
+        insert(PlayerLeaderboardEntry).from_select(["user_id", *_TOTALS], _aggregate(r.user_id))
+    )
+    db.commit()
+    return (
+        db.scalar(select(func.count()).select_from(VenueLeaderboardEntry)),
+        db.scalar(select(func.count()).select_from(PlayerLeaderboardEntry)),
+    )
+
+
+def _ranked(model):
+    return (model.wins.desc(), model.best_roll_count.asc(), model.user_id.asc())
+
+
+def top_in_venue(db: Session, venue_id: int, limit: int) -> list[VenueLeaderboardEntry]:
+    return list(
+        db.scalars(
+            select(VenueLeaderboardEntry)
+            .where(VenueLeaderboardEntry.venue_id == venue_id)
+            .order_by(*_ranked(VenueLeaderboardEntry))
+            .limit(limit)
+        )
+    )
+
+
+def top_players(db: Session, limit: int) -> list[PlayerLeaderboardEntry]:
+    return list(
+        db.scalars(
+            select(PlayerLeaderboardEntry).order_by(*_ranked(PlayerLeaderboardEntry)).limit(limit)
+        )
+    )
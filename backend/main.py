@@ -1,29 +1,63 @@
-from fastapi import FastAPI, File, UploadFile
+import json
+import logging
+
+from fastapi import Depends, FastAPI, File, HTTPException, Query, UploadFile, status
 from fastapi.middleware.cors import CORSMiddleware
-from openai import OpenAI
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from config import OPENAI_API_KEY
+from auth import token_cache, token_denylist
 from database import Base, engine, SessionLocal
 from models.venue import Venue
+from password_hashing import password_hasher
+from rate_limit import limit_by_ip, limiter_stats, reset_limiters, transcribe_limiter
+from routers.admin import router as admin_router
 from routers.auth import router as auth_router
+from routers.leaderboards import router as leaderboards_router
+from routers.transcriptions import router as transcriptions_router
+from routers.venues import recount_rounds
 from routers.venues import router as venues_router
+from token_sweeper import token_sweeper
+from transcription.backends import (
+    StaticBackend,
+    TranscriptionBackend,
+    get_backend,
+    set_backend_override,
+)
+from transcription.cache import transcript_cache
+from transcription.chunking import iter_chunked, stitch_texts
+from transcription.executor import transcription_executor
+from transcription.ingest import (
+    SpooledAudio,
+    UploadSizeLimitMiddleware,
+    UploadTooLargeError,
+    spool_upload,
+)
+from transcription.jobs import job_pool
+from transcription.openai_client import openai_clients
+from transcription.pipeline import (
+    cached_transcript,
+    preprocessed,
+    store_transcript,
+    transcribe_audio,
+)
+from venue_engine import venue_engine
+from venue_events import venue_events
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Meeting Plunger API")
 app.include_router(auth_router)
 app.include_router(venues_router)
-
-
-def _get_openai_client():
-    """Lazy init so app can start without OPENAI_API_KEY (e.g. for auth/racing only)."""
-    if not OPENAI_API_KEY:
-        raise ValueError("OPENAI_API_KEY is not set; required for transcription")
-    return OpenAI(api_key=OPENAI_API_KEY)
+app.include_router(leaderboards_router)
+app.include_router(transcriptions_router)
+app.include_router(admin_router)
 
 
 @app.on_event("startup")
 def startup():
-    """Ensure database schema exists and default venue exists."""
+    """Ensure database schema and default venue exist; resume pending transcription jobs,
+    replay the venue engine journal and start the background workers."""
     Base.metadata.create_all(bind=engine)
     db = SessionLocal()
     try:
@@ -32,15 +66,33 @@ def startup():
             db.commit()
     finally:
         db.close()
+    job_pool.resume()
+    token_sweeper.start()
+    token_denylist.start()
+    recount_rounds(venue_engine.start())
 
 
-# Testability: Mock control
+@app.on_event("shutdown")
+def shutdown():
+    """Release the pooled upstream HTTP connections and background workers."""
+    openai_clients.close()
+    password_hasher.close()
+    token_sweeper.stop()
+    token_denylist.stop()
+    venue_engine.stop()
+    venue_events.close()
+
+
+# Testability: Mock control (installs a fixed-transcript backend over the configured one)
 class MockConfig(BaseModel):
     enabled: bool
     transcript: str = ""
 
 
-mock_config = MockConfig(enabled=False)
+# Refuse oversized uploads before Starlette buffers them
+app.add_middleware(
+    UploadSizeLimitMiddleware, paths=("/transcribe", "/transcribe/stream", "/transcriptions")
+)
 
 # Configure CORS for local development (Vite frontend on 3000)
 app.add_middleware(
@@ -52,6 +104,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 
@@ -65,34 +118,118 @@ async def health_check():
     return {"status": "healthy"}
 
 
-@app.post("/transcribe")
-async def transcribe(file: UploadFile = File(...)):  # noqa: B008
-    """Transcribe audio file using OpenAI API."""
-    # Check if mock is enabled
-    if mock_config.enabled:
-        return {"transcript": mock_config.transcript}
+async def _spool_or_413(file: UploadFile) -> SpooledAudio:
+    # Stream the upload into a bounded spooled temp file instead of reading it all into memory
+    try:
+        return await spool_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        ) from e
+
+
+PREPROCESS_QUERY = Query(
+    None, description="Downmix/resample/trim WAV input before transcription (server default)"
+)
+
+
+@app.post("/transcribe", dependencies=[Depends(limit_by_ip(transcribe_limiter))])
+async def transcribe(
+    file: UploadFile = File(...),  # noqa: B008
+    preprocess: bool | None = PREPROCESS_QUERY,
+):
+    """Transcribe audio file using the configured backend (OpenAI by default)."""
+    backend = get_backend()
+    audio = await _spool_or_413(file)
+    try:
+        text = await transcribe_audio(backend, audio, preprocess)
+    finally:
+        audio.close()
+
+    return {"transcript": text}
 
-    # Read the uploaded file content
-    audio_content = await file.read()
 
-    # Create a temporary file-like object for OpenAI API
-    audio_file = (file.filename, audio_content, file.content_type)
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
-    # Call OpenAI Transcription API (client created only when needed)
-    client = _get_openai_client()
-    transcript = client.audio.transcriptions.create(
-        model="gpt-4o-mini-transcribe", file=audio_file
+
+async def _transcript_events(
+    backend: TranscriptionBackend, audio: SpooledAudio, preprocess: bool | None
+):
+    """SSE stream: one ``segment`` event per finished segment (completion order), then
+    ``done`` with the stitched transcript, or ``error``. Offsets refer to the original upload."""
+    try:
+        text = await cached_transcript(backend, audio)
+        if text is None:
+            upstream, offset = await preprocessed(audio, preprocess)
+            texts: dict[int, str] = {}
+            count = 0
+            try:
+                async for seg, seg_text, total in iter_chunked(upstream, backend.transcribe):
+                    texts[seg.index] = seg_text
+                    count = total
+                    yield _sse(
+                        "segment",
+                        {
+                            "index": seg.index,
+                            "segment_count": total,
+                            "start": seg.start + offset,
+                            "end": seg.end + offset if seg.end is not None else None,
+                            "text": seg_text,
+                        },
+                    )
+            finally:
+                if upstream is not audio:
+                    upstream.close()
+            text = texts[0] if count == 1 else stitch_texts([texts[i] for i in range(count)])
+            await store_transcript(backend, audio, text)
+        yield _sse("done", {"transcript": text})
+    except Exception as e:
+        logger.exception("Streaming transcription failed")
+        yield _sse("error", {"detail": str(e) or type(e).__name__})
+    finally:
+        audio.close()
+
+
+@app.post("/transcribe/stream", dependencies=[Depends(limit_by_ip(transcribe_limiter))])
+async def transcribe_stream(
+    file: UploadFile = File(...),  # noqa: B008
+    preprocess: bool | None = PREPROCESS_QUERY,
+):
+    """Transcribe audio, streaming partial transcripts as Server-Sent Events."""
+    backend = get_backend()
+    audio = await _spool_or_413(file)
+    return StreamingResponse(
+        _transcript_events(backend, audio, preprocess),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    return {"transcript": transcript.text}
+
+@app.get("/metrics")
+async def metrics():
+    """Process-local counters for the transcription pipeline, auth and rate limits."""
+    return {
+        "transcription_backend": get_backend().name,
+        "transcript_cache": transcript_cache.stats(),
+        "transcription_executor": transcription_executor.stats(),
+        "transcription_jobs": job_pool.stats(),
+        "openai_client": openai_clients.stats(),
+        "auth_cache": token_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "token_sweeper": token_sweeper.stats(),
+        "token_denylist": token_denylist.stats(),
+        "rate_limits": limiter_stats(),
+        "venue_engine": venue_engine.stats(),
+        "venue_events": venue_events.stats(),
+    }
 
 
 @app.post("/testability/mock")
 async def set_mock(config: MockConfig):
     """Testability endpoint: Configure mocked responses."""
-    global mock_config
-    mock_config = config
-    return {"status": "ok", "mock_enabled": mock_config.enabled}
+    set_backend_override(StaticBackend(config.transcript) if config.enabled else None)
+    return {"status": "ok", "mock_enabled": config.enabled}
 
 
 @app.post("/testability/reset-db")
@@ -100,6 +237,11 @@ async def reset_db():
     """Testability endpoint: Reset database (drop and recreate all tables)."""
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    transcript_cache.clear_memory()
+    token_cache.clear()
+    token_denylist.clear()
+    reset_limiters()
+    venue_engine.clear()
     db = SessionLocal()
     try:
         if db.query(Venue).count() == 0:
@@ -0,0 +1,80 @@
+"""Operational commands.
+
+cd backend
+python manage.py provision-users cohort.csv
+python manage.py provision-users cohort.json --rounds 10 --workers 8
+python manage.py rebuild-leaderboards
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import models  # noqa: F401  (registers every table on Base.metadata)
+from database import Base, engine
+
+MAX_CONFLICTS_SHOWN = 20
+
+
+def provision_users_command(args: argparse.Namespace) -> int:
+    from provisioning import ProvisioningInputError, parse_users, provision_users
+
+    fmt = args.format or ("csv" if args.file.suffix.lower() == ".csv" else "json")
+    try:
+        rows = parse_users(args.file.read_bytes(), fmt)
+    except ProvisioningInputError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    kwargs = {k: v for k, v in (("rounds", args.rounds), ("workers", args.workers)) if v}
+    report = provision_users(rows, **kwargs)
+    print(
+        f"{report.created}/{report.total} users created, {len(report.conflicts)} skipped "
+        f"in {report.elapsed_s:.1f}s"
+    )
+    for c in report.conflicts[:MAX_CONFLICTS_SHOWN]:
+        print(f"  row {c.row}: {c.username!r} {c.reason}")
+    if len(report.conflicts) > MAX_CONFLICTS_SHOWN:
+        print(f"  ... and {len(report.conflicts) - MAX_CONFLICTS_SHOWN} more (see --report)")
+    if args.report:
+        args.report.write_text(json.dumps(report.as_dict(), indent=2, ensure_ascii=False))
+    return 0
+
+
+def rebuild_leaderboards_command(args: argparse.Namespace) -> int:
+    import leaderboards
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        venue_entries, player_entries = leaderboards.rebuild(db)
+    finally:
+        db.close()
+    print(f"{venue_entries} venue and {player_entries} player leaderboard entries rebuilt")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Meeting Plunger management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    provision = commands.add_parser("provision-users", help="bulk-create users from CSV/JSON")
+    provision.add_argument("file", type=Path)
+    provision.add_argument("--format", choices=["csv", "json"], help="default: by extension")
+    provision.add_argument("--rounds", type=int, help="bcrypt cost for the imported passwords")
+    provision.add_argument("--workers", type=int, help="hashing processes")
+    provision.add_argument("--report", type=Path, help="write the full report as JSON")
+    provision.set_defaults(handler=provision_users_command)
+
+    rebuild = commands.add_parser(
+        "rebuild-leaderboards", help="recompute the leaderboards from recorded round results"
+    )
+    rebuild.set_defaults(handler=rebuild_leaderboards_command)
+
+    args = parser.parse_args(argv)
+    Base.metadata.create_all(bind=engine)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
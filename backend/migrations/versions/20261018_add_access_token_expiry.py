@@ -0,0 +1,45 @@
+"""add expires_at/last_used_at to access_tokens, index created
+
+Revision ID: 20261018_token_expiry
+Revises: 20261018_transcript_cache
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261018_token_expiry"
+down_revision: str | Sequence[str] | None = "20261018_transcript_cache"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Existing tokens get the default ACCESS_TOKEN_TTL_SECONDS (14 days) counted from creation
+LEGACY_TOKEN_TTL = "+14 days"
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("access_tokens", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("expires_at", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("last_used_at", sa.DateTime(), nullable=True))
+
+    op.execute(
+        sa.text(
+            "UPDATE access_tokens SET expires_at = datetime(created, :ttl) WHERE expires_at IS NULL"
+        ).bindparams(ttl=LEGACY_TOKEN_TTL)
+    )
+
+    with op.batch_alter_table("access_tokens", schema=None) as batch_op:
+        batch_op.alter_column("expires_at", existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index("ix_access_tokens_expires_at", ["expires_at"], unique=False)
+        batch_op.create_index("ix_access_tokens_created", ["created"], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("access_tokens", schema=None) as batch_op:
+        batch_op.drop_index("ix_access_tokens_created")
+        batch_op.drop_index("ix_access_tokens_expires_at")
+        batch_op.drop_column("last_used_at")
+        batch_op.drop_column("expires_at")
@@ -0,0 +1,88 @@
+"""add venue_leaderboard and player_leaderboard tables
+
+Revision ID: 20261018_leaderboards
+Revises: 20261018_round_result_rank
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261018_leaderboards"
+down_revision: str | Sequence[str] | None = "20261018_round_result_rank"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Same aggregate as leaderboards.rebuild
+_TOTALS = (
+    "MAX(username), COUNT(*), SUM(CASE WHEN won THEN 1 ELSE 0 END), SUM(roll_count), "
+    "MIN(CASE WHEN won THEN roll_count END), MIN(CASE WHEN won THEN duration_seconds END), "
+    "CURRENT_TIMESTAMP"
+)
+_COLUMNS = (
+    "username, rounds_played, wins, total_roll_count, best_roll_count, "
+    "best_duration_seconds, updated_at"
+)
+
+
+def _totals_columns() -> list[sa.Column]:
+    return [
+        sa.Column("username", sa.String(255), nullable=False),
+        sa.Column("rounds_played", sa.Integer(), nullable=False),
+        sa.Column("wins", sa.Integer(), nullable=False),
+        sa.Column("total_roll_count", sa.Integer(), nullable=False),
+        sa.Column("best_roll_count", sa.Integer(), nullable=True),
+        sa.Column("best_duration_seconds", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "venue_leaderboard",
+        sa.Column("venue_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        *_totals_columns(),
+        sa.ForeignKeyConstraint(["venue_id"], ["venues.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("venue_id", "user_id"),
+    )
+    op.create_index(
+        "ix_venue_leaderboard_rank",
+        "venue_leaderboard",
+        ["venue_id", sa.text("wins DESC"), "best_roll_count", "user_id"],
+        unique=False,
+    )
+    op.create_table(
+        "player_leaderboard",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        *_totals_columns(),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index(
+        "ix_player_leaderboard_rank",
+        "player_leaderboard",
+        [sa.text("wins DESC"), "best_roll_count", "user_id"],
+        unique=False,
+    )
+
+    op.execute(
+        f"INSERT INTO venue_leaderboard (venue_id, user_id, {_COLUMNS}) "
+        f"SELECT venue_id, user_id, {_TOTALS} FROM venue_round_results "
+        "GROUP BY venue_id, user_id"
+    )
+    op.execute(
+        f"INSERT INTO player_leaderboard (user_id, {_COLUMNS}) "
+        f"SELECT user_id, {_TOTALS} FROM venue_round_results GROUP BY user_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_player_leaderboard_rank", table_name="player_leaderboard")
+    op.drop_table("player_leaderboard")
+    op.drop_index("ix_venue_leaderboard_rank", table_name="venue_leaderboard")
+    op.drop_table("venue_leaderboard")
@@ -0,0 +1,42 @@
+"""add venue_round_results.rank for keyset pagination
+
+Revision ID: 20261018_round_result_rank
+Revises: 20261018_venue_state_version
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261018_round_result_rank"
+down_revision: str | Sequence[str] | None = "20261018_venue_state_version"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("venue_round_results", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("rank", sa.Integer(), nullable=True))
+
+    # Same order GET .../results used to sort by on every request
+    op.execute(
+        "UPDATE venue_round_results SET rank = (SELECT r.rn FROM ("
+        "SELECT id, ROW_NUMBER() OVER (PARTITION BY venue_id, round_number "
+        "ORDER BY roll_count, duration_seconds, id) AS rn FROM venue_round_results) r "
+        "WHERE r.id = venue_round_results.id)"
+    )
+
+    with op.batch_alter_table("venue_round_results", schema=None) as batch_op:
+        batch_op.alter_column("rank", existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index(
+            "ix_venue_round_results_rank", ["venue_id", "round_number", "rank"], unique=False
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("venue_round_results", schema=None) as batch_op:
+        batch_op.drop_index("ix_venue_round_results_rank")
+        batch_op.drop_column("rank")
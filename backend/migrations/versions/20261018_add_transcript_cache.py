@@ -0,0 +1,41 @@
+"""add transcript_cache table
+
+Revision ID: 20261018_transcript_cache
+Revises: 20261018_transcription_jobs
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261018_transcript_cache"
+down_revision: str | Sequence[str] | None = "20261018_transcription_jobs"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "transcript_cache",
+        sa.Column("audio_sha256", sa.String(64), nullable=False),
+        sa.Column("model", sa.String(64), nullable=False),
+        sa.Column("transcript", sa.Text(), nullable=False),
+        sa.Column("audio_size_bytes", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_accessed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("audio_sha256", "model"),
+    )
+    op.create_index(
+        "ix_transcript_cache_last_accessed_at",
+        "transcript_cache",
+        ["last_accessed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transcript_cache_last_accessed_at", table_name="transcript_cache")
+    op.drop_table("transcript_cache")
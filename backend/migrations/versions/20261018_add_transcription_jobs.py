@@ -0,0 +1,43 @@
+"""add transcription_jobs table
+
+Revision ID: 20261018_transcription_jobs
+Revises: 20260211_rounds
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261018_transcription_jobs"
+down_revision: str | Sequence[str] | None = "20260211_rounds"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "transcription_jobs",
+        sa.Column("id", sa.String(32), nullable=False),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("filename", sa.String(255), nullable=False),
+        sa.Column("content_type", sa.String(255), nullable=True),
+        sa.Column("audio_path", sa.String(1024), nullable=False),
+        sa.Column("audio_sha256", sa.String(64), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("transcript", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_transcription_jobs_status", "transcription_jobs", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transcription_jobs_status", table_name="transcription_jobs")
+    op.drop_table("transcription_jobs")
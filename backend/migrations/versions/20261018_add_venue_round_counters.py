@@ -0,0 +1,53 @@
+"""add participant_count/finished_count to venue_rounds
+
+Revision ID: 20261018_venue_round_counters
+Revises: 20261018_venue_versioning
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261018_venue_round_counters"
+down_revision: str | Sequence[str] | None = "20261018_venue_versioning"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("venue_rounds", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("participant_count", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column("finished_count", sa.Integer(), nullable=False, server_default="0")
+        )
+
+    # Current rounds count the venue's participants; finished rounds their recorded results
+    op.execute(
+        "UPDATE venue_rounds SET "
+        "participant_count = (SELECT COUNT(*) FROM venue_participants p "
+        "WHERE p.venue_id = venue_rounds.venue_id), "
+        "finished_count = (SELECT COUNT(p.finished_at) FROM venue_participants p "
+        "WHERE p.venue_id = venue_rounds.venue_id) "
+        "WHERE round_number = (SELECT v.current_round FROM venues v "
+        "WHERE v.id = venue_rounds.venue_id)"
+    )
+    op.execute(
+        "UPDATE venue_rounds SET "
+        "participant_count = (SELECT COUNT(*) FROM venue_round_results r "
+        "WHERE r.venue_id = venue_rounds.venue_id AND r.round_number = venue_rounds.round_number), "
+        "finished_count = (SELECT COUNT(*) FROM venue_round_results r "
+        "WHERE r.venue_id = venue_rounds.venue_id AND r.round_number = venue_rounds.round_number) "
+        "WHERE round_number < (SELECT v.current_round FROM venues v "
+        "WHERE v.id = venue_rounds.venue_id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("venue_rounds", schema=None) as batch_op:
+        batch_op.drop_column("finished_count")
+        batch_op.drop_column("participant_count")
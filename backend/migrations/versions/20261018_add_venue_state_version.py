@@ -0,0 +1,29 @@
+"""add venues.state_version
+
+Revision ID: 20261018_venue_state_version
+Revises: 20261018_venue_round_counters
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261018_venue_state_version"
+down_revision: str | Sequence[str] | None = "20261018_venue_round_counters"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("venues", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("state_version", sa.Integer(), nullable=False, server_default="0")
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("venues", schema=None) as batch_op:
+        batch_op.drop_column("state_version")
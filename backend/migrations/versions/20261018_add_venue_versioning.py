@@ -0,0 +1,38 @@
+"""add venue_participants.version and venue_rounds.completed_at
+
+Revision ID: 20261018_venue_versioning
+Revises: 20261018_token_revocations
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261018_venue_versioning"
+down_revision: str | Sequence[str] | None = "20261018_token_revocations"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("venue_participants", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+    with op.batch_alter_table("venue_rounds", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("completed_at", sa.DateTime(), nullable=True))
+
+    # Rounds whose results were already recorded are complete
+    op.execute(
+        "UPDATE venue_rounds SET completed_at = CURRENT_TIMESTAMP WHERE EXISTS ("
+        "SELECT 1 FROM venue_round_results r WHERE r.venue_id = venue_rounds.venue_id "
+        "AND r.round_number = venue_rounds.round_number)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("venue_rounds", schema=None) as batch_op:
+        batch_op.drop_column("completed_at")
+    with op.batch_alter_table("venue_participants", schema=None) as batch_op:
+        batch_op.drop_column("version")
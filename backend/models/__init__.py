@@ -1,5 +1,21 @@
 from models.access_tokens import AccessToken
+from models.leaderboard import PlayerLeaderboardEntry, VenueLeaderboardEntry
+from models.token_revocation import TokenRevocation
+from models.transcript_cache import TranscriptCacheEntry
+from models.transcription_job import TranscriptionJob
 from models.user import User
 from models.venue import Venue, VenueParticipant, VenueRound, VenueRoundResult
 
-__all__ = ["AccessToken", "User", "Venue", "VenueParticipant", "VenueRound", "VenueRoundResult"]
+__all__ = [
+    "AccessToken",
+    "PlayerLeaderboardEntry",
+    "TokenRevocation",
+    "TranscriptCacheEntry",
+    "TranscriptionJob",
+    "User",
+    "Venue",
+    "VenueLeaderboardEntry",
+    "VenueParticipant",
+    "VenueRound",
+    "VenueRoundResult",
+]
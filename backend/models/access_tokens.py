@@ -11,4 +11,7 @@ class AccessToken(Base):
 
     token: Mapped[str] = mapped_column(String, primary_key=True)
     user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True, index=True)
-    created: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    # Sliding expiry: pushed forward (at most once per refresh interval) while the token is used
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    last_used_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database import Base
+
+
+class VenueLeaderboardEntry(Base):
+    """One player's totals over every recorded round of one venue. Maintained by
+    ``leaderboards.record_results``; ``python manage.py rebuild-leaderboards`` recomputes it
+    from ``venue_round_results``."""
+
+    __tablename__ = "venue_leaderboard"
+
+    venue_id: Mapped[int] = mapped_column(ForeignKey("venues.id"), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    username: Mapped[str] = mapped_column(String(255), nullable=False)
+    rounds_played: Mapped[int] = mapped_column(Integer, nullable=False)
+    wins: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_roll_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Over won rounds only; NULL until the first win
+    best_roll_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    best_duration_seconds: Mapped[float | None] = mapped_column(nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class PlayerLeaderboardEntry(Base):
+    """One player's totals over every recorded round in every venue."""
+
+    __tablename__ = "player_leaderboard"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    username: Mapped[str] = mapped_column(String(255), nullable=False)
+    rounds_played: Mapped[int] = mapped_column(Integer, nullable=False)
+    wins: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_roll_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    best_roll_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    best_duration_seconds: Mapped[float | None] = mapped_column(nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# Top-K is a walk along these: most wins first, then fewest rolls in a winning round, then
+# user id to break ties
+Index(
+    "ix_venue_leaderboard_rank",
+    VenueLeaderboardEntry.venue_id,
+    VenueLeaderboardEntry.wins.desc(),
+    VenueLeaderboardEntry.best_roll_count,
+    VenueLeaderboardEntry.user_id,
+)
+Index(
+    "ix_player_leaderboard_rank",
+    PlayerLeaderboardEntry.wins.desc(),
+    PlayerLeaderboardEntry.best_roll_count,
+    PlayerLeaderboardEntry.user_id,
+)
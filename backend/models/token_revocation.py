@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database import Base
+
+
+class TokenRevocation(Base):
+    """Revokes one signed token (``jti`` set) or every signed token of ``user_id`` issued up
+    to ``revoked_at`` (``jti`` NULL). Rows are useless, and swept, after ``expires_at``."""
+
+    __tablename__ = "token_revocations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    jti: Mapped[str | None] = mapped_column(String(32), nullable=True, unique=True)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database import Base
@@ -13,6 +13,10 @@ class Venue(Base):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     current_round: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    # Bumped by every change to what GET /venues/{id} returns; served as its ETag
+    state_version: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
 
     participants = relationship("VenueParticipant", back_populates="venue")
     rounds = relationship("VenueRound", back_populates="venue")
@@ -33,10 +37,14 @@ class VenueParticipant(Base):
     roll_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped by every UPDATE; a flush whose row changed underneath it raises StaleDataError
+    version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
     venue = relationship("Venue", back_populates="participants")
     user = relationship("User", back_populates="venue_participations")
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 class VenueRound(Base):
     __tablename__ = "venue_rounds"
@@ -46,13 +54,26 @@ class VenueRound(Base):
     venue_id: Mapped[int] = mapped_column(ForeignKey("venues.id"), nullable=False, index=True)
     round_number: Mapped[int] = mapped_column(Integer, nullable=False)
     started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    # Set by whichever request records the round's results, exactly once
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Kept up to date by enter and roll so completion is known without scanning participants
+    participant_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    finished_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
 
     venue = relationship("Venue", back_populates="rounds")
 
 
 class VenueRoundResult(Base):
     __tablename__ = "venue_round_results"
-    __table_args__ = (UniqueConstraint("venue_id", "round_number", "user_id", name="uq_venue_round_user"),)
+    __table_args__ = (
+        UniqueConstraint("venue_id", "round_number", "user_id", name="uq_venue_round_user"),
+        # Ranking pages: WHERE venue_id = ? AND round_number = ? AND rank > ? ORDER BY rank
+        Index("ix_venue_round_results_rank", "venue_id", "round_number", "rank"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     venue_id: Mapped[int] = mapped_column(ForeignKey("venues.id"), nullable=False, index=True)
@@ -62,6 +83,8 @@ class VenueRoundResult(Base):
     won: Mapped[bool] = mapped_column(default=False, nullable=False)
     roll_count: Mapped[int] = mapped_column(Integer, nullable=False)
     duration_seconds: Mapped[float] = mapped_column(nullable=False)
+    # 1-based place by fewest rolls, then shortest duration; assigned when the round completes
+    rank: Mapped[int] = mapped_column(Integer, nullable=False)
 
     venue = relationship("Venue")
     user = relationship("User")
@@ -0,0 +1,137 @@
+"""bcrypt hashing off the event loop and off FastAPI's threadpool.
+
+bcrypt is CPU-bound and holds the GIL for much of each call, so a login storm handled on
+request threads slows every other endpoint. ``PasswordHasher`` runs it in a small dedicated
+process pool instead, admits at most ``max_pending`` calls (the rest get ``HasherBusyError``)
+and gives up on a call after ``timeout`` seconds. A call already running in a worker cannot be
+stopped, so it keeps its place in ``max_pending`` until it actually finishes.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from passlib.context import CryptContext
+from passlib.hash import bcrypt
+
+from config import (
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_TIMEOUT_SECONDS,
+    PASSWORD_HASH_WORKERS,
+)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def hash_with_rounds(password: str, rounds: int) -> str:
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def verify_password(plain: str, hashed: str) -> bool:
+    return pwd_context.verify(plain, hashed)
+
+
+def verify_and_update(plain: str, hashed: str) -> tuple[bool, str | None]:
+    """Verify ``plain``; the second item is a fresh hash when ``hashed`` uses a different
+    cost factor than BCRYPT_ROUNDS."""
+    return pwd_context.verify_and_update(plain, hashed)
+
+
+class HasherBusyError(Exception):
+    """The hashing queue is full, or a call did not finish within the timeout."""
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+        timeout: float = PASSWORD_HASH_TIMEOUT_SECONDS,
+        processes: bool = True,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.processes = processes
+        self._pool: Executor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _executor(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.processes:
+                    # spawn: forking a process that already runs threads is unsafe
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="bcrypt"
+                    )
+            return self._pool
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HasherBusyError("Password hashing queue is full")
+            self._pending += 1
+        try:
+            future = self._executor().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Freed when the work ends, not when the caller stops waiting for it
+        future.add_done_callback(self._release)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except TimeoutError as e:
+            future.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise HasherBusyError("Password hashing timed out") from e
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify_and_update(self, plain: str, hashed: str) -> tuple[bool, str | None]:
+        return await self._run(verify_and_update, plain, hashed)
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "processes": self.processes,
+                "rounds": BCRYPT_ROUNDS,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,179 @@
+"""Bulk user provisioning from CSV or JSON.
+
+Rows are validated and checked against existing usernames up front, passwords are hashed on
+a process pool spanning the available cores, and users are inserted with one executemany per
+batch. Problems are reported per row instead of aborting the import.
+"""
+
+import csv
+import io
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import partial
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from config import (
+    PROVISIONING_BATCH_SIZE,
+    PROVISIONING_BCRYPT_ROUNDS,
+    PROVISIONING_HASH_WORKERS,
+    PROVISIONING_MAX_USERS,
+)
+from database import SessionLocal
+from models.user import User
+from password_hashing import hash_with_rounds
+
+USERNAME_MAX_LENGTH = 255
+# Below this many passwords per worker, starting processes costs more than it saves
+MIN_PASSWORDS_PER_WORKER = 8
+
+
+class ProvisioningInputError(ValueError):
+    """The upload could not be parsed as a list of users."""
+
+
+@dataclass
+class ProvisionRow:
+    row: int  # 1-based position in the input
+    username: str
+    password: str
+
+
+@dataclass
+class ProvisionConflict:
+    row: int
+    username: str
+    reason: str  # "exists", "duplicate" or "invalid"
+
+
+@dataclass
+class ProvisionReport:
+    total: int = 0
+    created: int = 0
+    conflicts: list[ProvisionConflict] = field(default_factory=list)
+    elapsed_s: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def parse_users(data: bytes | str, fmt: str) -> list[ProvisionRow]:
+    """Parse ``fmt`` ("csv" with a username,password header, or "json": a list of
+    {"username", "password"} objects, optionally wrapped as {"users": [...]})."""
+    try:
+        text = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+    except UnicodeDecodeError as e:
+        raise ProvisioningInputError(f"Input is not valid UTF-8: {e}") from e
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames or not {"username", "password"} <= set(reader.fieldnames):
+            raise ProvisioningInputError("CSV needs a header with username and password columns")
+        items = list(reader)
+    elif fmt == "json":
+        try:
+            items = json.loads(text)
+        except ValueError as e:
+            raise ProvisioningInputError(f"Invalid JSON: {e}") from e
+        if isinstance(items, dict):
+            items = items.get("users")
+        if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+            raise ProvisioningInputError('JSON must be a list of {"username", "password"}')
+    else:
+        raise ProvisioningInputError(f"Unsupported format {fmt!r}")
+    if len(items) > PROVISIONING_MAX_USERS:
+        raise ProvisioningInputError(f"At most {PROVISIONING_MAX_USERS} users per import")
+    return [
+        ProvisionRow(
+            row=i,
+            username=str(item.get("username") or "").strip(),
+            password=str(item.get("password") or ""),
+        )
+        for i, item in enumerate(items, start=1)
+    ]
+
+
+def hash_passwords(passwords: list[str], rounds: int, workers: int) -> list[str]:
+    """bcrypt ``passwords`` in input order, on up to ``workers`` processes."""
+    fn = partial(hash_with_rounds, rounds=rounds)
+    workers = min(workers, len(passwords) // MIN_PASSWORDS_PER_WORKER)
+    if workers <= 1:
+        return [fn(p) for p in passwords]
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        return list(pool.map(fn, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def _existing_usernames(db, usernames: list[str]) -> set[str]:
+    existing: set[str] = set()
+    # Stay well under SQLite's bound-parameter limit
+    for i in range(0, len(usernames), 500):
+        chunk = usernames[i : i + 500]
+        existing.update(db.scalars(select(User.username).where(User.username.in_(chunk))))
+    return existing
+
+
+def _insert_batch(db, batch: list[tuple[ProvisionRow, str]], report: ProvisionReport) -> None:
+    now = datetime.utcnow()
+    values = [{"username": r.username, "password_hash": h, "created_at": now} for r, h in batch]
+    try:
+        db.execute(insert(User), values)
+        db.commit()
+        report.created += len(batch)
+        return
+    except IntegrityError:
+        db.rollback()
+    # Someone registered one of these names meanwhile; retry row by row to find out which
+    for (r, _h), row_values in zip(batch, values, strict=True):
+        try:
+            db.execute(insert(User), [row_values])
+            db.commit()
+            report.created += 1
+        except IntegrityError:
+            db.rollback()
+            report.conflicts.append(ProvisionConflict(r.row, r.username, "exists"))
+
+
+def provision_users(
+    rows: list[ProvisionRow],
+    rounds: int = PROVISIONING_BCRYPT_ROUNDS,
+    workers: int = PROVISIONING_HASH_WORKERS,
+    batch_size: int = PROVISIONING_BATCH_SIZE,
+) -> ProvisionReport:
+    """Create every valid, new user in ``rows``; the report lists the rows that were not."""
+    started = time.perf_counter()
+    report = ProvisionReport(total=len(rows))
+    seen: set[str] = set()
+    candidates: list[ProvisionRow] = []
+    for r in rows:
+        if not r.username or not r.password or len(r.username) > USERNAME_MAX_LENGTH:
+            report.conflicts.append(ProvisionConflict(r.row, r.username, "invalid"))
+        elif r.username in seen:
+            report.conflicts.append(ProvisionConflict(r.row, r.username, "duplicate"))
+        else:
+            seen.add(r.username)
+            candidates.append(r)
+
+    db = SessionLocal()
+    try:
+        existing = _existing_usernames(db, [r.username for r in candidates])
+        fresh = []
+        for r in candidates:
+            if r.username in existing:
+                report.conflicts.append(ProvisionConflict(r.row, r.username, "exists"))
+            else:
+                fresh.append(r)
+        hashes = hash_passwords([r.password for r in fresh], rounds, workers)
+        pairs = list(zip(fresh, hashes, strict=True))
+        for i in range(0, len(pairs), batch_size):
+            _insert_batch(db, pairs[i : i + batch_size], report)
+    finally:
+        db.close()
+    report.conflicts.sort(key=lambda c: c.row)
+    report.elapsed_s = time.perf_counter() - started
+    return report
@@ -31,3 +31,9 @@ def roll(position: int, condition: int, mode: str, dice: int) -> dict:
         "won": won,
         "gameOver": game_over,
     }
+
+
+def auto_mode(condition: int) -> str:
+    """Auto-play policy: super while it cannot end the game, then normal. A super roll costs
+    one condition and a normal roll always moves, so this never hits game over."""
+    return "super" if condition > 1 else "normal"
@@ -0,0 +1,155 @@
+"""In-memory token-bucket admission control for expensive endpoints.
+
+Each ``RateLimiter`` holds one bucket per key (client IP, user id, ...). A bucket holds up to
+``capacity`` requests and refills at ``capacity / per_seconds`` per second; a request that
+finds it empty gets 429 with Retry-After. State is per process and never touches the
+database.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from fastapi import Depends, HTTPException, Request, status
+
+from auth import CurrentUser, get_current_user
+from config import (
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_LOGIN,
+    RATE_LIMIT_MAX_KEYS,
+    RATE_LIMIT_REGISTER,
+    RATE_LIMIT_ROLL,
+    RATE_LIMIT_TRANSCRIBE,
+    RATE_LIMIT_TRUST_PROXY,
+)
+
+
+def parse_rate(spec: str) -> tuple[int, float]:
+    """``"20/60"`` -> (20 requests, per 60 seconds)."""
+    try:
+        count, _, seconds = spec.partition("/")
+        capacity, per_seconds = int(count), float(seconds)
+    except ValueError as e:
+        raise ValueError(f"Invalid rate limit {spec!r}, expected COUNT/SECONDS") from e
+    if capacity < 1 or per_seconds <= 0:
+        raise ValueError(f"Invalid rate limit {spec!r}, expected COUNT/SECONDS")
+    return capacity, per_seconds
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        name: str,
+        spec: str,
+        max_keys: int = RATE_LIMIT_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.spec = spec
+        self.capacity, per_seconds = parse_rate(spec)
+        self.refill_per_second = self.capacity / per_seconds
+        self.max_keys = max_keys
+        self.enabled = RATE_LIMIT_ENABLED
+        self._clock = clock
+        # key -> (tokens, last refill time), least recently used first
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    def acquire(self, key: str) -> float:
+        """Take a token for ``key``. Returns 0 if admitted, otherwise the seconds until a
+        token will be available."""
+        with self._lock:
+            now = self._clock()
+            tokens, last = self._buckets.pop(key, (float(self.capacity), now))
+            tokens = min(self.capacity, tokens + (now - last) * self.refill_per_second)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+                self.allowed += 1
+            else:
+                wait = (1 - tokens) / self.refill_per_second
+                self.rejected += 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                # The oldest bucket has had the longest to refill, so dropping it loses least
+                self._buckets.popitem(last=False)
+            return wait
+
+    def check(self, key: str) -> None:
+        """Raise 429 with Retry-After if ``key`` is over its limit."""
+        if not self.enabled:
+            return
+        wait = self.acquire(key)
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.spec,
+                "enabled": self.enabled,
+                "keys": len(self._buckets),
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+            }
+
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_ip(limiter: RateLimiter):
+    """Dependency applying ``limiter`` per client IP."""
+
+    def dependency(request: Request) -> None:
+        limiter.check(client_ip(request))
+
+    return dependency
+
+
+def limit_by_user(limiter: RateLimiter):
+    """Dependency applying ``limiter`` per authenticated user."""
+
+    def dependency(current_user: CurrentUser = Depends(get_current_user)) -> None:
+        limiter.check(str(current_user.id))
+
+    return dependency
+
+
+# Login is limited per (IP, username) so a classroom behind one NAT address can still log in
+login_limiter = RateLimiter("login", RATE_LIMIT_LOGIN)
+register_limiter = RateLimiter("register", RATE_LIMIT_REGISTER)
+transcribe_limiter = RateLimiter("transcribe", RATE_LIMIT_TRANSCRIBE)
+roll_limiter = RateLimiter("roll", RATE_LIMIT_ROLL)
+
+limiters = [login_limiter, register_limiter, transcribe_limiter, roll_limiter]
+
+
+def reset_limiters() -> None:
+    for limiter in limiters:
+        limiter.reset()
+
+
+def set_limits_enabled(enabled: bool) -> None:
+    for limiter in limiters:
+        limiter.enabled = enabled
+
+
+def limiter_stats() -> dict:
+    return {limiter.name: limiter.stats() for limiter in limiters}
@@ -0,0 +1,38 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+
+from config import PROVISIONING_API_KEY
+from provisioning import ProvisioningInputError, parse_users, provision_users
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def require_provisioning_key(x_provisioning_key: str | None = Header(None)):
+    """Admin endpoints are hidden unless PROVISIONING_API_KEY is configured."""
+    if not PROVISIONING_API_KEY:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_provisioning_key or not hmac.compare_digest(
+        x_provisioning_key.encode(), PROVISIONING_API_KEY.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid provisioning key"
+        )
+
+
+@router.post("/users/bulk", dependencies=[Depends(require_provisioning_key)])
+async def bulk_create_users(
+    request: Request,
+    fmt: str | None = Query(None, alias="format", description="csv or json"),
+):
+    """Create many users from a CSV (username,password) or JSON body. Rows that cannot be
+    created are listed in ``conflicts`` with a reason; the rest are imported."""
+    if fmt is None:
+        fmt = "csv" if "csv" in request.headers.get("content-type", "") else "json"
+    try:
+        rows = parse_users(await request.body(), fmt)
+    except ProvisioningInputError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    report = await run_in_threadpool(provision_users, rows)
+    return report.as_dict()
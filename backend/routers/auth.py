@@ -1,12 +1,23 @@
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from auth import create_token, get_current_user, get_db, hash_password, verify_password
-from models.access_tokens import AccessToken
+from auth import (
+    CurrentUser,
+    get_current_user,
+    get_db,
+    issue_token,
+    revoke_token,
+    security,
+)
 from models.user import User
+from password_hashing import HasherBusyError, password_hasher
+from rate_limit import client_ip, limit_by_ip, login_limiter, register_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -33,34 +44,72 @@ class TokenResponse(BaseModel):
 
 
 @router.get("/me", response_model=MeResponse)
-def me(current_user: User = Depends(get_current_user)):
+def me(current_user: CurrentUser = Depends(get_current_user)):
     """Return current user id and username."""
     return MeResponse(id=current_user.id, username=current_user.username)
 
 
-@router.post("/register", response_model=TokenResponse)
-def register(body: RegisterBody, db: Session = Depends(get_db)):
-    """Register a new user. Returns 409 if username already exists."""
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many logins in progress, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _username_taken(db: Session, username: str) -> bool:
+    return db.query(User.id).filter(User.username == username).first() is not None
+
+
+def _create_user(db: Session, username: str, password_hash: str) -> str:
+    user = User(username=username, password_hash=password_hash)
+    db.add(user)
+    try:
+        db.commit()
+    except IntegrityError as e:
+        # Registered concurrently while the password was being hashed
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="用户名已存在") from e
+    db.refresh(user)
+    token = issue_token(db, user.id, user.username)
+    db.commit()
+    return token
+
+
+def _find_user(db: Session, username: str) -> tuple[int, str] | None:
+    row = db.query(User.id, User.password_hash).filter(User.username == username).first()
+    return (row.id, row.password_hash) if row else None
+
+
+def _issue_token(db: Session, user_id: int, username: str, new_hash: str | None) -> str:
+    if new_hash is not None:
+        db.query(User).filter(User.id == user_id).update({User.password_hash: new_hash})
+    token = issue_token(db, user_id, username)
+    db.commit()
+    return token
+
+
+@router.post(
+    "/register",
+    response_model=TokenResponse,
+    dependencies=[Depends(limit_by_ip(register_limiter))],
+)
+async def register(body: RegisterBody, db: Session = Depends(get_db)):
+    """Register a new user. Returns 409 if username already exists, 429 if rate limited,
+    503 if hashing is saturated."""
     try:
-        existing = db.query(User).filter(User.username == body.username).first()
-        if existing:
+        if await run_in_threadpool(_username_taken, db, body.username):
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="用户名已存在",
             )
-        user = User(
-            username=body.username,
-            password_hash=hash_password(body.password),
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        token = create_token()
-        db.add(AccessToken(token=token, user_id=user.id))
-        db.commit()
+        password_hash = await password_hasher.hash(body.password)
+        token = await run_in_threadpool(_create_user, db, body.username, password_hash)
         return TokenResponse(token=token)
     except HTTPException:
         raise
+    except HasherBusyError as e:
+        raise _busy() from e
     except Exception as e:
         logger.exception("Registration failed: %s", e)
         raise HTTPException(
@@ -70,15 +119,31 @@ def register(body: RegisterBody, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(body: LoginBody, db: Session = Depends(get_db)):
-    """Login with username and password."""
-    user = db.query(User).filter(User.username == body.username).first()
-    if not user or not verify_password(body.password, user.password_hash):
+async def login(body: LoginBody, request: Request, db: Session = Depends(get_db)):
+    """Login with username and password. Returns 429 if rate limited, 503 if hashing is
+    saturated."""
+    login_limiter.check(f"{client_ip(request)}:{body.username}")
+    found = await run_in_threadpool(_find_user, db, body.username)
+    ok, new_hash = False, None
+    if found:
+        try:
+            ok, new_hash = await password_hasher.verify_and_update(body.password, found[1])
+        except HasherBusyError as e:
+            raise _busy() from e
+    if not ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
         )
-    token = create_token()
-    db.add(AccessToken(token=token, user_id=user.id))
-    db.commit()
+    token = await run_in_threadpool(_issue_token, db, found[0], body.username, new_hash)
     return TokenResponse(token=token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    current_user: CurrentUser = Depends(get_current_user),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+):
+    """Revoke the bearer token used for this request."""
+    revoke_token(db, credentials.credentials)
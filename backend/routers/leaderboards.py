@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+import leaderboards
+from auth import CurrentUser, get_current_user, get_db
+from models.leaderboard import PlayerLeaderboardEntry, VenueLeaderboardEntry
+from models.venue import Venue, VenueParticipant
+
+router = APIRouter(tags=["leaderboards"])
+
+LEADERBOARD_SIZE_DEFAULT = 20
+LEADERBOARD_SIZE_MAX = 100
+
+
+class LeaderboardItem(BaseModel):
+    rank: int
+    user_id: int
+    username: str
+    rounds_played: int
+    wins: int
+    mean_roll_count: float
+    best_roll_count: int | None
+    best_duration_seconds: float | None
+
+
+def _items(entries: list[VenueLeaderboardEntry | PlayerLeaderboardEntry]) -> list[LeaderboardItem]:
+    return [
+        LeaderboardItem(
+            rank=rank,
+            user_id=e.user_id,
+            username=e.username,
+            rounds_played=e.rounds_played,
+            wins=e.wins,
+            mean_roll_count=e.total_roll_count / e.rounds_played,
+            best_roll_count=e.best_roll_count,
+            best_duration_seconds=e.best_duration_seconds,
+        )
+        for rank, e in enumerate(entries, start=1)
+    ]
+
+
+@router.get("/leaderboard", response_model=list[LeaderboardItem])
+def get_leaderboard(
+    limit: int = Query(LEADERBOARD_SIZE_DEFAULT, ge=1, le=LEADERBOARD_SIZE_MAX),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Top players over every recorded round in every venue: most wins, then fewest rolls in
+    a winning round."""
+    return _items(leaderboards.top_players(db, limit))
+
+
+@router.get("/venues/{venue_id}/leaderboard", response_model=list[LeaderboardItem])
+def get_venue_leaderboard(
+    venue_id: int,
+    limit: int = Query(LEADERBOARD_SIZE_DEFAULT, ge=1, le=LEADERBOARD_SIZE_MAX),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Top players over every recorded round of one venue (user must be in venue)."""
+    if db.get(Venue, venue_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Venue not found")
+    member = (
+        db.query(VenueParticipant.id)
+        .filter(VenueParticipant.venue_id == venue_id, VenueParticipant.user_id == current_user.id)
+        .first()
+    )
+    if not member:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not in this venue; enter first",
+        )
+    return _items(leaderboards.top_in_venue(db, venue_id, limit))
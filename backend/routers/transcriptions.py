@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+from database import SessionLocal
+from models.transcription_job import TranscriptionJob
+from rate_limit import limit_by_ip, transcribe_limiter
+from transcription.ingest import UploadTooLargeError, spool_upload
+from transcription.jobs import create_job, job_pool
+
+router = APIRouter(prefix="/transcriptions", tags=["transcriptions"])
+
+
+class TranscriptionJobCreated(BaseModel):
+    id: str
+    status: str
+
+
+class TranscriptionJobResponse(BaseModel):
+    id: str
+    status: str
+    filename: str
+    transcript: str | None = None
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+# Shares the /transcribe bucket: a job makes the same upstream call
+@router.post(
+    "",
+    response_model=TranscriptionJobCreated,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(limit_by_ip(transcribe_limiter))],
+)
+async def create_transcription(file: UploadFile = File(...)):  # noqa: B008
+    """Queue an audio file for transcription and return the job id immediately."""
+    try:
+        audio = await spool_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        ) from e
+    try:
+        job = await run_in_threadpool(create_job, audio)
+    finally:
+        audio.close()
+    job_pool.submit(job.id)
+    return TranscriptionJobCreated(id=job.id, status=job.status)
+
+
+@router.get("/{job_id}", response_model=TranscriptionJobResponse)
+def get_transcription(job_id: str):
+    """Get status and, once done, the transcript of a transcription job."""
+    db = SessionLocal()
+    try:
+        job = db.get(TranscriptionJob, job_id)
+        if not job:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+        return TranscriptionJobResponse.model_validate(job)
+    finally:
+        db.close()
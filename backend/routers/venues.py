@@ -1,14 +1,28 @@
+import asyncio
 import random
+from collections.abc import Callable
 from datetime import datetime, timezone
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from pydantic import BaseModel, Field
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
-from auth import get_current_user, get_db
+import leaderboards
+from auth import CurrentUser, authenticate, get_current_user, get_db, security
+from config import VENUE_EVENTS_KEEPALIVE_SECONDS
+from database import SessionLocal
 from models.user import User
 from models.venue import Venue, VenueParticipant, VenueRound, VenueRoundResult
-from racing_engine import roll as engine_roll
+from racing_engine import INITIAL_CONDITION, auto_mode
+from rate_limit import limit_by_user, roll_limiter
+from venue_engine import ParticipantSnapshot, apply_roll, venue_engine
+from venue_events import VenueSubscription, format_sse, venue_events
 
 
 def _now() -> datetime:
@@ -16,6 +30,17 @@ def _now() -> datetime:
 
 router = APIRouter(prefix="/venues", tags=["venues"])
 
+# A roll re-reads and retries when another roll by the same user commits first
+ROLL_ATTEMPTS = 5
+
+# Enough for a whole game in normal mode, one or two squares per roll
+ROLL_BATCH_MAX = 30
+
+# List endpoints return at most PAGE_SIZE_MAX items per page; X-Next-Cursor is the after_id
+# for the following page and is absent on the last one
+PAGE_SIZE_DEFAULT = 100
+PAGE_SIZE_MAX = 500
+
 
 class CreateVenueBody(BaseModel):
     name: str
@@ -57,6 +82,7 @@ class VenueDetailResponse(BaseModel):
     id: int
     name: str
     current_round: int
+    state_version: int
     round_complete: bool
     participants: list[ParticipantState]
     ranking: list[RankingItem] = []
@@ -64,11 +90,15 @@ class VenueDetailResponse(BaseModel):
 
 @router.get("", response_model=list[VenueItem])
 def list_venues(
+    response: Response,
+    after_id: int = 0,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    """List all venues."""
-    venues = db.query(Venue).order_by(Venue.id).all()
+    """List venues by id, one page after ``after_id``."""
+    venues = db.query(Venue).filter(Venue.id > after_id).order_by(Venue.id).limit(limit + 1).all()
+    venues = _page(response, venues, limit, lambda v: v.id)
     return [VenueItem.model_validate(v) for v in venues]
 
 
@@ -76,7 +106,7 @@ def list_venues(
 def create_venue(
     body: CreateVenueBody,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """Create a new venue."""
     venue = Venue(name=body.name)
@@ -86,6 +116,16 @@ def create_venue(
     return VenueItem.model_validate(venue)
 
 
+def _page(response: Response, rows: list, limit: int, cursor) -> list:
+    """Trim a ``limit + 1`` row query to ``limit`` rows and, if there were more, send the
+    cursor of the last one kept as X-Next-Cursor."""
+    if len(rows) <= limit:
+        return rows
+    rows = rows[:limit]
+    response.headers["X-Next-Cursor"] = str(cursor(rows[-1]))
+    return rows
+
+
 def _get_venue_or_404(venue_id: int, db: Session) -> Venue:
     venue = db.query(Venue).filter(Venue.id == venue_id).first()
     if not venue:
@@ -103,11 +143,24 @@ def _ensure_venue_round(venue_id: int, db: Session) -> None:
         .first()
     )
     if not existing:
-        db.add(VenueRound(venue_id=venue_id, round_number=venue.current_round, started_at=_now()))
+        participant_count, finished_count = (
+            db.query(func.count(VenueParticipant.id), func.count(VenueParticipant.finished_at))
+            .filter(VenueParticipant.venue_id == venue_id)
+            .one()
+        )
+        db.add(
+            VenueRound(
+                venue_id=venue_id,
+                round_number=venue.current_round,
+                started_at=_now(),
+                participant_count=participant_count,
+                finished_count=finished_count,
+            )
+        )
         db.commit()
 
 
-def _ensure_participant(venue_id: int, user: User, db: Session) -> VenueParticipant:
+def _ensure_participant(venue_id: int, user: CurrentUser, db: Session) -> VenueParticipant:
     participant = (
         db.query(VenueParticipant)
         .filter(VenueParticipant.venue_id == venue_id, VenueParticipant.user_id == user.id)
@@ -124,56 +177,80 @@ def _ensure_participant(venue_id: int, user: User, db: Session) -> VenueParticip
             game_over=False,
         )
         db.add(participant)
+        _bump_state_version(venue_id, db)
+        current_round = select(Venue.current_round).where(Venue.id == venue_id).scalar_subquery()
+        db.execute(
+            update(VenueRound)
+            .where(VenueRound.venue_id == venue_id, VenueRound.round_number == current_round)
+            .values(participant_count=VenueRound.participant_count + 1)
+        )
         db.commit()
         db.refresh(participant)
     return participant
 
 
-def _maybe_snapshot_round(venue_id: int, db: Session) -> None:
-    venue = db.query(Venue).filter(Venue.id == venue_id).first()
-    if not venue:
-        return
-    participants = (
-        db.query(VenueParticipant, User)
-        .join(User, VenueParticipant.user_id == User.id)
-        .filter(VenueParticipant.venue_id == venue_id)
-        .all()
+def _bump_state_version(venue_id: int, db: Session) -> None:
+    """Mark the venue's detail as changed (in the caller's transaction) so cached copies
+    revalidate."""
+    db.execute(
+        update(Venue).where(Venue.id == venue_id).values(state_version=Venue.state_version + 1)
     )
-    if not participants:
-        return
-    if not all(p.finished_at is not None for p, _ in participants):
-        return
-    existing = (
-        db.query(VenueRoundResult)
-        .filter(
-            VenueRoundResult.venue_id == venue_id,
-            VenueRoundResult.round_number == venue.current_round,
-        )
+
+
+def _current_round(venue: Venue, db: Session) -> VenueRound | None:
+    return (
+        db.query(VenueRound)
+        .filter(VenueRound.venue_id == venue.id, VenueRound.round_number == venue.current_round)
         .first()
     )
-    if existing:
-        return
-    round_row = (
-        db.query(VenueRound)
+
+
+def _round_complete(round_row: VenueRound | None) -> bool:
+    """Every participant has finished and the results have been recorded."""
+    return (
+        round_row is not None
+        and round_row.completed_at is not None
+        and round_row.finished_count >= round_row.participant_count
+    )
+
+
+def _record_round_results(venue: Venue, round_id: int, db: Session) -> None:
+    """Write the current round's results for every participant that has none yet; the caller
+    commits. The first call marks the round completed and ranks everyone; a later one (players
+    who entered after the results were recorded and have now finished) ranks the newcomers
+    after them."""
+    db.execute(
+        update(VenueRound)
+        .where(VenueRound.id == round_id, VenueRound.completed_at.is_(None))
+        .values(completed_at=_now())
+    )
+    started = db.get(VenueRound, round_id).started_at
+    if started.tzinfo is None:
+        started = started.replace(tzinfo=timezone.utc)
+    in_round = (VenueRoundResult.venue_id == venue.id) & (
+        VenueRoundResult.round_number == venue.current_round
+    )
+    participants = (
+        db.query(VenueParticipant, User)
+        .join(User, VenueParticipant.user_id == User.id)
         .filter(
-            VenueRound.venue_id == venue_id,
-            VenueRound.round_number == venue.current_round,
+            VenueParticipant.venue_id == venue.id,
+            VenueParticipant.user_id.not_in(select(VenueRoundResult.user_id).where(in_round)),
         )
-        .first()
+        .all()
     )
-    if not round_row:
+    if not participants:
         return
-    started = round_row.started_at
-    if started.tzinfo is None:
-        started = started.replace(tzinfo=timezone.utc)
+    last_rank = db.scalar(select(func.max(VenueRoundResult.rank)).where(in_round)) or 0
+    results = []
     for p, u in participants:
         fin = p.finished_at
         if fin and fin.tzinfo is None:
             fin = fin.replace(tzinfo=timezone.utc)
         duration = (fin - started).total_seconds() if fin else 0.0
-        db.add(
+        results.append(
             VenueRoundResult(
-                venue_id=venue_id,
+                venue_id=venue.id,
                 round_number=venue.current_round,
                 user_id=u.id,
                 username=u.username,
@@ -182,35 +259,98 @@ def _maybe_snapshot_round(venue_id: int, db: Session) -> None:
                 duration_seconds=duration,
             )
         )
+    results.sort(key=lambda r: (r.roll_count, r.duration_seconds))
+    for rank, result in enumerate(results, start=last_rank + 1):
+        result.rank = rank
+    db.add_all(results)
+    leaderboards.record_results(db, results)
+
+
+def _count_finisher(venue: Venue, db: Session) -> bool:
+    """Count one more finished participant in the current round, in the caller's transaction;
+    the one that makes it complete records the results. True if the round is now complete."""
+    row = db.execute(
+        update(VenueRound)
+        .where(VenueRound.venue_id == venue.id, VenueRound.round_number == venue.current_round)
+        .values(finished_count=VenueRound.finished_count + 1)
+        .returning(VenueRound.id, VenueRound.finished_count, VenueRound.participant_count)
+    ).first()
+    if row is None or row.finished_count < row.participant_count:
+        return False
+    _record_round_results(venue, row.id, db)
+    return True
+
+
+def _recount_round(venue_id: int, db: Session) -> bool:
+    """Recompute the current round's counters from its participants and record any missing
+    results if it is complete. For the in-memory engine, whose rolls reach the database in
+    batches."""
+    venue = _get_venue_or_404(venue_id, db)
+    round_row = _current_round(venue, db)
+    if round_row is None:
+        return False
+    participants = VenueParticipant.venue_id == venue_id
+    round_row.participant_count = db.scalar(
+        select(func.count(VenueParticipant.id)).where(participants)
+    )
+    round_row.finished_count = db.scalar(
+        select(func.count(VenueParticipant.finished_at)).where(participants)
+    )
+    db.flush()
+    completed = round_row.finished_count >= round_row.participant_count
+    if completed:
+        _record_round_results(venue, round_row.id, db)
     db.commit()
+    return completed
+
+
+def recount_rounds(venue_ids: set[int]) -> None:
+    """Recount and, if now complete, record the current rounds of venues whose participants
+    were written outside the roll endpoints (the venue engine's journal replay)."""
+    db = SessionLocal()
+    try:
+        for venue_id in sorted(venue_ids):
+            _recount_round(venue_id, db)
+    finally:
+        db.close()
 
 
 @router.post("/{venue_id}/enter")
 def enter_venue(
     venue_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """Enter a venue; creates participant with initial state if not already in."""
     _get_venue_or_404(venue_id, db)
     _ensure_participant(venue_id, current_user, db)
     _ensure_venue_round(venue_id, db)
+    venue_engine.evict(venue_id)
+    _publish_snapshot(venue_id, db)
     return {"status": "ok", "venue_id": venue_id}
 
 
-def _ranking_for_venue_round(venue_id: int, round_number: int, db: Session) -> list[RankingItem]:
+def _ranking_for_venue_round(
+    venue_id: int,
+    round_number: int,
+    db: Session,
+    after_rank: int = 0,
+    limit: int | None = None,
+) -> list[RankingItem]:
     rows = (
         db.query(VenueRoundResult)
         .filter(
             VenueRoundResult.venue_id == venue_id,
             VenueRoundResult.round_number == round_number,
+            VenueRoundResult.rank > after_rank,
         )
-        .order_by(VenueRoundResult.roll_count.asc(), VenueRoundResult.duration_seconds.asc())
+        .order_by(VenueRoundResult.rank.asc())
+        .limit(limit)
         .all()
     )
     return [
         RankingItem(
-            rank=i + 1,
+            rank=r.rank,
             user_id=r.user_id,
             username=r.username,
             won=r.won,
@@ -218,52 +358,30 @@ def _ranking_for_venue_round(venue_id: int, round_number: int, db: Session) -> l
             roll_count=r.roll_count,
             duration_seconds=r.duration_seconds,
         )
-        for i, r in enumerate(rows)
+        for r in rows
     ]
 
 
-@router.get("/{venue_id}", response_model=VenueDetailResponse)
-def get_venue(
-    venue_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    """Get venue and all participants (user must be in venue)."""
-    venue = _get_venue_or_404(venue_id, db)
-    participant = (
-        db.query(VenueParticipant)
-        .filter(VenueParticipant.venue_id == venue_id, VenueParticipant.user_id == current_user.id)
-        .first()
-    )
-    if not participant:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not in this venue; enter first",
-        )
+def _venue_detail(venue: Venue, db: Session) -> VenueDetailResponse:
+    venue_id = venue.id
+    venue_engine.flush(venue_id)
     participants = (
         db.query(VenueParticipant, User)
         .join(User, VenueParticipant.user_id == User.id)
         .filter(VenueParticipant.venue_id == venue_id)
+        # Rows this session loaded before the flush would otherwise be returned as they were
+        .populate_existing()
         .all()
     )
-    round_complete = False
+    round_complete = _round_complete(_current_round(venue, db))
     ranking: list[RankingItem] = []
-    if participants and all(p.finished_at is not None for p, _ in participants):
-        has_results = (
-            db.query(VenueRoundResult)
-            .filter(
-                VenueRoundResult.venue_id == venue_id,
-                VenueRoundResult.round_number == venue.current_round,
-            )
-            .first()
-        )
-        if has_results:
-            round_complete = True
-            ranking = _ranking_for_venue_round(venue_id, venue.current_round, db)
+    if round_complete:
+        ranking = _ranking_for_venue_round(venue_id, venue.current_round, db)
     return VenueDetailResponse(
         id=venue.id,
         name=venue.name,
         current_round=venue.current_round,
+        state_version=venue.state_version,
         round_complete=round_complete,
         participants=[
             ParticipantState(
@@ -282,6 +400,114 @@ def get_venue(
     )
 
 
+def _publish_snapshot(venue_id: int, db: Session) -> None:
+    """Push the full venue state to its SSE subscribers, if it has any."""
+    if not venue_events.has_subscribers(venue_id):
+        return
+    venue = db.query(Venue).filter(Venue.id == venue_id).first()
+    if venue:
+        venue_events.publish(venue_id, "snapshot", _venue_detail(venue, db).model_dump())
+
+
+@router.get("/{venue_id}", response_model=VenueDetailResponse)
+def get_venue(
+    venue_id: int,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Get venue and all participants (user must be in venue). The ETag is the venue's state
+    version; a matching If-None-Match gets 304 without loading the participants."""
+    venue_engine.flush(venue_id)
+    # Venue and membership in one primary-key / unique-index lookup
+    row = db.execute(
+        select(Venue.state_version, VenueParticipant.id)
+        .outerjoin(
+            VenueParticipant,
+            (VenueParticipant.venue_id == Venue.id) & (VenueParticipant.user_id == current_user.id),
+        )
+        .where(Venue.id == venue_id)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Venue not found")
+    state_version, participant_id = row
+    if participant_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not in this venue; enter first",
+        )
+    etag = f'"{state_version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (t.strip().removeprefix("W/") for t in if_none_match.split(","))
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return _venue_detail(_get_venue_or_404(venue_id, db), db)
+
+
+def _member_snapshot(venue_id: int, user: CurrentUser) -> dict:
+    db = SessionLocal()
+    try:
+        venue = _get_venue_or_404(venue_id, db)
+        participant = (
+            db.query(VenueParticipant)
+            .filter(VenueParticipant.venue_id == venue_id, VenueParticipant.user_id == user.id)
+            .first()
+        )
+        if not participant:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not in this venue; enter first",
+            )
+        return _venue_detail(venue, db).model_dump()
+    finally:
+        db.close()
+
+
+async def _event_stream(sub: VenueSubscription, snapshot: dict):
+    try:
+        yield format_sse("snapshot", snapshot)
+        while True:
+            try:
+                payload = await asyncio.wait_for(
+                    sub.queue.get(), timeout=VENUE_EVENTS_KEEPALIVE_SECONDS
+                )
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if payload is None:
+                break
+            yield payload
+    finally:
+        venue_events.unsubscribe(sub)
+
+
+@router.get("/{venue_id}/events")
+async def venue_event_stream(
+    venue_id: int,
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+):
+    """Server-Sent Events: a ``snapshot`` of the venue on connect, then a ``participant``
+    event per roll and a fresh ``snapshot`` whenever someone enters, a round completes or a
+    new race starts. Holds no database connection between events."""
+    current_user = await run_in_threadpool(authenticate, credentials)
+    # Subscribe before reading the snapshot so no change can fall between the two
+    sub = venue_events.subscribe(venue_id)
+    try:
+        snapshot = await run_in_threadpool(_member_snapshot, venue_id, current_user)
+    except BaseException:
+        venue_events.unsubscribe(sub)
+        raise
+    return StreamingResponse(
+        _event_stream(sub, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 class RollBody(BaseModel):
     mode: str = "normal"
 
@@ -295,48 +521,168 @@ class RollResponse(BaseModel):
     gameOver: bool
 
 
-@router.post("/{venue_id}/roll", response_model=RollResponse)
+class RollBatchBody(BaseModel):
+    # "auto" rolls super while that cannot end the game, then normal
+    policy: Literal["normal", "super", "auto"] = "auto"
+    max_rolls: int = Field(ROLL_BATCH_MAX, ge=1, le=ROLL_BATCH_MAX)
+
+
+class BatchRollItem(RollResponse):
+    mode: str
+
+
+class RollBatchResponse(BaseModel):
+    rolls: list[BatchRollItem]
+    won: bool
+    gameOver: bool
+
+
+def _policy(policy: str):
+    if policy == "auto":
+        return lambda p: auto_mode(p.condition)
+    return lambda _p: policy
+
+
+@router.post(
+    "/{venue_id}/roll",
+    response_model=RollResponse,
+    dependencies=[Depends(limit_by_user(roll_limiter))],
+)
 def roll_dice(
     venue_id: int,
     body: RollBody,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """Roll dice (1-6 from server), apply rules, update participant state. Requires being in venue and not won/game_over."""
-    _get_venue_or_404(venue_id, db)
-    participant = (
-        db.query(VenueParticipant)
-        .filter(VenueParticipant.venue_id == venue_id, VenueParticipant.user_id == current_user.id)
-        .first()
+    mode = body.mode if body.mode in ("normal", "super") else "normal"
+    participant, rolls, round_complete = _roll(venue_id, current_user, _policy(mode), 1, db)
+    _after_roll(venue_id, current_user, participant, round_complete, db)
+    _mode, dice, result = rolls[0]
+    return _roll_response(dice, result)
+
+
+@router.post(
+    "/{venue_id}/roll_batch",
+    response_model=RollBatchResponse,
+    dependencies=[Depends(limit_by_user(roll_limiter))],
+)
+def roll_batch(
+    venue_id: int,
+    body: RollBatchBody,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Roll up to ``max_rolls`` times in one transaction, stopping early once won or game
+    over, choosing each roll's mode by ``policy``. Returns every roll in order."""
+    participant, rolls, round_complete = _roll(
+        venue_id, current_user, _policy(body.policy), body.max_rolls, db
     )
-    if not participant:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not in this venue; enter first",
+    _after_roll(venue_id, current_user, participant, round_complete, db)
+    return RollBatchResponse(
+        rolls=[
+            BatchRollItem(mode=mode, **_roll_response(dice, result).model_dump())
+            for mode, dice, result in rolls
+        ],
+        won=participant.won,
+        gameOver=participant.game_over,
+    )
+
+
+def _roll(
+    venue_id: int,
+    current_user: CurrentUser,
+    choose_mode: Callable[[VenueParticipant | ParticipantSnapshot], str],
+    max_rolls: int,
+    db: Session,
+) -> tuple[VenueParticipant | ParticipantSnapshot, list[tuple[str, int, dict]], bool]:
+    """Apply up to ``max_rolls`` rolls with server dice, stopping once the participant
+    finishes. Returns the participant's new state, (mode, dice, result) per roll and whether
+    the round is now complete."""
+    if venue_engine.enabled:
+        return _roll_in_memory(venue_id, current_user, choose_mode, max_rolls, db)
+    venue = _get_venue_or_404(venue_id, db)
+    for _attempt in range(ROLL_ATTEMPTS):
+        participant = (
+            db.query(VenueParticipant)
+            .filter(
+                VenueParticipant.venue_id == venue_id,
+                VenueParticipant.user_id == current_user.id,
+            )
+            .first()
         )
-    if participant.won:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Already won")
-    if participant.game_over:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Game over")
-    mode = body.mode if body.mode in ("normal", "super") else "normal"
-    dice = random.randint(1, 6)
-    result = engine_roll(
-        position=participant.position,
-        condition=participant.condition,
-        mode=mode,
-        dice=dice,
+        if not participant:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not in this venue; enter first",
+            )
+        if participant.won:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Already won")
+        if participant.game_over:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Game over")
+        rolls = []
+        now = _now()
+        while len(rolls) < max_rolls and participant.finished_at is None:
+            mode = choose_mode(participant)
+            dice = random.randint(1, 6)
+            rolls.append((mode, dice, apply_roll(participant, mode, dice, now)))
+        try:
+            # UPDATE ... WHERE version = <version read>; matches nothing if another roll by
+            # this user committed in between
+            db.flush()
+            _bump_state_version(venue_id, db)
+            round_complete = participant.finished_at is not None and _count_finisher(venue, db)
+            db.commit()
+            return participant, rolls, round_complete
+        except StaleDataError:
+            db.rollback()
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Too many concurrent rolls; try again",
     )
-    participant.roll_count += 1
-    participant.position = result["newPosition"]
-    participant.condition = result["newCondition"]
-    participant.mode = mode
-    participant.won = result["won"]
-    participant.game_over = result["gameOver"]
-    if result["won"] or result["gameOver"]:
-        if participant.finished_at is None:
-            participant.finished_at = _now()
-    db.commit()
-    _maybe_snapshot_round(venue_id, db)
+
+
+def _roll_in_memory(
+    venue_id: int,
+    current_user: CurrentUser,
+    choose_mode: Callable[[ParticipantSnapshot], str],
+    max_rolls: int,
+    db: Session,
+) -> tuple[ParticipantSnapshot, list[tuple[str, int, dict]], bool]:
+    dice = (random.randint(1, 6) for _ in range(max_rolls))
+    rolls, participant, round_complete = venue_engine.roll_many(
+        venue_id, current_user.id, choose_mode, dice
+    )
+    if round_complete:
+        # Rare: write the round back so its results can be recorded in the database
+        venue_engine.flush(venue_id)
+        round_complete = _recount_round(venue_id, db)
+    return participant, rolls, round_complete
+
+
+def _after_roll(
+    venue_id: int, current_user: CurrentUser, participant, round_complete: bool, db: Session
+) -> None:
+    if round_complete:
+        _publish_snapshot(venue_id, db)
+    elif venue_events.has_subscribers(venue_id):
+        venue_events.publish(
+            venue_id,
+            "participant",
+            ParticipantState(
+                user_id=current_user.id,
+                username=current_user.username,
+                position=participant.position,
+                condition=participant.condition,
+                mode=participant.mode,
+                won=participant.won,
+                game_over=participant.game_over,
+                roll_count=participant.roll_count,
+            ).model_dump(),
+        )
+
+
+def _roll_response(dice: int, result: dict) -> RollResponse:
     return RollResponse(
         dice=dice,
         steps=result["steps"],
@@ -356,10 +702,11 @@ class RoundItem(BaseModel):
 def start_new_race(
     venue_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """Start a new race (only when current round is complete). Resets all participants."""
     venue = _get_venue_or_404(venue_id, db)
+    venue_engine.flush(venue_id)
     participant = (
         db.query(VenueParticipant)
         .filter(VenueParticipant.venue_id == venue_id, VenueParticipant.user_id == current_user.id)
@@ -370,49 +717,65 @@ def start_new_race(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not in this venue; enter first",
         )
-    participants = (
-        db.query(VenueParticipant).filter(VenueParticipant.venue_id == venue_id).all()
-    )
-    if not participants or not all(p.finished_at is not None for p in participants):
+    if not _round_complete(_current_round(venue, db)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Round not complete; all participants must finish first",
         )
-    has_results = (
-        db.query(VenueRoundResult)
-        .filter(
-            VenueRoundResult.venue_id == venue_id,
-            VenueRoundResult.round_number == venue.current_round,
-        )
-        .first()
-    )
-    if not has_results:
+    new_round = venue.current_round + 1
+    # Only one request moves the venue off this round; the rest match nothing
+    claimed = db.execute(
+        update(Venue)
+        .where(Venue.id == venue_id, Venue.current_round == venue.current_round)
+        .values(current_round=new_round, state_version=Venue.state_version + 1)
+    ).rowcount
+    if not claimed:
+        db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Round not complete",
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A new race has already been started",
         )
-    new_round = venue.current_round + 1
-    db.add(VenueRound(venue_id=venue_id, round_number=new_round, started_at=_now()))
-    venue.current_round = new_round
-    for p in participants:
-        p.position = 0
-        p.condition = 6
-        p.mode = "normal"
-        p.won = False
-        p.game_over = False
-        p.roll_count = 0
-        p.finished_at = None
+    # One statement for the whole venue; the version bump makes rolls that read the old
+    # state fail their versioned update and retry
+    reset = db.execute(
+        update(VenueParticipant)
+        .where(VenueParticipant.venue_id == venue_id)
+        .values(
+            position=0,
+            condition=INITIAL_CONDITION,
+            mode="normal",
+            won=False,
+            game_over=False,
+            roll_count=0,
+            finished_at=None,
+            version=VenueParticipant.version + 1,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.add(
+        VenueRound(
+            venue_id=venue_id,
+            round_number=new_round,
+            started_at=_now(),
+            participant_count=reset,
+        )
+    )
     db.commit()
+    venue_engine.evict(venue_id)
+    _publish_snapshot(venue_id, db)
     return {"current_round": new_round}
 
 
 @router.get("/{venue_id}/rounds")
 def list_rounds(
     venue_id: int,
+    response: Response,
+    after_id: int = 0,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    """List past rounds for this venue."""
+    """List past rounds for this venue, one page of round numbers after ``after_id``."""
     venue = _get_venue_or_404(venue_id, db)
     _ = (
         db.query(VenueParticipant)
@@ -426,10 +789,12 @@ def list_rounds(
         )
     rounds = (
         db.query(VenueRound)
-        .filter(VenueRound.venue_id == venue_id)
+        .filter(VenueRound.venue_id == venue_id, VenueRound.round_number > after_id)
         .order_by(VenueRound.round_number.asc())
+        .limit(limit + 1)
         .all()
     )
+    rounds = _page(response, rounds, limit, lambda r: r.round_number)
     return [
         RoundItem(
             round_number=r.round_number,
@@ -443,10 +808,13 @@ def list_rounds(
 def get_round_results(
     venue_id: int,
     round_number: int,
+    response: Response,
+    after_id: int = 0,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    """Get ranking results for a specific round."""
+    """Get ranking results for a specific round, one page of ranks after ``after_id``."""
     venue = _get_venue_or_404(venue_id, db)
     _ = (
         db.query(VenueParticipant)
@@ -458,4 +826,5 @@ def get_round_results(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not in this venue; enter first",
         )
-    return _ranking_for_venue_round(venue_id, round_number, db)
+    ranking = _ranking_for_venue_round(venue_id, round_number, db, after_id, limit + 1)
+    return _page(response, ranking, limit, lambda r: r.rank)
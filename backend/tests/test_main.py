@@ -1,14 +1,68 @@
 """Unit tests for the Meeting Plunger API."""
 
+import asyncio
+import hashlib
+import io
+import json
 import sys
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
+from tempfile import SpooledTemporaryFile
 
 # Add parent directory to path to import main
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import httpx
+import numpy as np
+import openai
+import pytest
+from fastapi import UploadFile
 from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy import event
 
+import auth
+import leaderboards
+import provisioning
+import rate_limit
+import routers.admin as admin_router
+import routers.auth as auth_router
+import routers.venues as venues_router
+import venue_events as venue_events_module
+from auth import token_cache
+from benchmarks import race_reset_bench, transcribe_bench
+from config import BCRYPT_ROUNDS
+from database import SessionLocal, engine
 from main import app
+from models.access_tokens import AccessToken
+from models.transcript_cache import TranscriptCacheEntry
+from models.transcription_job import JOB_RUNNING, TranscriptionJob
+from models.user import User
+from models.venue import Venue, VenueParticipant, VenueRound, VenueRoundResult
+from password_hashing import HasherBusyError, PasswordHasher, verify_password
+from provisioning import parse_users, provision_users
+from rate_limit import RateLimiter, parse_rate
+from token_sweeper import TokenSweeper
+from transcription import chunking, openai_backend
+from transcription.backends import FakeBackend, get_backend, parse_latency, set_backend_override
+from transcription.cache import TranscriptCache, transcript_cache
+from transcription.chunking import split_audio, stitch_texts, transcribe_chunked
+from transcription.executor import transcription_executor
+from transcription.ingest import (
+    MULTIPART_OVERHEAD_BYTES,
+    UploadSizeLimitMiddleware,
+    UploadTooLargeError,
+    spool_upload,
+)
+from transcription.jobs import job_pool
+from transcription.openai_client import OpenAIClientManager
+from transcription.preprocess import preprocess_audio
+from venue_engine import VenueEngine
+from venue_events import VenueEventHub, venue_events
 
 client = TestClient(app)
 
@@ -57,6 +111,580 @@ def test_transcribe_endpoint():
     client.post("/testability/mock", json={"enabled": False})
 
 
+def test_spool_upload_streams_hashes_and_rolls_to_disk():
+    """spool_upload copies in chunks, hashes the content and spills large uploads to disk."""
+    data = b"meeting audio " * 1000
+    upload = UploadFile(file=io.BytesIO(data), filename="long.wav")
+    audio = asyncio.run(spool_upload(upload, chunk_size=1024, max_memory=4096))
+    try:
+        assert audio.size == len(data)
+        assert audio.sha256 == hashlib.sha256(data).hexdigest()
+        assert audio.file._rolled is True
+        filename, handle, _ = audio.as_upload_tuple()
+        assert filename == "long.wav"
+        assert handle.read() == data
+    finally:
+        audio.close()
+
+
+def test_spool_upload_rejects_oversized_upload():
+    """spool_upload raises UploadTooLargeError once the size limit is crossed."""
+    upload = UploadFile(file=io.BytesIO(b"x" * 5000), filename="big.wav")
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_upload(upload, chunk_size=1024, max_bytes=4096))
+
+
+def test_upload_size_limit_refuses_body_before_it_is_received():
+    """Oversized uploads get 413 from Content-Length, or as soon as a chunked body crosses
+    the limit, without the endpoint reading the rest."""
+    received = []
+
+    async def endpoint(scope, receive, send):
+        while True:
+            message = await receive()
+            received.append(len(message.get("body", b"")))
+            if not message.get("more_body"):
+                break
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    limited = UploadSizeLimitMiddleware(endpoint, paths=("/upload",), max_bytes=1000)
+    limit = 1000 + MULTIPART_OVERHEAD_BYTES
+    chunk = b"x" * 16 * 1024
+
+    async def chunks():
+        for _ in range(100):
+            yield chunk
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=limited)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            declared = await ac.post("/upload", content=b"x" * (limit + 1))
+            assert received == []
+            streamed = await ac.post("/upload", content=chunks())
+            # Reading stopped at the chunk that crossed the limit
+            assert limit - len(chunk) < sum(received) <= limit
+            small = await ac.post("/upload", content=b"x" * 500)
+            other = await ac.post("/other", content=b"x" * (limit + 1))
+            return small, declared, streamed, other
+
+    small, declared, streamed, other = asyncio.run(scenario())
+    assert small.status_code == 200 and other.status_code == 200
+    assert declared.status_code == 413 and streamed.status_code == 413
+    assert "1000 bytes" in declared.json()["detail"]
+    assert any(m.cls is UploadSizeLimitMiddleware for m in app.user_middleware)
+
+
+def test_spool_upload_reuses_starlette_spooled_file():
+    """An upload Starlette has already spooled is hashed in place, not copied again."""
+    spooled = SpooledTemporaryFile()
+    spooled.write(b"meeting audio")
+    upload = UploadFile(file=spooled, filename="m.wav")
+    audio = asyncio.run(spool_upload(upload))
+    assert audio.file is spooled
+    assert (audio.size, audio.sha256) == (13, hashlib.sha256(b"meeting audio").hexdigest())
+    assert audio.file.read() == b"meeting audio"
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_upload(upload, max_bytes=4))
+
+
+def test_health_responds_while_transcriptions_in_flight(monkeypatch):
+    """Slow transcriptions run on the bounded pool and never block /health."""
+    client.post("/testability/reset-db")
+    client.post("/testability/mock", json={"enabled": False})
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def slow_transcribe(audio):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.5)
+        with lock:
+            state["active"] -= 1
+        return f"transcript of {audio.filename}"
+
+    monkeypatch.setattr(openai_backend, "transcribe", slow_transcribe)
+    in_flight = transcription_executor.max_workers + 2
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            uploads = [
+                asyncio.create_task(
+                    ac.post("/transcribe", files={"file": (f"m{i}.wav", b"m%d" % i, "audio/wav")})
+                )
+                for i in range(in_flight)
+            ]
+            await asyncio.sleep(0.1)
+            started = time.perf_counter()
+            health = await ac.get("/health")
+            health_latency = time.perf_counter() - started
+            return health, health_latency, await asyncio.gather(*uploads)
+
+    health, health_latency, responses = asyncio.run(scenario())
+    assert health.status_code == 200
+    assert health_latency < 0.25
+    assert sorted(r.json()["transcript"] for r in responses) == sorted(
+        f"transcript of m{i}.wav" for i in range(in_flight)
+    )
+    assert state["peak"] == transcription_executor.max_workers
+
+
+def _wait_for_job(job_id: str, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        data = client.get(f"/transcriptions/{job_id}").json()
+        if data["status"] in ("done", "failed") or time.monotonic() > deadline:
+            return data
+        time.sleep(0.05)
+
+
+def test_transcription_job_runs_in_background():
+    """POST /transcriptions returns a job id at once; GET reports the finished transcript."""
+    client.post("/testability/reset-db")
+    client.post("/testability/mock", json={"enabled": True, "transcript": "Queued hello"})
+    try:
+        files = {"file": ("meeting.wav", b"dummy audio content", "audio/wav")}
+        response = client.post("/transcriptions", files=files)
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+        assert response.json()["status"] == "queued"
+        data = _wait_for_job(job_id)
+        assert data["status"] == "done"
+        assert data["transcript"] == "Queued hello"
+        assert data["filename"] == "meeting.wav"
+    finally:
+        client.post("/testability/mock", json={"enabled": False})
+
+
+def test_transcription_job_unknown_id_returns_404():
+    """GET /transcriptions/{id} returns 404 for an unknown job."""
+    client.post("/testability/reset-db")
+    assert client.get("/transcriptions/does-not-exist").status_code == 404
+
+
+def test_transcription_jobs_resume_after_restart(tmp_path):
+    """Jobs left running by a previous process are requeued and finished by resume()."""
+    client.post("/testability/reset-db")
+    client.post("/testability/mock", json={"enabled": True, "transcript": "Resumed"})
+    try:
+        audio_path = tmp_path / "interrupted"
+        audio_path.write_bytes(b"dummy audio content")
+        db = SessionLocal()
+        try:
+            db.add(
+                TranscriptionJob(
+                    id="interrupted0000000000000000000000",
+                    status=JOB_RUNNING,
+                    filename="interrupted.wav",
+                    content_type="audio/wav",
+                    audio_path=str(audio_path),
+                    audio_sha256=hashlib.sha256(b"dummy audio content").hexdigest(),
+                    size_bytes=19,
+                    attempts=1,
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+        assert job_pool.resume() >= 1
+        data = _wait_for_job("interrupted0000000000000000000000")
+        assert data["status"] == "done"
+        assert data["transcript"] == "Resumed"
+        assert not audio_path.exists()
+    finally:
+        client.post("/testability/mock", json={"enabled": False})
+
+
+def test_transcription_job_given_up_after_max_attempts(tmp_path):
+    """A job that was still running at its last allowed restart is failed, not requeued."""
+    client.post("/testability/reset-db")
+    audio_path = tmp_path / "poison"
+    audio_path.write_bytes(b"crashes the worker")
+    db = SessionLocal()
+    try:
+        db.add(
+            TranscriptionJob(
+                id="poison00000000000000000000000000",
+                status=JOB_RUNNING,
+                filename="poison.wav",
+                content_type="audio/wav",
+                audio_path=str(audio_path),
+                audio_sha256=hashlib.sha256(b"crashes the worker").hexdigest(),
+                size_bytes=18,
+                attempts=job_pool.max_attempts,
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+    assert job_pool.resume() == 0
+    data = client.get("/transcriptions/poison00000000000000000000000000").json()
+    assert data["status"] == "failed"
+    assert "attempts" in data["error"]
+    assert not audio_path.exists()
+
+
+def _synthetic_wav(pattern, rate=8000, channels=1):
+    """Build a 16-bit WAV from (seconds, is_tone) pairs: 440 Hz tone or silence."""
+    parts = []
+    for seconds, tone in pattern:
+        t = np.arange(int(seconds * rate)) / rate
+        parts.append(0.5 * np.sin(2 * np.pi * 440 * t) if tone else np.zeros_like(t))
+    samples = (np.concatenate(parts) * 32767).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(np.repeat(samples, channels).tobytes())
+    return buf.getvalue()
+
+
+def _spooled(data: bytes, filename: str = "meeting.wav"):
+    upload = UploadFile(file=io.BytesIO(data), filename=filename, headers={})
+    return asyncio.run(spool_upload(upload))
+
+
+def test_split_audio_cuts_in_silence():
+    """Segments stay under the limit and cuts land inside the silent gaps."""
+    data = _synthetic_wav([(1.5, True), (0.4, False), (1.5, True), (0.4, False), (1.5, True)])
+    audio = _spooled(data)
+    segments = split_audio(audio, max_segment_seconds=2.0, search_seconds=1.0)
+    assert len(segments) == 3
+    assert [s.index for s in segments] == [0, 1, 2]
+    assert segments[0].start == 0.0
+    for prev, nxt in zip(segments, segments[1:], strict=False):
+        assert prev.end == nxt.start
+    assert 1.5 <= segments[0].end <= 1.9
+    assert 3.4 <= segments[1].end <= 3.8
+    for seg in segments:
+        assert seg.end - seg.start <= 2.0
+        with wave.open(seg.audio.file, "rb") as w:
+            assert abs(w.getnframes() / w.getframerate() - (seg.end - seg.start)) < 0.001
+        seg.audio.file.seek(0)
+
+
+def test_split_audio_passes_through_non_wav_and_short_audio():
+    """Non-WAV input and audio shorter than the limit stay a single segment."""
+    for data in (b"not a wav file", _synthetic_wav([(1.0, True)])):
+        audio = _spooled(data)
+        segments = split_audio(audio, max_segment_seconds=2.0)
+        assert len(segments) == 1
+        assert segments[0].audio is audio
+
+
+def test_stitch_texts_removes_seam_overlap():
+    """Words repeated across a forced cut are kept only once."""
+    assert stitch_texts(["we should ship the release", "the release on Friday"]) == (
+        "we should ship the release on Friday"
+    )
+    assert stitch_texts(["one two", "three four"]) == "one two three four"
+    stitched = stitch_texts(["今天我们讨论发布计划", "发布计划和时间表"])
+    assert stitched == "今天我们讨论发布计划和时间表"
+
+
+def test_transcribe_chunked_runs_segments_concurrently_in_order(monkeypatch):
+    """Segments are transcribed in parallel and the text is stitched in segment order."""
+    audio = _spooled(_synthetic_wav([(1.5, True), (0.4, False)] * 3 + [(1.5, True)]))
+
+    def small_split(a):
+        return split_audio(a, max_segment_seconds=2.0, search_seconds=1.0)
+
+    def slow_transcribe(seg_audio):
+        time.sleep(0.3)
+        return seg_audio.filename
+
+    monkeypatch.setattr(chunking, "split_audio", small_split)
+    started = time.perf_counter()
+    text = asyncio.run(transcribe_chunked(audio, slow_transcribe, parallelism=4))
+    elapsed = time.perf_counter() - started
+    assert text == " ".join(f"meeting.part{i:03d}.wav" for i in range(4))
+    assert elapsed < 0.9
+
+
+def test_transcribe_repeat_upload_served_from_cache(monkeypatch):
+    """A second upload of the same audio is answered from the cache, memory or database."""
+    client.post("/testability/reset-db")
+    client.post("/testability/mock", json={"enabled": False})
+    calls = []
+
+    def counting_transcribe(audio):
+        calls.append(audio.sha256)
+        return "cached transcript"
+
+    monkeypatch.setattr(openai_backend, "transcribe", counting_transcribe)
+    files = {"file": ("again.wav", b"same recording bytes", "audio/wav")}
+    first = client.post("/transcribe", files=files)
+    second = client.post("/transcribe", files=files)
+    transcript_cache.clear_memory()
+    third = client.post("/transcribe", files=files)
+    assert [r.json()["transcript"] for r in (first, second, third)] == ["cached transcript"] * 3
+    assert len(calls) == 1
+    stats = client.get("/metrics").json()["transcript_cache"]
+    assert stats["memory"]["hits"] >= 1
+    assert stats["persistent_hits"] >= 1
+
+
+def test_transcript_cache_evicts_least_recently_used_rows():
+    """The database tier keeps at most max_entries rows, dropping the least recently used."""
+    client.post("/testability/reset-db")
+    cache = TranscriptCache(memory_entries=1, max_entries=2, ttl_seconds=3600, evict_every=1)
+    cache.put("a" * 64, "m", "A", 1)
+    cache.put("b" * 64, "m", "B", 1)
+    assert cache.get_persistent("a" * 64, "m") == "A"
+    cache.put("c" * 64, "m", "C", 1)
+    cache.clear_memory()
+    assert cache.get("a" * 64, "m") == "A"
+    assert cache.get("b" * 64, "m") is None
+    assert cache.get("c" * 64, "m") == "C"
+    assert cache.stats()["persistent_evictions"] == 1
+
+
+def test_transcript_cache_sweeps_every_n_stores_and_promotes_with_remaining_ttl():
+    """Stores only count rows every evict_every writes; a row promoted into memory expires
+    when it would have in the database, not a full TTL later."""
+    client.post("/testability/reset-db")
+    cache = TranscriptCache(memory_entries=4, max_entries=1, ttl_seconds=1.0, evict_every=3)
+    statements = []
+
+    def record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for sha in ("a", "b"):
+            cache.put(sha * 64, "m", sha.upper(), 1)
+        assert not any("count(*)" in s for s in statements)
+        cache.put("c" * 64, "m", "C", 1)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert sum("count(*)" in s for s in statements) == 1
+    assert cache.stats()["persistent_evictions"] == 2
+
+    db = SessionLocal()
+    try:
+        row = db.get(TranscriptCacheEntry, ("c" * 64, "m"))
+        row.created_at -= timedelta(seconds=0.8)
+        db.commit()
+    finally:
+        db.close()
+    cache.clear_memory()
+    assert cache.get_persistent("c" * 64, "m") == "C"
+    assert cache.get_memory("c" * 64, "m") == "C"
+    time.sleep(0.3)
+    assert cache.get_memory("c" * 64, "m") is None
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_transcribe_stream_emits_segments_then_full_transcript(monkeypatch):
+    """POST /transcribe/stream sends one SSE event per segment and a final done event."""
+    client.post("/testability/reset-db")
+    client.post("/testability/mock", json={"enabled": False})
+    data = _synthetic_wav([(1.5, True), (0.4, False)] * 2 + [(1.5, True)])
+    monkeypatch.setattr(
+        chunking,
+        "split_audio",
+        lambda a: split_audio(a, max_segment_seconds=2.0, search_seconds=1.0),
+    )
+    monkeypatch.setattr(openai_backend, "transcribe", lambda a: f"text of {a.filename}")
+    response = client.post("/transcribe/stream", files={"file": ("talk.wav", data, "audio/wav")})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    segments = [d for name, d in events if name == "segment"]
+    assert sorted(d["index"] for d in segments) == [0, 1, 2]
+    assert all(d["segment_count"] == 3 for d in segments)
+    first = next(d for d in segments if d["index"] == 0)
+    assert first["start"] == 0.0
+    assert first["text"] == "text of talk.part000.wav"
+    assert events[-1] == (
+        "done",
+        {"transcript": " ".join(f"text of talk.part{i:03d}.wav" for i in range(3))},
+    )
+    # The plain JSON endpoint is unchanged and now served from the cache
+    plain = client.post("/transcribe", files={"file": ("talk.wav", data, "audio/wav")})
+    assert plain.json() == {"transcript": events[-1][1]["transcript"]}
+
+
+def test_openai_client_is_shared_and_retries_429_and_5xx():
+    """One pooled client serves every call; 429/5xx are retried with backoff, 4xx are not."""
+    statuses = iter([429, 503, 200, 400])
+    delays = []
+
+    def handler(request):
+        code = next(statuses)
+        if code == 200:
+            return httpx.Response(200, json={"text": "pooled"})
+        return httpx.Response(code, headers={"retry-after": "0"}, json={"error": {}})
+
+    manager = OpenAIClientManager(
+        api_key="test-key", transport=httpx.MockTransport(handler), sleep=delays.append
+    )
+
+    def create(c):
+        return c.audio.transcriptions.create(
+            model="gpt-4o-mini-transcribe", file=("a.wav", b"abc", "audio/wav")
+        )
+
+    assert manager.call(create).text == "pooled"
+    with pytest.raises(openai.BadRequestError):
+        manager.call(create)
+    stats = manager.stats()
+    assert stats["clients_created"] == 1
+    assert stats["calls"] == 2
+    assert stats["retries"] == 2
+    assert stats["failures"] == 1
+    assert stats["http_requests"] == 4
+    assert len(delays) == 2
+    assert all(0 <= d <= manager.retry_max_delay for d in delays)
+    manager.close()
+
+
+def test_preprocess_downmixes_resamples_and_trims_wav():
+    """48 kHz stereo WAV becomes 16 kHz mono with leading/trailing silence trimmed."""
+    data = _synthetic_wav([(1.0, False), (2.0, True), (1.0, False)], rate=48000, channels=2)
+    audio = _spooled(data)
+    processed, offset = preprocess_audio(audio, padding=0.1)
+    assert processed is not audio
+    assert processed.size < audio.size / 6
+    assert abs(offset - 0.9) < 0.03
+    with wave.open(processed.file, "rb") as w:
+        assert (w.getnchannels(), w.getsampwidth(), w.getframerate()) == (1, 2, 16000)
+        duration = w.getnframes() / w.getframerate()
+        samples = np.frombuffer(w.readframes(w.getnframes()), dtype="<i2")
+    assert abs(duration - 2.2) < 0.05
+    spectrum = np.abs(np.fft.rfft(samples))
+    peak_hz = np.argmax(spectrum) * 16000 / len(samples)
+    assert abs(peak_hz - 440) < 5
+
+
+def test_preprocess_resampling_rejects_content_above_output_nyquist():
+    """Downsampling 48 kHz to 16 kHz keeps speech-band tones and attenuates tones above
+    8 kHz by at least 60 dB instead of aliasing them into the speech band."""
+
+    def tone_rms(hz: float, rate: int = 48000) -> float:
+        t = np.arange(rate) / rate
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(rate)
+            w.writeframes((0.5 * np.sin(2 * np.pi * hz * t) * 32767).astype("<i2").tobytes())
+        processed, _ = preprocess_audio(_spooled(buf.getvalue()), padding=0.0)
+        with wave.open(processed.file, "rb") as w:
+            assert w.getframerate() == 16000
+            assert abs(w.getnframes() - 16000) <= 1
+            samples = np.frombuffer(w.readframes(w.getnframes()), dtype="<i2") / 32768
+        core = samples[1000:-1000]
+        return float(np.sqrt(np.mean(core**2)))
+
+    passband = 0.5 / np.sqrt(2)
+    assert tone_rms(1000) == pytest.approx(passband, rel=0.01)
+    assert tone_rms(6000) == pytest.approx(passband, rel=0.01)
+    for hz in (9000, 12000, 20000):
+        assert 20 * np.log10(max(tone_rms(hz), 1e-9) / passband) < -60
+
+
+def test_preprocess_passes_through_non_wav_and_can_be_disabled(monkeypatch):
+    """Non-WAV audio is untouched, and ?preprocess=false sends the upload as received."""
+    audio = _spooled(b"not a wav file", filename="clip.m4a")
+    assert preprocess_audio(audio) == (audio, 0.0)
+
+    client.post("/testability/reset-db")
+    client.post("/testability/mock", json={"enabled": False})
+    seen = []
+    monkeypatch.setattr(openai_backend, "transcribe", lambda a: seen.append(a.size) or "ok")
+    data = _synthetic_wav([(0.5, False), (1.0, True)], rate=48000, channels=2)
+    client.post("/transcribe?preprocess=false", files={"file": ("raw.wav", data, "audio/wav")})
+    transcript_cache.clear_memory()
+    client.post("/testability/reset-db")
+    client.post("/transcribe", files={"file": ("raw.wav", data, "audio/wav")})
+    assert seen[0] == len(data)
+    assert seen[1] < len(data) / 6
+
+
+def test_transcription_jobs_use_preprocessing_and_transcript_cache(monkeypatch):
+    """Jobs send the preprocessed WAV upstream and share the transcript cache with
+    /transcribe, so identical audio is paid for once."""
+    client.post("/testability/reset-db")
+    client.post("/testability/mock", json={"enabled": False})
+    transcript_cache.clear_memory()
+    seen = []
+    monkeypatch.setattr(openai_backend, "transcribe", lambda a: seen.append(a.size) or "once")
+    data = _synthetic_wav([(0.5, False), (1.0, True)], rate=48000, channels=2)
+    files = {"file": ("raw.wav", data, "audio/wav")}
+    job_id = client.post("/transcriptions", files=files).json()["id"]
+    assert _wait_for_job(job_id)["transcript"] == "once"
+    assert len(seen) == 1 and seen[0] < len(data) / 6
+    assert client.post("/transcribe", files=files).json()["transcript"] == "once"
+    job_id = client.post("/transcriptions", files=files).json()["id"]
+    assert _wait_for_job(job_id)["transcript"] == "once"
+    assert len(seen) == 1
+
+
+def test_parse_latency_specs():
+    """Latency specs cover fixed, distributions and audio-length-proportional delays."""
+    assert parse_latency("fixed:0.25")(100) == 0.25
+    assert 0.1 <= parse_latency("uniform:0.1,0.2")(0) <= 0.2
+    assert parse_latency("normal:0.5,0")(0) == 0.5
+    assert parse_latency("per_second:0.01,0.5")(60) == pytest.approx(1.1)
+    with pytest.raises(ValueError):
+        parse_latency("sometimes:1")
+    with pytest.raises(ValueError):
+        parse_latency("uniform:1")
+
+
+def test_fake_backend_is_deterministic_per_file_with_simulated_latency():
+    """The fake backend's text depends only on the audio hash; latency scales with length."""
+    client.post("/testability/reset-db")
+    set_backend_override(FakeBackend(latency="per_second:0.1"))
+    try:
+        wav = _synthetic_wav([(2.0, True)])
+        started = time.perf_counter()
+        first = client.post(
+            "/transcribe?preprocess=false", files={"file": ("a.wav", wav, "audio/wav")}
+        )
+        elapsed = time.perf_counter() - started
+        other = client.post("/transcribe", files={"file": ("b.wav", b"other bytes", "audio/wav")})
+        expected = FakeBackend.text_for(hashlib.sha256(wav).hexdigest())
+        assert first.json()["transcript"] == expected
+        assert other.json()["transcript"] != expected
+        assert elapsed >= 0.2
+        assert client.get("/metrics").json()["transcription_backend"] == "fake"
+    finally:
+        set_backend_override(None)
+    assert get_backend().name == "openai"
+
+
+def test_transcribe_benchmark_reports_and_detects_regressions():
+    """The benchmark harness runs in-process and flags throughput/p99 regressions."""
+    client.post("/testability/reset-db")
+    results = asyncio.run(
+        transcribe_bench.run_benchmark([1.0], [2], requests=4, latency="fixed:0.05")
+    )
+    (scenario,) = results["scenarios"]
+    assert scenario["errors"] == 0
+    assert scenario["throughput_rps"] > 0
+    assert scenario["latency_ms"]["p50"] >= 50
+    assert scenario["peak_rss_mb"] > 0
+    assert set(scenario["loop_lag_ms"]) == {"p99", "max"}
+    assert transcribe_bench.compare(results, results, 0.1) == []
+    slower = json.loads(json.dumps(results))
+    slower["scenarios"][0]["throughput_rps"] /= 2
+    slower["scenarios"][0]["latency_ms"]["p99"] *= 2
+    assert len(transcribe_bench.compare(slower, results, 0.1)) == 2
+    assert get_backend().name == "openai"
+
+
 def test_reset_db():
     """Test the reset-db testability endpoint."""
     response = client.post("/testability/reset-db")
@@ -135,6 +763,291 @@ def test_login_unknown_user():
     assert response.status_code == 401
 
 
+def _set_token_times(token: str, **values) -> None:
+    db = SessionLocal()
+    try:
+        db.query(AccessToken).filter(AccessToken.token == token).update(values)
+        db.commit()
+    finally:
+        db.close()
+    token_cache.clear()
+
+
+def test_access_token_expires_and_slides_on_use():
+    """Expired tokens are rejected; a token in use has its expiry pushed forward."""
+    token = _register_and_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    now = datetime.utcnow()
+    _set_token_times(
+        token, expires_at=now + timedelta(minutes=5), last_used_at=now - timedelta(days=1)
+    )
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    db = SessionLocal()
+    try:
+        access = db.get(AccessToken, token)
+        assert access.expires_at > now + timedelta(days=1)
+        assert access.last_used_at >= now
+    finally:
+        db.close()
+
+    _set_token_times(token, expires_at=now - timedelta(seconds=1))
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_token_sweeper_deletes_expired_tokens_in_batches():
+    """The sweeper removes only expired rows, a batch per transaction."""
+    client.post("/testability/reset-db")
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        db.add(User(id=1, username="sweep", password_hash="x"))
+        for i in range(5):
+            db.add(AccessToken(token=f"old{i}", user_id=1, expires_at=now - timedelta(hours=1)))
+        db.add(AccessToken(token="live", user_id=1, expires_at=now + timedelta(hours=1)))
+        db.commit()
+    finally:
+        db.close()
+    sweeper = TokenSweeper(batch_size=2)
+    assert sweeper.sweep_once(now) == 5
+    assert sweeper.stats()["deleted"] == 5
+    db = SessionLocal()
+    try:
+        assert [t.token for t in db.query(AccessToken)] == ["live"]
+    finally:
+        db.close()
+
+
+def test_signed_token_verified_without_queries_and_revocable(monkeypatch):
+    """Signed tokens authenticate with zero queries; logout deny-lists them everywhere."""
+    opaque = _register_and_token()
+    monkeypatch.setattr(auth, "ACCESS_TOKEN_FORMAT", "signed")
+    r = client.post("/auth/login", json={"username": "alice", "password": "secret123"})
+    token = r.json()["token"]
+    assert token.startswith("v1.")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        assert client.get("/auth/me", headers=headers).json()["username"] == "alice"
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert statements == []
+
+    # Opaque tokens issued before the switch keep working
+    def me_status(t: str) -> int:
+        return client.get("/auth/me", headers={"Authorization": f"Bearer {t}"}).status_code
+
+    assert me_status(opaque) == 200
+
+    body, _, signature = token.rpartition(".")
+    tampered = body[:-2] + ("A" if body[-2] != "A" else "B") + body[-1] + "." + signature
+    assert me_status(tampered) == 401
+    assert me_status(auth.create_signed_token(1, "alice", ttl=-1)) == 401
+    # Headers arrive latin-1 decoded; a non-ASCII token is rejected, not a 500
+    r = client.get("/auth/me", headers={"Authorization": "Bearer v1.\xe9abc.def".encode("latin-1")})
+    assert r.status_code == 401
+    assert auth.verify_signed_token("v1.\xe9abc.def") is None
+
+    assert client.post("/auth/logout", headers=headers).status_code == 204
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    # Another process learns about the revocation from the table
+    auth.token_denylist.clear()
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    auth.token_denylist.refresh()
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_signed_tokens_revoked_when_user_deleted(monkeypatch):
+    """Deleting a user deny-lists every signed token issued to them."""
+    client.post("/testability/reset-db")
+    monkeypatch.setattr(auth, "ACCESS_TOKEN_FORMAT", "signed")
+    r = client.post("/auth/register", json={"username": "bob", "password": "secret123"})
+    headers = {"Authorization": f"Bearer {r.json()['token']}"}
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    db = SessionLocal()
+    try:
+        db.delete(db.query(User).filter(User.username == "bob").one())
+        db.commit()
+    finally:
+        db.close()
+    auth.token_denylist.clear()
+    auth.token_denylist.refresh()
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_rate_limiter_token_bucket_refills():
+    """A bucket admits ``capacity`` requests, then refills at capacity/per_seconds."""
+    now = [0.0]
+    limiter = RateLimiter("test", "2/10", max_keys=2, clock=lambda: now[0])
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == pytest.approx(5.0)
+    assert limiter.acquire("b") == 0
+    now[0] = 5.0
+    assert limiter.acquire("a") == 0
+    limiter.acquire("c")
+    assert limiter.stats()["keys"] == 2
+    assert (limiter.allowed, limiter.rejected) == (5, 1)
+    with pytest.raises(ValueError):
+        parse_rate("ten per minute")
+
+
+def test_login_and_roll_rate_limited_with_retry_after(monkeypatch):
+    """Over-limit requests get 429 with Retry-After and are counted in /metrics."""
+    token = _register_and_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    monkeypatch.setattr(rate_limit.login_limiter, "capacity", 1)
+    login = {"username": "alice", "password": "secret123"}
+    assert client.post("/auth/login", json=login).status_code == 200
+    response = client.post("/auth/login", json=login)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    # Another username from the same client has its own bucket
+    assert client.post("/auth/login", json={**login, "username": "bob"}).status_code == 401
+
+    venue_id = client.get("/venues", headers=headers).json()[0]["id"]
+    client.post(f"/venues/{venue_id}/enter", headers=headers)
+    monkeypatch.setattr(rate_limit.roll_limiter, "capacity", 1)
+    roll = client.post(f"/venues/{venue_id}/roll", json={"mode": "normal"}, headers=headers)
+    assert roll.status_code == 200
+    roll = client.post(f"/venues/{venue_id}/roll", json={"mode": "normal"}, headers=headers)
+    assert roll.status_code == 429
+    limits = client.get("/metrics").json()["rate_limits"]
+    assert limits["login"]["rejected"] >= 1
+    assert limits["roll"]["rejected"] >= 1
+
+
+def test_transcription_jobs_share_the_transcribe_limit(monkeypatch):
+    """POST /transcriptions draws on the same per-IP bucket as /transcribe."""
+    client.post("/testability/reset-db")
+    client.post("/testability/mock", json={"enabled": True, "transcript": "limited"})
+    monkeypatch.setattr(rate_limit.transcribe_limiter, "capacity", 1)
+    try:
+        files = {"file": ("meeting.wav", b"dummy audio content", "audio/wav")}
+        assert client.post("/transcribe", files=files).status_code == 200
+        response = client.post("/transcriptions", files=files)
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+    finally:
+        client.post("/testability/mock", json={"enabled": False})
+        rate_limit.transcribe_limiter.reset()
+
+
+def test_bulk_provisioning_reports_conflicts_per_row(monkeypatch):
+    """Bulk import creates new users and lists invalid, duplicate and existing rows."""
+    _register_and_token("alice")
+    monkeypatch.setattr(admin_router, "PROVISIONING_API_KEY", "k3y")
+    body = "username,password\ncarol,pw1\nalice,pw2\ndave,pw3\ncarol,pw4\n,pw5\n"
+    headers = {"Content-Type": "text/csv"}
+    assert client.post("/admin/users/bulk", content=body, headers=headers).status_code == 403
+    headers["X-Provisioning-Key"] = "k3y"
+    r = client.post("/admin/users/bulk", content=body, headers=headers)
+    assert r.status_code == 200
+    report = r.json()
+    assert (report["total"], report["created"]) == (5, 2)
+    assert [(c["row"], c["reason"]) for c in report["conflicts"]] == [
+        (2, "exists"),
+        (4, "duplicate"),
+        (5, "invalid"),
+    ]
+    login = client.post("/auth/login", json={"username": "dave", "password": "pw3"})
+    assert login.status_code == 200
+
+    bad = client.post(
+        "/admin/users/bulk?format=json", content="{}", headers={"X-Provisioning-Key": "k3y"}
+    )
+    assert bad.status_code == 400
+    bad = client.post(
+        "/admin/users/bulk",
+        content=b"username,password\n\xffbad,pw\n",
+        headers={"Content-Type": "text/csv", "X-Provisioning-Key": "k3y"},
+    )
+    assert bad.status_code == 400
+    assert "UTF-8" in bad.json()["detail"]
+
+
+def test_provision_users_batches_and_survives_concurrent_registration(monkeypatch):
+    """A batch that hits a username taken after the up-front check is retried row by row."""
+    client.post("/testability/reset-db")
+    users = [{"username": f"u{i}", "password": "pw"} for i in range(5)]
+    rows = parse_users(json.dumps(users), "json")
+    monkeypatch.setattr(provisioning, "_existing_usernames", lambda db, names: set())
+    db = SessionLocal()
+    try:
+        db.add(User(username="u3", password_hash="x"))
+        db.commit()
+    finally:
+        db.close()
+    report = provision_users(rows, rounds=4, workers=1, batch_size=2)
+    assert report.created == 4
+    assert [(c.row, c.username, c.reason) for c in report.conflicts] == [(4, "u3", "exists")]
+
+
+def test_password_hasher_rejects_when_queue_full_or_slow():
+    """The hashing pool admits at most max_pending calls and gives up after the timeout; a
+    call that timed out keeps its slot until it really finishes."""
+    hasher = PasswordHasher(workers=1, max_pending=1, processes=False)
+
+    async def two_at_once():
+        return await asyncio.gather(hasher.hash("a"), hasher.hash("b"), return_exceptions=True)
+
+    try:
+        first, second = asyncio.run(two_at_once())
+        assert verify_password("a", first)
+        assert isinstance(second, HasherBusyError)
+        hasher.timeout = 0.05
+        release = threading.Event()
+        with pytest.raises(HasherBusyError, match="timed out"):
+            asyncio.run(hasher._run(release.wait, 5))
+        assert hasher.stats()["pending"] == 1
+        with pytest.raises(HasherBusyError, match="full"):
+            asyncio.run(hasher.hash("c"))
+        release.set()
+        deadline = time.monotonic() + 5
+        while hasher.stats()["pending"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats = hasher.stats()
+        assert (stats["completed"], stats["rejected"], stats["timed_out"]) == (1, 2, 1)
+        assert stats["pending"] == 0
+    finally:
+        hasher.close()
+
+
+def test_login_returns_503_when_hashing_saturated(monkeypatch):
+    """Login answers 503 with Retry-After instead of queueing without bound."""
+    _register_and_token()
+    monkeypatch.setattr(auth_router.password_hasher, "max_pending", 0)
+    response = client.post("/auth/login", json={"username": "alice", "password": "secret123"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_rehashes_password_with_configured_cost():
+    """A hash made with another cost factor is replaced on the next successful login."""
+    client.post("/testability/reset-db")
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret123")
+    db = SessionLocal()
+    try:
+        db.add(User(username="legacy", password_hash=old_hash))
+        db.commit()
+    finally:
+        db.close()
+    response = client.post("/auth/login", json={"username": "legacy", "password": "secret123"})
+    assert response.status_code == 200
+    db = SessionLocal()
+    try:
+        new_hash = db.query(User).filter(User.username == "legacy").one().password_hash
+    finally:
+        db.close()
+    assert new_hash != old_hash
+    assert new_hash.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+
+
 def _register_and_token(username: str = "alice", password: str = "secret123"):
     """Reset DB, register user, return token."""
     client.post("/testability/reset-db")
@@ -143,6 +1056,40 @@ def _register_and_token(username: str = "alice", password: str = "secret123"):
     return r.json()["token"]
 
 
+def test_current_user_cached_and_invalidated_on_logout():
+    """Token lookups are served from the cache until logout revokes the token."""
+    token = _register_and_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    before = client.get("/metrics").json()["auth_cache"]
+    for _ in range(3):
+        assert client.get("/auth/me", headers=headers).json()["username"] == "alice"
+    after = client.get("/metrics").json()["auth_cache"]
+    assert after["hits"] - before["hits"] == 3
+    assert after["size"] >= 1
+
+    assert client.post("/auth/logout", headers=headers).status_code == 204
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_current_user_cache_dropped_when_user_deleted():
+    """Deleting a user invalidates their cached tokens immediately."""
+    token = _register_and_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == "alice").one()
+        for access in db.query(AccessToken).filter(AccessToken.user_id == user.id):
+            db.delete(access)
+        db.delete(user)
+        db.commit()
+    finally:
+        db.close()
+    assert token_cache.get(token) is None
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
 def test_venues_list_requires_auth():
     """GET /venues returns 401 without token."""
     client.post("/testability/reset-db")
@@ -224,6 +1171,39 @@ def test_get_venue_without_enter_returns_403():
     assert get_r.status_code == 403
 
 
+def test_get_venue_etag_revalidates_with_one_query():
+    """GET /venues/{id} sends the state version as ETag; an unchanged venue answers a matching
+    If-None-Match with 304 after a single lookup, and a roll changes the ETag."""
+    token = _register_and_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    venue_id = client.get("/venues", headers=headers).json()[0]["id"]
+    client.post(f"/venues/{venue_id}/enter", headers=headers)
+    first = client.get(f"/venues/{venue_id}", headers=headers)
+    etag = first.headers["etag"]
+    assert etag == f'"{first.json()["state_version"]}"'
+
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        cached = client.get(f"/venues/{venue_id}", headers={**headers, "If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert len(statements) == 1
+
+    client.post(f"/venues/{venue_id}/roll", json={"mode": "normal"}, headers=headers)
+    changed = client.get(f"/venues/{venue_id}", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["participants"][0]["roll_count"] == 1
+
+
 def test_roll_returns_dice_and_updates_state():
     """POST /venues/{id}/roll returns dice and updates participant state."""
     token = _register_and_token()
@@ -309,6 +1289,256 @@ def test_start_new_race_resets_participants():
     assert me["roll_count"] == 0
 
 
+def test_start_new_race_resets_venue_in_one_update():
+    """start_new_race resets every participant with one set-based UPDATE; the reset benchmark
+    runs in-process against it."""
+    results = asyncio.run(race_reset_bench.run_benchmark(300, 2, ["set", "orm"]))
+    assert [m["errors"] for m in results["modes"]] == [0, 0]
+    assert all(m["reset_ms"]["max"] > 0 for m in results["modes"])
+
+    db = SessionLocal()
+    try:
+        venue = db.query(Venue).one()
+        venue_id, current_round = venue.id, venue.current_round
+        member = db.query(VenueParticipant).filter_by(venue_id=venue_id).first()
+        headers = {"Authorization": f"Bearer {auth.issue_token(db, member.user_id, 'racer0')}"}
+        db.commit()
+    finally:
+        db.close()
+    race_reset_bench._finish_round(venue_id)
+    statements = []
+
+    def record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        r = client.post(f"/venues/{venue_id}/start_new_race", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert r.json() == {"current_round": current_round + 1}
+    assert sum(s.startswith("UPDATE venue_participants") for s in statements) == 1
+    assert len(statements) < 20
+
+    db = SessionLocal()
+    try:
+        participants = db.query(VenueParticipant).filter_by(venue_id=venue_id).all()
+        assert len(participants) == 300
+        states = {(p.position, p.condition, p.won, p.finished_at) for p in participants}
+        assert states == {(0, 6, False, None)}
+        assert {p.roll_count for p in participants} == {0}
+        new_round = (
+            db.query(VenueRound).filter_by(venue_id=venue_id, round_number=current_round + 1).one()
+        )
+        assert (new_round.participant_count, new_round.finished_count) == (300, 0)
+    finally:
+        db.close()
+    # The new round still has to be played before the next reset
+    assert client.post(f"/venues/{venue_id}/start_new_race", headers=headers).status_code == 400
+
+
+def test_round_completion_tracked_with_counters():
+    """Rolls keep per-round participant/finished counters instead of rescanning the venue;
+    only the roll that finishes the round reads every participant."""
+    token = _register_and_token()
+    alice = {"Authorization": f"Bearer {token}"}
+    venue_id = client.get("/venues", headers=alice).json()[0]["id"]
+    client.post(f"/venues/{venue_id}/enter", headers=alice)
+    r = client.post("/auth/register", json={"username": "bob", "password": "secret123"})
+    bob = {"Authorization": f"Bearer {r.json()['token']}"}
+    client.post(f"/venues/{venue_id}/enter", headers=bob)
+
+    def counters() -> tuple[int, int]:
+        db = SessionLocal()
+        try:
+            row = db.query(VenueRound).filter_by(venue_id=venue_id, round_number=1).one()
+            return row.participant_count, row.finished_count
+        finally:
+            db.close()
+
+    def roll(headers) -> dict:
+        r = client.post(f"/venues/{venue_id}/roll", json={"mode": "normal"}, headers=headers)
+        assert r.status_code == 200
+        return r.json()
+
+    assert counters() == (2, 0)
+    statements = []
+
+    def record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        roll(alice)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert not any("FROM venue_participants JOIN users" in s for s in statements)
+    assert not any("venue_round_results" in s for s in statements)
+
+    while not roll(alice)["won"]:
+        pass
+    assert counters() == (2, 1)
+    assert client.get(f"/venues/{venue_id}", headers=alice).json()["round_complete"] is False
+    while not roll(bob)["won"]:
+        pass
+    assert counters() == (2, 2)
+    data = client.get(f"/venues/{venue_id}", headers=alice).json()
+    assert data["round_complete"] is True
+    assert len(data["ranking"]) == 2
+
+
+def test_late_finisher_after_round_recorded_gets_result_and_snapshot(monkeypatch):
+    """A player who enters after the round's results were recorded and then finishes is
+    ranked after the others, and subscribers get a snapshot showing it."""
+    token = _register_and_token()
+    alice = {"Authorization": f"Bearer {token}"}
+    venue_id = client.get("/venues", headers=alice).json()[0]["id"]
+    client.post(f"/venues/{venue_id}/enter", headers=alice)
+
+    def roll(headers) -> dict:
+        r = client.post(f"/venues/{venue_id}/roll", json={"mode": "normal"}, headers=headers)
+        assert r.status_code == 200
+        return r.json()
+
+    while not roll(alice)["won"]:
+        pass
+    assert client.get(f"/venues/{venue_id}", headers=alice).json()["round_complete"] is True
+
+    r = client.post("/auth/register", json={"username": "bob", "password": "secret123"})
+    bob = {"Authorization": f"Bearer {r.json()['token']}"}
+    client.post(f"/venues/{venue_id}/enter", headers=bob)
+    assert client.get(f"/venues/{venue_id}", headers=alice).json()["round_complete"] is False
+
+    published = []
+    monkeypatch.setattr(venue_events, "has_subscribers", lambda _venue_id: True)
+    monkeypatch.setattr(
+        venue_events, "publish", lambda _venue_id, event, data: published.append((event, data))
+    )
+    while not roll(bob)["won"]:
+        pass
+    event_name, snapshot = published[-1]
+    assert event_name == "snapshot"
+    assert snapshot["round_complete"] is True
+    assert [(e["username"], e["rank"]) for e in snapshot["ranking"]] == [("alice", 1), ("bob", 2)]
+    data = client.get(f"/venues/{venue_id}", headers=alice).json()
+    assert data["round_complete"] is True
+    assert [e["username"] for e in data["ranking"]] == ["alice", "bob"]
+
+
+@pytest.mark.parametrize("portable", [False, True])
+def test_leaderboards_follow_recorded_rounds_and_rebuild(monkeypatch, portable):
+    """Completed rounds feed the per-venue and global leaderboards, through ON CONFLICT or the
+    update-then-insert path for other databases; a rebuild from venue_round_results gives the
+    same boards. A venue's board is for its participants."""
+    if portable:
+        monkeypatch.setattr(leaderboards, "_UPSERTS", {})
+    token = _register_and_token()
+    alice = {"Authorization": f"Bearer {token}"}
+    venue_id = client.get("/venues", headers=alice).json()[0]["id"]
+    r = client.post("/auth/register", json={"username": "bob", "password": "secret123"})
+    bob = {"Authorization": f"Bearer {r.json()['token']}"}
+    for headers in (alice, bob):
+        client.post(f"/venues/{venue_id}/enter", headers=headers)
+    assert client.get(f"/venues/{venue_id}/leaderboard", headers=alice).json() == []
+    assert client.get("/venues/9999/leaderboard", headers=alice).status_code == 404
+    r = client.post("/auth/register", json={"username": "carol", "password": "secret123"})
+    carol = {"Authorization": f"Bearer {r.json()['token']}"}
+    assert client.get(f"/venues/{venue_id}/leaderboard", headers=carol).status_code == 403
+
+    for round_number in (1, 2):
+        if round_number > 1:
+            r = client.post(f"/venues/{venue_id}/start_new_race", headers=alice)
+            assert r.status_code == 200
+        for headers in (alice, bob):
+            while True:
+                r = client.post(
+                    f"/venues/{venue_id}/roll", json={"mode": "normal"}, headers=headers
+                )
+                assert r.status_code == 200
+                if r.json()["won"] or r.json()["gameOver"]:
+                    break
+
+    db = SessionLocal()
+    try:
+        results = db.query(VenueRoundResult).filter_by(venue_id=venue_id).all()
+    finally:
+        db.close()
+    assert len(results) == 4
+    board = client.get(f"/venues/{venue_id}/leaderboard", headers=alice).json()
+    assert [e["rank"] for e in board] == [1, 2]
+    assert {e["username"] for e in board} == {"alice", "bob"}
+    for entry in board:
+        mine = [x for x in results if x.user_id == entry["user_id"]]
+        won = [x for x in mine if x.won]
+        assert entry["rounds_played"] == 2
+        assert entry["wins"] == len(won)
+        assert entry["mean_roll_count"] == sum(x.roll_count for x in mine) / 2
+        assert entry["best_roll_count"] == min((x.roll_count for x in won), default=None)
+    assert client.get("/leaderboard", headers=alice).json() == board
+    assert len(client.get("/leaderboard?limit=1", headers=alice).json()) == 1
+
+    db = SessionLocal()
+    try:
+        assert leaderboards.rebuild(db) == (2, 2)
+    finally:
+        db.close()
+    assert client.get(f"/venues/{venue_id}/leaderboard", headers=alice).json() == board
+    assert client.get("/leaderboard", headers=alice).json() == board
+
+
+def test_venue_lists_paginate_with_next_cursor():
+    """Venues, rounds and round results come in keyset pages linked by X-Next-Cursor."""
+    token = _register_and_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    for i in range(4):
+        client.post("/venues", json={"name": f"Venue {i}"}, headers=headers)
+    venue_id = client.get("/venues", headers=headers).json()[0]["id"]
+    client.post(f"/venues/{venue_id}/enter", headers=headers)
+    db = SessionLocal()
+    try:
+        racers = [User(username=f"racer{rank}", password_hash="!") for rank in range(1, 6)]
+        db.add_all(racers)
+        db.flush()
+        db.add_all(VenueRound(venue_id=venue_id, round_number=n) for n in range(2, 8))
+        db.add_all(
+            VenueRoundResult(
+                venue_id=venue_id,
+                round_number=1,
+                user_id=racer.id,
+                username=racer.username,
+                won=True,
+                roll_count=10 + rank,
+                duration_seconds=1.0,
+                rank=rank,
+            )
+            for rank, racer in enumerate(racers, start=1)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    def collect(path: str, key: str, limit: int) -> tuple[list, int]:
+        items, pages, cursor = [], 0, None
+        while True:
+            params = {"limit": limit} | ({"after_id": cursor} if cursor else {})
+            r = client.get(path, params=params, headers=headers)
+            assert r.status_code == 200
+            assert len(r.json()) <= limit
+            items += [item[key] for item in r.json()]
+            pages += 1
+            cursor = r.headers.get("x-next-cursor")
+            if cursor is None:
+                return items, pages
+
+    venue_ids, pages = collect("/venues", "id", 2)
+    assert venue_ids == sorted(venue_ids) and len(venue_ids) == 5 and pages == 3
+    rounds, pages = collect(f"/venues/{venue_id}/rounds", "round_number", 3)
+    assert rounds == list(range(1, 8)) and pages == 3
+    ranks, pages = collect(f"/venues/{venue_id}/rounds/1/results", "rank", 2)
+    assert ranks == [1, 2, 3, 4, 5] and pages == 3
+    assert client.get("/venues", params={"limit": 0}, headers=headers).status_code == 422
+
+
 def test_get_rounds_and_round_results():
     """GET /venues/:id/rounds and GET /venues/:id/rounds/:n/results return history."""
     token = _register_and_token()
@@ -344,3 +1574,307 @@ def test_get_rounds_and_round_results():
     assert len(results) == 1
     assert results[0]["username"] == "alice"
     assert results[0]["rank"] == 1
+
+
+def test_venue_events_stream_snapshot_then_deltas():
+    """GET /venues/{id}/events sends a snapshot on connect and a participant event per roll."""
+    token = _register_and_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    venue_id = client.get("/venues", headers=headers).json()[0]["id"]
+    client.post(f"/venues/{venue_id}/enter", headers=headers)
+    r = client.post("/auth/register", json={"username": "bob", "password": "secret123"})
+    outsider = {"Authorization": f"Bearer {r.json()['token']}"}
+    r = client.get(f"/venues/{venue_id}/events", headers=outsider)
+    assert r.status_code == 403
+    assert not venue_events.has_subscribers(venue_id)
+
+    result = {}
+    reader = threading.Thread(
+        target=lambda: result.update(r=client.get(f"/venues/{venue_id}/events", headers=headers))
+    )
+    reader.start()
+    deadline = time.monotonic() + 5
+    while not venue_events.has_subscribers(venue_id) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    roll = client.post(f"/venues/{venue_id}/roll", json={"mode": "normal"}, headers=headers).json()
+    venue_events.close(venue_id)
+    reader.join(timeout=5)
+
+    assert result["r"].headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(result["r"].text)
+    assert [name for name, _ in events] == ["snapshot", "participant"]
+    assert events[0][1]["participants"][0]["username"] == "alice"
+    assert events[1][1]["position"] == roll["newPosition"]
+    assert events[1][1]["roll_count"] == 1
+    assert not venue_events.has_subscribers(venue_id)
+
+
+def test_venue_event_hub_serializes_once_and_drops_slow_subscribers(monkeypatch):
+    monkeypatch.setattr(venue_events_module, "VENUE_EVENTS_QUEUE_SIZE", 2)
+    hub = VenueEventHub()
+
+    async def run():
+        fast, slow = hub.subscribe(1), hub.subscribe(1)
+        hub.publish(1, "participant", {"n": 1})
+        await asyncio.sleep(0)
+        assert await fast.queue.get() == await slow.queue.get()
+        for n in range(3):
+            hub.publish(1, "participant", {"n": n})
+            await asyncio.sleep(0)
+            if n < 2:
+                await fast.queue.get()
+        # The slow subscriber fell behind: its queue is replaced by an end-of-stream marker
+        assert slow.overflowed and await slow.queue.get() is None
+        assert not fast.overflowed
+
+    asyncio.run(run())
+    assert hub.stats()["published"] == 4
+    assert hub.stats()["delivered"] == 8
+
+
+def test_venue_engine_rolls_in_memory_and_replays_journal(monkeypatch, tmp_path):
+    """With the venue engine on, rolls skip the database until a flush or a read of the venue;
+    after a crash the journal is replayed into the database."""
+    token = _register_and_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    venue_id = client.get("/venues", headers=headers).json()[0]["id"]
+    client.post(f"/venues/{venue_id}/enter", headers=headers)
+    journal = tmp_path / "venue_engine.journal"
+    memory = VenueEngine(enabled=True, journal_path=str(journal))
+    monkeypatch.setattr(venues_router, "venue_engine", memory)
+
+    def roll():
+        return client.post(f"/venues/{venue_id}/roll", json={"mode": "normal"}, headers=headers)
+
+    assert roll().status_code == 200  # loads the venue
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        assert roll().status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert statements == []
+
+    def stored_roll_count() -> int:
+        db = SessionLocal()
+        try:
+            return db.query(VenueParticipant).filter_by(venue_id=venue_id).one().roll_count
+        finally:
+            db.close()
+
+    assert stored_roll_count() == 0
+    assert len(journal.read_text().splitlines()) == 2
+    # The process "crashes" here; its successor replays the journal on startup
+    assert VenueEngine(journal_path=str(journal)).replay() == {venue_id}
+    assert not journal.exists()
+    assert stored_roll_count() == 2
+
+    assert roll().status_code == 200
+    me = client.get(f"/venues/{venue_id}", headers=headers).json()["participants"][0]
+    assert me["roll_count"] == 3
+    assert stored_roll_count() == 3
+    assert memory.stats()["dirty"] == 0
+
+
+def test_round_completes_across_venue_engine_writes_and_replay(monkeypatch, tmp_path):
+    """Finishes applied by the venue engine reach the round counters when written back, so a
+    round finished partly in memory and partly in the database, or by replayed rolls after a
+    crash, is still recorded."""
+    token = _register_and_token()
+    alice = {"Authorization": f"Bearer {token}"}
+    venue_id = client.get("/venues", headers=alice).json()[0]["id"]
+    players = [alice]
+    for name in ("bob", "carol"):
+        r = client.post("/auth/register", json={"username": name, "password": "secret123"})
+        players.append({"Authorization": f"Bearer {r.json()['token']}"})
+    for headers in players:
+        client.post(f"/venues/{venue_id}/enter", headers=headers)
+    alice, bob, carol = players
+
+    def play(headers):
+        assert client.post(f"/venues/{venue_id}/roll_batch", json={}, headers=headers).json()["won"]
+
+    journal = tmp_path / "venue_engine.journal"
+    memory = VenueEngine(enabled=True, journal_path=str(journal))
+    monkeypatch.setattr(venues_router, "venue_engine", memory)
+    play(alice)
+    memory.flush()
+    # The engine is switched off; bob finishes through the database path
+    monkeypatch.setattr(venues_router, "venue_engine", VenueEngine(enabled=False))
+    play(bob)
+    assert client.get(f"/venues/{venue_id}", headers=alice).json()["round_complete"] is False
+
+    # Carol's finishing rolls only reach the journal before the process dies
+    monkeypatch.setattr(venues_router, "venue_engine", memory)
+    monkeypatch.setattr(venues_router, "_recount_round", lambda *_args: False)
+    play(carol)
+    monkeypatch.undo()
+    successor = VenueEngine(journal_path=str(journal))
+    venues_router.recount_rounds(successor.start())
+    data = client.get(f"/venues/{venue_id}", headers=alice).json()
+    assert data["round_complete"] is True
+    assert {r["username"] for r in data["ranking"]} == {"alice", "bob", "carol"}
+    assert client.post(f"/venues/{venue_id}/start_new_race", headers=bob).status_code == 200
+
+
+STRESS_PLAYERS = 60
+STRESS_CLIENTS_PER_PLAYER = 3
+
+
+def test_venue_engine_loads_cold_venue_outside_engine_lock(tmp_path):
+    """A venue's participants are loaded without holding the engine-wide lock: rolls in a
+    venue already in memory go ahead while another venue is still being read, and a load
+    that overlapped an eviction is redone."""
+    token = _register_and_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    user_id = client.get("/auth/me", headers=headers).json()["id"]
+    warm = client.get("/venues", headers=headers).json()[0]["id"]
+    cold = client.post("/venues", json={"name": "second"}, headers=headers).json()["id"]
+    for venue_id in (warm, cold):
+        client.post(f"/venues/{venue_id}/enter", headers=headers)
+    memory = VenueEngine(enabled=True, journal_path=str(tmp_path / "journal"))
+    memory.roll(warm, user_id, "normal", 1)
+
+    loading, release = threading.Event(), threading.Event()
+    load, loaded = memory._load, []
+
+    def slow_load(venue_id):
+        loaded.append(venue_id)
+        if len(loaded) == 1:
+            loading.set()
+            release.wait(5)
+        return load(venue_id)
+
+    memory._load = slow_load
+    loader = threading.Thread(target=memory.roll, args=(cold, user_id, "normal", 1))
+    loader.start()
+    try:
+        assert loading.wait(5)
+        started = time.monotonic()
+        memory.roll(warm, user_id, "normal", 1)
+        assert time.monotonic() - started < 1
+        # Another request rewrote the cold venue's participants while it was being read
+        memory.evict(cold)
+    finally:
+        release.set()
+        loader.join(5)
+    assert loaded == [cold, cold]
+    stats = memory.stats()
+    assert (stats["venues"], stats["loads"], stats["rolls"]) == (2, 2, 3)
+
+
+@pytest.mark.parametrize("in_memory", [False, True])
+def test_roll_batch_plays_a_game_in_one_request(monkeypatch, tmp_path, in_memory):
+    """roll_batch applies a policy's rolls in one transaction and completes the round once."""
+    token = _register_and_token()
+    alice = {"Authorization": f"Bearer {token}"}
+    if in_memory:
+        memory = VenueEngine(enabled=True, journal_path=str(tmp_path / "journal"))
+        monkeypatch.setattr(venues_router, "venue_engine", memory)
+    venue_id = client.get("/venues", headers=alice).json()[0]["id"]
+    r = client.post("/auth/register", json={"username": "bob", "password": "secret123"})
+    bob = {"Authorization": f"Bearer {r.json()['token']}"}
+    for headers in (alice, bob):
+        client.post(f"/venues/{venue_id}/enter", headers=headers)
+    url = f"/venues/{venue_id}/roll_batch"
+    assert client.post(url, json={"policy": "turbo"}, headers=alice).status_code == 422
+    assert client.post(url, json={"max_rolls": 0}, headers=alice).status_code == 422
+
+    r = client.post(url, json={"policy": "normal", "max_rolls": 2}, headers=alice)
+    assert r.status_code == 200
+    first = r.json()["rolls"]
+    assert len(first) == 2 and {x["mode"] for x in first} == {"normal"}
+    assert first[1]["newPosition"] - first[1]["steps"] == first[0]["newPosition"]
+
+    r = client.post(url, json={}, headers=alice)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["won"] is True and data["gameOver"] is False
+    assert data["rolls"][-1]["won"] and not any(x["won"] for x in data["rolls"][:-1])
+    assert data["rolls"][0]["newPosition"] - data["rolls"][0]["steps"] == first[-1]["newPosition"]
+    # Auto spends condition on super rolls but never the last point of it
+    assert data["rolls"][0]["mode"] == "super"
+    assert min(x["newCondition"] for x in data["rolls"]) >= 1
+    assert client.post(url, json={}, headers=alice).status_code == 400
+
+    r = client.post(url, json={"policy": "super"}, headers=bob)
+    assert r.status_code == 200
+    assert r.json()["won"] or r.json()["gameOver"]
+    detail = client.get(f"/venues/{venue_id}", headers=alice).json()
+    assert detail["round_complete"] is True
+    alice_state = next(p for p in detail["participants"] if p["username"] == "alice")
+    assert alice_state["roll_count"] == len(first) + len(data["rolls"])
+    db = SessionLocal()
+    try:
+        assert db.query(VenueRoundResult).filter_by(venue_id=venue_id).count() == 2
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("in_memory", [False, True])
+def test_concurrent_rolls_keep_participant_and_round_invariants(monkeypatch, tmp_path, in_memory):
+    """Thousands of parallel rolls, several at once per player, lose no roll, never roll past
+    the finish and record the round's results exactly once."""
+    client.post("/testability/reset-db")
+    monkeypatch.setattr(rate_limit.roll_limiter, "enabled", False)
+    if in_memory:
+        memory = VenueEngine(enabled=True, journal_path=str(tmp_path / "journal"))
+        monkeypatch.setattr(venues_router, "venue_engine", memory)
+    db = SessionLocal()
+    try:
+        venue_id = db.query(Venue).one().id
+        users = [User(username=f"racer{i}", password_hash="!") for i in range(STRESS_PLAYERS)]
+        db.add_all(users)
+        db.flush()
+        tokens = {}
+        for u in users:
+            db.add(VenueParticipant(venue_id=venue_id, user_id=u.id))
+            tokens[u.id] = auth.issue_token(db, u.id, u.username)
+        db.add(VenueRound(venue_id=venue_id, round_number=1))
+        db.commit()
+    finally:
+        db.close()
+
+    rolls: dict[int, list[dict]] = {user_id: [] for user_id in tokens}
+    rejections: list[int] = []
+
+    def play(user_id: int) -> None:
+        headers = {"Authorization": f"Bearer {tokens[user_id]}"}
+        while True:
+            r = client.post(f"/venues/{venue_id}/roll", json={"mode": "normal"}, headers=headers)
+            if r.status_code == 409:
+                continue  # lost the optimistic retries to its own other clients
+            if r.status_code != 200:
+                rejections.append(r.status_code)
+                return
+            rolls[user_id].append(r.json())
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [
+            pool.submit(play, user_id)
+            for user_id in tokens
+            for _ in range(STRESS_CLIENTS_PER_PLAYER)
+        ]
+        for f in futures:
+            f.result()
+    assert sum(map(len, rolls.values())) + len(rejections) >= 1000
+    assert set(rejections) == {400}
+
+    db = SessionLocal()
+    try:
+        for p in db.query(VenueParticipant).filter_by(venue_id=venue_id):
+            mine = sorted(rolls[p.user_id], key=lambda r: r["newPosition"])
+            # Every roll started where the previous one ended, and only the last one won
+            assert [r["newPosition"] - r["steps"] for r in mine] == [0] + [
+                r["newPosition"] for r in mine[:-1]
+            ]
+            assert [r["won"] for r in mine] == [False] * (len(mine) - 1) + [True]
+            assert (p.roll_count, p.position, p.won) == (len(mine), mine[-1]["newPosition"], True)
+        assert db.query(VenueRoundResult).filter_by(venue_id=venue_id).count() == STRESS_PLAYERS
+        assert db.query(VenueRound).filter_by(venue_id=venue_id).one().completed_at is not None
+    finally:
+        db.close()
@@ -0,0 +1,109 @@
+"""Background deletion of expired access tokens and token revocations.
+
+Rows are deleted ``batch_size`` at a time, each batch in its own transaction with a short
+pause in between, so the SQLite write lock is never held for long and request writes
+interleave with a large sweep.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import delete, select
+
+from config import TOKEN_SWEEP_BATCH_SIZE, TOKEN_SWEEP_INTERVAL_SECONDS
+from database import SessionLocal
+from models.access_tokens import AccessToken
+from models.token_revocation import TokenRevocation
+
+logger = logging.getLogger(__name__)
+
+BATCH_PAUSE_SECONDS = 0.05
+
+
+class TokenSweeper:
+    def __init__(
+        self,
+        interval: float = TOKEN_SWEEP_INTERVAL_SECONDS,
+        batch_size: int = TOKEN_SWEEP_BATCH_SIZE,
+    ):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.deleted = 0
+        self.revocations_deleted = 0
+        self.last_run_at: datetime | None = None
+
+    def _sweep(self, model, key, expires_at, now: datetime) -> int:
+        total = 0
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                batch = select(key).where(expires_at <= now).limit(self.batch_size)
+                deleted = db.execute(delete(model).where(key.in_(batch.scalar_subquery()))).rowcount
+                db.commit()
+            finally:
+                db.close()
+            total += deleted
+            if deleted < self.batch_size:
+                break
+            time.sleep(BATCH_PAUSE_SECONDS)
+        return total
+
+    def sweep_once(self, now: datetime | None = None) -> int:
+        """Delete every token (and token revocation) that expired before ``now``; returns the
+        number of tokens deleted."""
+        now = now or datetime.utcnow()
+        total = self._sweep(AccessToken, AccessToken.token, AccessToken.expires_at, now)
+        revocations = self._sweep(
+            TokenRevocation, TokenRevocation.id, TokenRevocation.expires_at, now
+        )
+        with self._lock:
+            self.runs += 1
+            self.deleted += total
+            self.revocations_deleted += revocations
+            self.last_run_at = now
+        if total or revocations:
+            logger.info("Deleted %d expired access tokens and %d revocations", total, revocations)
+        return total
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep_once()
+            except Exception:
+                logger.exception("Access token sweep failed")
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="token-sweeper", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "interval_s": self.interval,
+                "batch_size": self.batch_size,
+                "running": self._thread is not None,
+                "runs": self.runs,
+                "deleted": self.deleted,
+                "revocations_deleted": self.revocations_deleted,
+                "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            }
+
+
+token_sweeper = TokenSweeper()
@@ -0,0 +1 @@
+# Transcription pipeline package
@@ -0,0 +1,161 @@
+"""Pluggable transcription backends, selected by TRANSCRIPTION_BACKEND.
+
+Built in:
+- ``openai``: the real upstream call.
+- ``fake``: offline and deterministic. The text is derived from the audio's SHA-256 and
+  the latency is configurable, for load tests.
+- ``StaticBackend``: a fixed transcript, installed by the /testability/mock endpoint.
+"""
+
+import hashlib
+import random
+import threading
+import time
+from collections.abc import Callable
+from typing import Protocol
+
+from config import FAKE_TRANSCRIBE_LATENCY, TRANSCRIPTION_BACKEND
+from transcription import openai_backend
+from transcription.ingest import SpooledAudio
+from transcription.pcm import read_wav_info
+
+
+class TranscriptionBackend(Protocol):
+    name: str
+    # Part of the transcript cache key; backends whose output must not be cached set
+    # ``cacheable`` to False.
+    model: str
+    cacheable: bool
+
+    def transcribe(self, audio: SpooledAudio) -> str:
+        """Blocking; called on the transcription executor."""
+        ...
+
+
+class OpenAIBackend:
+    name = "openai"
+    model = openai_backend.TRANSCRIBE_MODEL
+    cacheable = True
+
+    def transcribe(self, audio: SpooledAudio) -> str:
+        return openai_backend.transcribe(audio)
+
+
+class StaticBackend:
+    """Returns the same transcript for every input."""
+
+    name = "static"
+    model = "static"
+    cacheable = False
+
+    def __init__(self, transcript: str):
+        self.transcript = transcript
+
+    def transcribe(self, audio: SpooledAudio) -> str:
+        return self.transcript
+
+
+_FAKE_WORDS = (
+    "agenda action budget customer deadline decision design follow hiring launch metric "
+    "milestone owner plan priority quarter release review risk roadmap scope ship sprint "
+    "status team test timeline update"
+).split()
+
+# Used to estimate the duration of non-WAV audio (16 kHz 16-bit mono).
+FAKE_BYTES_PER_SECOND = 32000
+
+
+def parse_latency(spec: str) -> Callable[[float], float]:
+    """Turn a latency spec into ``f(audio_seconds) -> delay_seconds``.
+
+    Specs: ``fixed:S``, ``uniform:LO,HI``, ``normal:MEAN,STD``, ``lognormal:MU,SIGMA`` and
+    ``per_second:RATE[,BASE]`` (BASE + RATE * audio duration).
+    """
+    kind, _, args = spec.partition(":")
+    try:
+        values = [float(v) for v in args.split(",") if v.strip()]
+        if kind == "fixed":
+            (delay,) = values
+            return lambda _seconds: delay
+        if kind == "uniform":
+            lo, hi = values
+            return lambda _seconds: random.uniform(lo, hi)
+        if kind == "normal":
+            mean, std = values
+            return lambda _seconds: max(0.0, random.gauss(mean, std))
+        if kind == "lognormal":
+            mu, sigma = values
+            return lambda _seconds: random.lognormvariate(mu, sigma)
+        if kind == "per_second":
+            rate, base = values[0], (values[1] if len(values) > 1 else 0.0)
+            return lambda seconds: base + rate * seconds
+    except ValueError as e:
+        raise ValueError(f"Invalid latency spec {spec!r}") from e
+    raise ValueError(f"Unknown latency spec {spec!r}")
+
+
+class FakeBackend:
+    """Offline stand-in for load tests: output derived from the audio hash, simulated latency."""
+
+    name = "fake"
+    model = "fake"
+    cacheable = True
+
+    def __init__(self, latency: str = FAKE_TRANSCRIBE_LATENCY):
+        self.latency_spec = latency
+        self._latency = parse_latency(latency)
+
+    @staticmethod
+    def audio_seconds(audio: SpooledAudio) -> float:
+        info = read_wav_info(audio.file)
+        return info.duration if info else audio.size / FAKE_BYTES_PER_SECOND
+
+    @staticmethod
+    def text_for(sha256: str, words: int = 12) -> str:
+        seed = hashlib.sha256(sha256.encode()).digest()
+        return " ".join(_FAKE_WORDS[b % len(_FAKE_WORDS)] for b in seed[:words])
+
+    def transcribe(self, audio: SpooledAudio) -> str:
+        delay = self._latency(self.audio_seconds(audio))
+        if delay > 0:
+            time.sleep(delay)
+        return self.text_for(audio.sha256)
+
+
+_registry: dict[str, Callable[[], TranscriptionBackend]] = {
+    "openai": OpenAIBackend,
+    "fake": FakeBackend,
+}
+_instances: dict[str, TranscriptionBackend] = {}
+_override: TranscriptionBackend | None = None
+_lock = threading.Lock()
+
+
+def register_backend(name: str, factory: Callable[[], TranscriptionBackend]) -> None:
+    with _lock:
+        _registry[name] = factory
+        _instances.pop(name, None)
+
+
+def available_backends() -> list[str]:
+    return sorted(_registry)
+
+
+def set_backend_override(backend: TranscriptionBackend | None) -> None:
+    """Use ``backend`` for every request instead of the configured one (None to clear)."""
+    global _override
+    _override = backend
+
+
+def get_backend(name: str | None = None) -> TranscriptionBackend:
+    """The override if one is set, otherwise the named (default: configured) backend."""
+    if name is None and _override is not None:
+        return _override
+    name = name or TRANSCRIPTION_BACKEND
+    with _lock:
+        backend = _instances.get(name)
+        if backend is None:
+            if name not in _registry:
+                raise ValueError(f"Unknown transcription backend {name!r}")
+            backend = _instances[name] = _registry[name]()
+        return backend
@@ -0,0 +1,177 @@
+"""Content-addressed transcript cache: (audio SHA-256, model) -> transcript text.
+
+Two tiers: an in-process TTL/LRU cache in front of the ``transcript_cache`` table, so a
+repeated upload is answered without calling the transcription backend. Expired and excess
+rows are swept every ``evict_every`` stores rather than on each one.
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from config import (
+    TRANSCRIPT_CACHE_ENABLED,
+    TRANSCRIPT_CACHE_EVICT_EVERY,
+    TRANSCRIPT_CACHE_MAX_ENTRIES,
+    TRANSCRIPT_CACHE_MEMORY_ENTRIES,
+    TRANSCRIPT_CACHE_TTL_SECONDS,
+)
+from database import SessionLocal
+from models.transcript_cache import TranscriptCacheEntry
+from ttl_cache import TTLCache
+
+
+class TranscriptCache:
+    def __init__(
+        self,
+        memory_entries: int = TRANSCRIPT_CACHE_MEMORY_ENTRIES,
+        max_entries: int = TRANSCRIPT_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = TRANSCRIPT_CACHE_TTL_SECONDS,
+        enabled: bool = TRANSCRIPT_CACHE_ENABLED,
+        evict_every: int = TRANSCRIPT_CACHE_EVICT_EVERY,
+    ):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evict_every = max(1, evict_every)
+        self._memory: TTLCache[tuple[str, str], str] = TTLCache(memory_entries, ttl_seconds)
+        self._lock = threading.Lock()
+        self.persistent_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._stores_since_evict = 0
+        self.persistent_evictions = 0
+
+    def get_memory(self, audio_sha256: str, model: str) -> str | None:
+        """Memory tier only; cheap enough to call on the event loop."""
+        if not self.enabled:
+            return None
+        return self._memory.get((audio_sha256, model))
+
+    def get(self, audio_sha256: str, model: str) -> str | None:
+        """Memory tier, then the database tier."""
+        text = self.get_memory(audio_sha256, model)
+        if text is None:
+            text = self.get_persistent(audio_sha256, model)
+        return text
+
+    def get_persistent(self, audio_sha256: str, model: str) -> str | None:
+        """Database tier only (blocking); hits are promoted into the memory tier."""
+        if not self.enabled:
+            return None
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            row = db.get(TranscriptCacheEntry, (audio_sha256, model))
+            remaining = (
+                self.ttl_seconds - (now - row.created_at).total_seconds() if row is not None else 0
+            )
+            if remaining <= 0:
+                with self._lock:
+                    self.misses += 1
+                return None
+            row.last_accessed_at = now
+            db.commit()
+            text = row.transcript
+        finally:
+            db.close()
+        with self._lock:
+            self.persistent_hits += 1
+        # Only for what is left of the row's TTL, so a promotion cannot extend its life
+        self._memory.set((audio_sha256, model), text, ttl=remaining)
+        return text
+
+    def put(self, audio_sha256: str, model: str, transcript: str, audio_size: int) -> None:
+        if not self.enabled:
+            return
+        self._memory.set((audio_sha256, model), transcript)
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            row = db.get(TranscriptCacheEntry, (audio_sha256, model))
+            if row is None:
+                db.add(
+                    TranscriptCacheEntry(
+                        audio_sha256=audio_sha256,
+                        model=model,
+                        transcript=transcript,
+                        audio_size_bytes=audio_size,
+                        created_at=now,
+                        last_accessed_at=now,
+                    )
+                )
+            else:
+                db.execute(
+                    update(TranscriptCacheEntry)
+                    .where(
+                        TranscriptCacheEntry.audio_sha256 == audio_sha256,
+                        TranscriptCacheEntry.model == model,
+                    )
+                    .values(transcript=transcript, created_at=now, last_accessed_at=now)
+                )
+            try:
+                db.commit()
+            except IntegrityError:
+                # A concurrent request stored the same transcript first
+                db.rollback()
+                return
+            with self._lock:
+                self.stores += 1
+                self._stores_since_evict += 1
+                due = self._stores_since_evict >= self.evict_every
+                if due:
+                    self._stores_since_evict = 0
+            evicted = self._evict(db, now) if due else 0
+        finally:
+            db.close()
+        with self._lock:
+            self.persistent_evictions += evicted
+
+    def _evict(self, db, now: datetime) -> int:
+        """Drop expired rows, then the least recently used rows beyond ``max_entries``."""
+        cutoff = now - timedelta(seconds=self.ttl_seconds)
+        evicted = db.execute(
+            delete(TranscriptCacheEntry).where(TranscriptCacheEntry.created_at < cutoff)
+        ).rowcount
+        total = db.scalar(select(func.count()).select_from(TranscriptCacheEntry))
+        excess = total - self.max_entries
+        if excess > 0:
+            oldest = (
+                select(TranscriptCacheEntry.audio_sha256, TranscriptCacheEntry.model)
+                .order_by(TranscriptCacheEntry.last_accessed_at.asc())
+                .limit(excess)
+            )
+            for sha, model in db.execute(oldest).all():
+                db.execute(
+                    delete(TranscriptCacheEntry).where(
+                        TranscriptCacheEntry.audio_sha256 == sha,
+                        TranscriptCacheEntry.model == model,
+                    )
+                )
+                self._memory.pop((sha, model))
+            evicted += excess
+        db.commit()
+        return evicted
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+    def stats(self) -> dict:
+        memory = self._memory.stats()
+        with self._lock:
+            misses = self.misses
+            lookups = memory["hits"] + self.persistent_hits + misses
+            return {
+                "enabled": self.enabled,
+                "memory": memory,
+                "persistent_hits": self.persistent_hits,
+                "misses": misses,
+                "hit_rate": (memory["hits"] + self.persistent_hits) / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "persistent_evictions": self.persistent_evictions,
+            }
+
+
+transcript_cache = TranscriptCache()
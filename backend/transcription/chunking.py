@@ -0,0 +1,195 @@
+"""Split long recordings at silence, transcribe segments concurrently, stitch text in order."""
+
+import asyncio
+import re
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from pathlib import PurePath
+
+import numpy as np
+
+from config import (
+    TRANSCRIBE_MAX_SEGMENT_SECONDS,
+    TRANSCRIBE_SEGMENT_OVERLAP_SECONDS,
+    TRANSCRIBE_SEGMENT_PARALLELISM,
+    TRANSCRIBE_SILENCE_SEARCH_SECONDS,
+    TRANSCRIBE_SILENCE_THRESHOLD_DB,
+)
+from transcription.executor import transcription_executor
+from transcription.ingest import SpooledAudio
+from transcription.pcm import read_wav_info, window_rms_db, write_wav_segment
+
+ANALYSIS_WINDOW_SECONDS = 0.02
+
+
+@dataclass
+class AudioSegment:
+    index: int
+    start: float
+    end: float | None
+    audio: SpooledAudio
+
+
+def _pick_cut(levels: np.ndarray, lo: int, hi: int, threshold_db: float) -> tuple[int, bool]:
+    """Choose a cut window in levels[lo:hi]: the middle of the longest silent run if there is
+    one, otherwise the quietest window. Returns (window index, cut_is_silent)."""
+    region = levels[lo:hi]
+    silent = region < threshold_db
+    if silent.any():
+        # Run-length encode the silent mask and take the longest run (latest on ties)
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], silent.astype(np.int8), [0]))))
+        starts, ends = edges[::2], edges[1::2]
+        best = np.flatnonzero((ends - starts) == (ends - starts).max())[-1]
+        return lo + int((starts[best] + ends[best]) // 2), True
+    return lo + int(np.argmin(region)), False
+
+
+def split_audio(
+    audio: SpooledAudio,
+    max_segment_seconds: float = TRANSCRIBE_MAX_SEGMENT_SECONDS,
+    overlap_seconds: float = TRANSCRIBE_SEGMENT_OVERLAP_SECONDS,
+    search_seconds: float = TRANSCRIBE_SILENCE_SEARCH_SECONDS,
+    threshold_db: float = TRANSCRIBE_SILENCE_THRESHOLD_DB,
+) -> list[AudioSegment]:
+    """Split PCM WAV audio into segments of at most ``max_segment_seconds``.
+
+    Each cut is placed in the longest silence within the last ``search_seconds`` before the
+    limit. When no silence is found the cut falls on the quietest window and the next segment
+    starts ``overlap_seconds`` earlier, so a word straddling the cut appears in both segments
+    (``stitch_texts`` removes the duplicate). Non-WAV and short audio is returned as a single
+    segment referring to the original upload.
+    """
+    info = read_wav_info(audio.file)
+    if info is None or info.duration <= max_segment_seconds:
+        return [AudioSegment(index=0, start=0.0, end=info.duration if info else None, audio=audio)]
+
+    levels = window_rms_db(audio.file, info, ANALYSIS_WINDOW_SECONDS)
+    window_frames = max(1, int(info.frame_rate * ANALYSIS_WINDOW_SECONDS))
+    max_windows = max(1, int(max_segment_seconds / ANALYSIS_WINDOW_SECONDS))
+    search_windows = max(1, min(int(search_seconds / ANALYSIS_WINDOW_SECONDS), max_windows // 2))
+    overlap_windows = int(overlap_seconds / ANALYSIS_WINDOW_SECONDS)
+
+    stem = PurePath(audio.filename).stem or "audio"
+    bounds: list[tuple[int, int]] = []
+    start = 0
+    while start + max_windows < len(levels):
+        limit = start + max_windows
+        cut, silent = _pick_cut(levels, limit - search_windows, limit, threshold_db)
+        bounds.append((start, cut))
+        start = cut if silent else max(start + 1, cut - overlap_windows)
+    bounds.append((start, len(levels)))
+
+    segments = []
+    for i, (lo, hi) in enumerate(bounds):
+        start_frame = lo * window_frames
+        end_frame = info.n_frames if i == len(bounds) - 1 else hi * window_frames
+        segments.append(
+            AudioSegment(
+                index=i,
+                start=start_frame / info.frame_rate,
+                end=end_frame / info.frame_rate,
+                audio=write_wav_segment(
+                    audio.file, info, start_frame, end_frame, f"{stem}.part{i:03d}.wav"
+                ),
+            )
+        )
+    return segments
+
+
+def close_segments(segments: list[AudioSegment], original: SpooledAudio) -> None:
+    for seg in segments:
+        if seg.audio is not original:
+            seg.audio.close()
+
+
+async def iter_segment_transcripts(
+    segments: list[AudioSegment],
+    transcribe_fn: Callable[[SpooledAudio], str],
+    parallelism: int = TRANSCRIBE_SEGMENT_PARALLELISM,
+) -> AsyncIterator[tuple[AudioSegment, str]]:
+    """Transcribe segments on the transcription executor, at most ``parallelism`` at a time,
+    yielding (segment, text) in completion order."""
+    sem = asyncio.Semaphore(parallelism)
+
+    async def one(seg: AudioSegment) -> tuple[AudioSegment, str]:
+        async with sem:
+            return seg, await transcription_executor.run(transcribe_fn, seg.audio)
+
+    tasks = [asyncio.create_task(one(seg)) for seg in segments]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+_WORD_NORMALIZE = re.compile(r"[^\w]+")
+_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af]")
+
+
+def _tokens(text: str) -> tuple[list[str], str]:
+    """Split into words, or into characters for scripts written without spaces (e.g. Chinese)."""
+    text = text.strip()
+    if _CJK.search(text) and not re.search(r"\s", text):
+        return list(text), ""
+    return text.split(), " "
+
+
+def _norm(token: str) -> str:
+    return _WORD_NORMALIZE.sub("", token.lower())
+
+
+def stitch_texts(
+    texts: list[str], max_overlap_tokens: int = 12, min_overlap_tokens: int = 2
+) -> str:
+    """Join segment transcripts in order, dropping text repeated across a seam: the longest
+    run of tokens ending the previous text that also starts the next one."""
+    result_tokens: list[str] = []
+    sep = " "
+    for text in texts:
+        tokens, text_sep = _tokens(text)
+        if not tokens:
+            continue
+        if result_tokens:
+            limit = min(max_overlap_tokens, len(result_tokens), len(tokens))
+            tail = [_norm(t) for t in result_tokens[-limit:]]
+            head = [_norm(t) for t in tokens[:limit]]
+            for k in range(limit, min_overlap_tokens - 1, -1):
+                if tail[-k:] == head[:k]:
+                    tokens = tokens[k:]
+                    break
+        else:
+            sep = text_sep
+        result_tokens.extend(tokens)
+    return sep.join(result_tokens)
+
+
+async def iter_chunked(
+    audio: SpooledAudio,
+    transcribe_fn: Callable[[SpooledAudio], str],
+    parallelism: int = TRANSCRIBE_SEGMENT_PARALLELISM,
+) -> AsyncIterator[tuple[AudioSegment, str, int]]:
+    """Split ``audio`` and yield (segment, text, segment_count) as each segment finishes."""
+    segments = await asyncio.to_thread(split_audio, audio)
+    try:
+        async for seg, text in iter_segment_transcripts(segments, transcribe_fn, parallelism):
+            yield seg, text, len(segments)
+    finally:
+        close_segments(segments, audio)
+
+
+async def transcribe_chunked(
+    audio: SpooledAudio,
+    transcribe_fn: Callable[[SpooledAudio], str],
+    parallelism: int = TRANSCRIBE_SEGMENT_PARALLELISM,
+) -> str:
+    """Split ``audio``, transcribe the segments concurrently and stitch the text in order."""
+    texts: dict[int, str] = {}
+    count = 0
+    async for seg, text, total in iter_chunked(audio, transcribe_fn, parallelism):
+        texts[seg.index] = text
+        count = total
+    if count == 1:
+        return texts[0]
+    return stitch_texts([texts[i] for i in range(count)])
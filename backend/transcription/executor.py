@@ -0,0 +1,52 @@
+"""Bounded worker pool for blocking transcription calls, awaitable from async endpoints."""
+
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TypeVar
+
+from config import TRANSCRIBE_MAX_CONCURRENCY
+
+T = TypeVar("T")
+
+
+class TranscriptionExecutor:
+    """Dedicated thread pool so slow upstream calls never tie up the event loop or
+    FastAPI's shared threadpool. ``max_workers`` caps concurrent calls; extra work queues."""
+
+    def __init__(self, max_workers: int = TRANSCRIBE_MAX_CONCURRENCY):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="transcribe")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+
+    def _track(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+
+    def submit(self, fn: Callable[..., T], *args) -> Future:
+        """Schedule ``fn(*args)`` on the pool; usable from sync code."""
+        return self._pool.submit(self._track, fn, *args)
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """Run ``fn(*args)`` on the pool and await the result without blocking the loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+            }
+
+
+transcription_executor = TranscriptionExecutor()
@@ -0,0 +1,159 @@
+"""Streaming ingest for uploaded audio: spool to a bounded temp file, hashing as we go."""
+
+import hashlib
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+from typing import IO
+
+from fastapi import UploadFile
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import (
+    TRANSCRIBE_MAX_UPLOAD_BYTES,
+    TRANSCRIBE_SPOOL_MAX_MEMORY,
+    TRANSCRIBE_UPLOAD_CHUNK_SIZE,
+)
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured maximum size."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds maximum size of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class SpooledAudio:
+    """Uploaded audio held in a spooled temp file, with its size and SHA-256 digest."""
+
+    file: IO[bytes]
+    filename: str
+    content_type: str | None
+    size: int
+    sha256: str
+
+    def as_upload_tuple(self) -> tuple[str, IO[bytes], str | None]:
+        """Rewind and return a (filename, handle, content_type) tuple for the OpenAI client."""
+        self.file.seek(0)
+        return (self.filename, self.file, self.content_type)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+# Multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """Refuse POST bodies to ``paths`` larger than an upload may be before they are received.
+
+    Starlette buffers the whole multipart body into its own temp file before the endpoint
+    runs, so a check in the endpoint bounds neither bandwidth nor disk. This answers 413 from
+    Content-Length up front, and stops reading a body without one once it crosses the limit.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        paths: tuple[str, ...],
+        max_bytes: int = TRANSCRIBE_MAX_UPLOAD_BYTES,
+    ):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        limit = self.max_bytes + MULTIPART_OVERHEAD_BYTES
+        too_large = JSONResponse(
+            {"detail": str(UploadTooLargeError(self.max_bytes))}, status_code=413
+        )
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit:
+            await too_large(scope, receive, send)
+            return
+        received = 0
+        started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise UploadTooLargeError(self.max_bytes)
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal started
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except UploadTooLargeError:
+            if started:
+                raise
+            await too_large(scope, receive, send)
+
+
+async def spool_upload(
+    upload: UploadFile,
+    *,
+    max_bytes: int = TRANSCRIBE_MAX_UPLOAD_BYTES,
+    chunk_size: int = TRANSCRIBE_UPLOAD_CHUNK_SIZE,
+    max_memory: int = TRANSCRIBE_SPOOL_MAX_MEMORY,
+) -> SpooledAudio:
+    """Copy an upload chunk by chunk into a SpooledTemporaryFile.
+
+    At most one chunk is held in memory at a time, plus the spool itself up to
+    ``max_memory`` bytes before it rolls over to disk. An upload Starlette has already
+    spooled is hashed in place and used as is rather than copied again.
+    """
+    if isinstance(upload.file, SpooledTemporaryFile):
+        return await _hash_in_place(upload, max_bytes, chunk_size)
+    spool = SpooledTemporaryFile(max_size=max_memory)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while chunk := await upload.read(chunk_size):
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(max_bytes)
+            digest.update(chunk)
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return SpooledAudio(
+        file=spool,
+        filename=upload.filename or "audio",
+        content_type=upload.content_type,
+        size=size,
+        sha256=digest.hexdigest(),
+    )
+
+
+async def _hash_in_place(upload: UploadFile, max_bytes: int, chunk_size: int) -> SpooledAudio:
+    digest = hashlib.sha256()
+    size = 0
+    await upload.seek(0)
+    while chunk := await upload.read(chunk_size):
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        digest.update(chunk)
+    await upload.seek(0)
+    return SpooledAudio(
+        file=upload.file,
+        filename=upload.filename or "audio",
+        content_type=upload.content_type,
+        size=size,
+        sha256=digest.hexdigest(),
+    )
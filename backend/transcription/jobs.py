@@ -0,0 +1,215 @@
+"""Persistent transcription jobs processed by an in-process worker pool.
+
+Job rows live in the database and the uploaded audio on disk, so anything queued or
+running when the process stops is picked up again by ``JobWorkerPool.resume()``.
+"""
+
+import asyncio
+import logging
+import queue
+import shutil
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import update
+
+from config import (
+    TRANSCRIPTION_JOB_MAX_ATTEMPTS,
+    TRANSCRIPTION_JOB_WORKERS,
+    TRANSCRIPTION_JOBS_DIR,
+)
+from database import SessionLocal
+from models.transcription_job import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    TranscriptionJob,
+)
+from transcription.backends import get_backend
+from transcription.ingest import SpooledAudio
+from transcription.pipeline import transcribe_audio
+
+logger = logging.getLogger(__name__)
+
+
+def create_job(audio: SpooledAudio, jobs_dir: Path = TRANSCRIPTION_JOBS_DIR) -> TranscriptionJob:
+    """Persist the spooled audio under ``jobs_dir`` and insert a queued job row."""
+    job_id = uuid.uuid4().hex
+    jobs_dir.mkdir(parents=True, exist_ok=True)
+    audio_path = jobs_dir / job_id
+    audio.file.seek(0)
+    with audio_path.open("wb") as out:
+        shutil.copyfileobj(audio.file, out)
+    db = SessionLocal()
+    try:
+        job = TranscriptionJob(
+            id=job_id,
+            status=JOB_QUEUED,
+            filename=audio.filename,
+            content_type=audio.content_type,
+            audio_path=str(audio_path),
+            audio_sha256=audio.sha256,
+            size_bytes=audio.size,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        db.expunge(job)
+        return job
+    except BaseException:
+        audio_path.unlink(missing_ok=True)
+        raise
+    finally:
+        db.close()
+
+
+class JobWorkerPool:
+    """``workers`` daemon threads pulling job ids from a queue.
+
+    Each job is claimed with a conditional UPDATE (queued -> running), so a job id that is
+    enqueued twice, or whose row no longer exists, is skipped. Jobs go through the same
+    pipeline as /transcribe (transcript cache, preprocessing, chunking), so segment calls
+    share the transcription executor and its upstream concurrency limit.
+    """
+
+    def __init__(
+        self,
+        workers: int = TRANSCRIPTION_JOB_WORKERS,
+        max_attempts: int = TRANSCRIPTION_JOB_MAX_ATTEMPTS,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._queue: queue.Queue[str] = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"transcription-job-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, job_id: str) -> None:
+        """Enqueue a job id, starting the worker threads on first use."""
+        self._ensure_started()
+        self._queue.put(job_id)
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "queued": self._queue.qsize()}
+
+    def resume(self) -> int:
+        """Requeue jobs left running by a previous process and enqueue all queued jobs. A job
+        that was running at ``max_attempts`` restarts presumably takes the process down with
+        it and is marked failed instead."""
+        db = SessionLocal()
+        try:
+            stuck = (TranscriptionJob.status == JOB_RUNNING) & (
+                TranscriptionJob.attempts >= self.max_attempts
+            )
+            abandoned = [path for (path,) in db.query(TranscriptionJob.audio_path).filter(stuck)]
+            db.execute(
+                update(TranscriptionJob)
+                .where(stuck)
+                .values(
+                    status=JOB_FAILED,
+                    error=f"Gave up after {self.max_attempts} attempts",
+                    finished_at=datetime.utcnow(),
+                )
+            )
+            db.execute(
+                update(TranscriptionJob)
+                .where(TranscriptionJob.status == JOB_RUNNING)
+                .values(status=JOB_QUEUED)
+            )
+            db.commit()
+            job_ids = [
+                job_id
+                for (job_id,) in db.query(TranscriptionJob.id)
+                .filter(TranscriptionJob.status == JOB_QUEUED)
+                .order_by(TranscriptionJob.created_at)
+            ]
+        finally:
+            db.close()
+        for path in abandoned:
+            Path(path).unlink(missing_ok=True)
+        if abandoned:
+            logger.warning("Gave up on %d transcription job(s)", len(abandoned))
+        for job_id in job_ids:
+            self.submit(job_id)
+        if job_ids:
+            logger.info("Resumed %d transcription job(s)", len(job_ids))
+        return len(job_ids)
+
+    def _run(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._process(job_id)
+            except Exception:
+                logger.exception("Transcription job %s crashed", job_id)
+            finally:
+                self._queue.task_done()
+
+    def _claim(self, job_id: str) -> TranscriptionJob | None:
+        db = SessionLocal()
+        try:
+            claimed = db.execute(
+                update(TranscriptionJob)
+                .where(TranscriptionJob.id == job_id, TranscriptionJob.status == JOB_QUEUED)
+                .values(
+                    status=JOB_RUNNING,
+                    attempts=TranscriptionJob.attempts + 1,
+                    started_at=datetime.utcnow(),
+                )
+            ).rowcount
+            db.commit()
+            if not claimed:
+                return None
+            job = db.get(TranscriptionJob, job_id)
+            db.expunge(job)
+            return job
+        finally:
+            db.close()
+
+    def _finish(self, job_id: str, **values) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(TranscriptionJob)
+                .where(TranscriptionJob.id == job_id)
+                .values(finished_at=datetime.utcnow(), **values)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _process(self, job_id: str) -> None:
+        job = self._claim(job_id)
+        if job is None:
+            return
+        audio_path = Path(job.audio_path)
+        try:
+            with audio_path.open("rb") as f:
+                audio = SpooledAudio(
+                    file=f,
+                    filename=job.filename,
+                    content_type=job.content_type,
+                    size=job.size_bytes,
+                    sha256=job.audio_sha256,
+                )
+                text = asyncio.run(transcribe_audio(get_backend(), audio))
+        except Exception as e:
+            logger.exception("Transcription job %s failed", job_id)
+            self._finish(job_id, status=JOB_FAILED, error=str(e) or type(e).__name__)
+        else:
+            self._finish(job_id, status=JOB_DONE, transcript=text, error=None)
+        audio_path.unlink(missing_ok=True)
+
+
+job_pool = JobWorkerPool()
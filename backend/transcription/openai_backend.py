@@ -0,0 +1,17 @@
+"""OpenAI transcription call (blocking; run it through the transcription executor)."""
+
+from transcription.ingest import SpooledAudio
+from transcription.openai_client import openai_clients
+
+TRANSCRIBE_MODEL = "gpt-4o-mini-transcribe"
+
+
+def transcribe(audio: SpooledAudio) -> str:
+    """Send the spooled audio to OpenAI and return the transcript text."""
+    transcript = openai_clients.call(
+        # as_upload_tuple() rewinds the file, so each retry re-sends the whole upload
+        lambda client: client.audio.transcriptions.create(
+            model=TRANSCRIBE_MODEL, file=audio.as_upload_tuple()
+        )
+    )
+    return transcript.text
@@ -0,0 +1,174 @@
+"""Process-wide pooled OpenAI client with jittered exponential retry and usage counters."""
+
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from typing import TypeVar
+
+import httpx
+import openai
+from openai import OpenAI
+
+from config import (
+    OPENAI_API_KEY,
+    OPENAI_CONNECT_TIMEOUT_SECONDS,
+    OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    OPENAI_MAX_RETRIES,
+    OPENAI_RETRY_BASE_DELAY_SECONDS,
+    OPENAI_RETRY_MAX_DELAY_SECONDS,
+    OPENAI_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _is_retryable(e: Exception) -> bool:
+    if isinstance(e, openai.APIConnectionError):  # includes timeouts
+        return True
+    if isinstance(e, openai.APIStatusError):
+        return e.status_code == 429 or e.status_code >= 500
+    return False
+
+
+def _retry_after_seconds(e: Exception) -> float | None:
+    response = getattr(e, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+class OpenAIClientManager:
+    """Builds one OpenAI client (and so one keep-alive HTTP connection pool) on first use and
+    shares it across threads. The SDK's own retries are disabled in favour of ``call``."""
+
+    def __init__(
+        self,
+        api_key: str | None = OPENAI_API_KEY,
+        max_connections: int = OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections: int = OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+        connect_timeout: float = OPENAI_CONNECT_TIMEOUT_SECONDS,
+        timeout: float = OPENAI_TIMEOUT_SECONDS,
+        max_retries: int = OPENAI_MAX_RETRIES,
+        retry_base_delay: float = OPENAI_RETRY_BASE_DELAY_SECONDS,
+        retry_max_delay: float = OPENAI_RETRY_MAX_DELAY_SECONDS,
+        transport: httpx.BaseTransport | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.api_key = api_key
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._transport = transport
+        self._sleep = sleep
+        self._client: OpenAI | None = None
+        self._lock = threading.Lock()
+        self._counters = {
+            "clients_created": 0,
+            "http_requests": 0,
+            "connections_opened": 0,
+            "calls": 0,
+            "retries": 0,
+            "failures": 0,
+        }
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def _trace(self, event: str, info: dict) -> None:
+        if event == "connection.connect_tcp.complete":
+            self._count("connections_opened")
+
+    def _on_request(self, request: httpx.Request) -> None:
+        self._count("http_requests")
+        request.extensions["trace"] = self._trace
+
+    def get(self) -> OpenAI:
+        """Return the shared client, creating it (and its connection pool) on first use."""
+        if self._client is not None:
+            return self._client
+        with self._lock:
+            if self._client is None:
+                if not self.api_key:
+                    raise ValueError("OPENAI_API_KEY is not set; required for transcription")
+                http_client = httpx.Client(
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    transport=self._transport,
+                    event_hooks={"request": [self._on_request]},
+                )
+                self._client = OpenAI(
+                    api_key=self.api_key,
+                    http_client=http_client,
+                    timeout=self.timeout,
+                    max_retries=0,
+                )
+                self._counters["clients_created"] += 1
+            return self._client
+
+    def backoff_delay(self, attempt: int, error: Exception | None = None) -> float:
+        """Full-jitter exponential backoff; a Retry-After header, if present, is a floor."""
+        cap = min(self.retry_max_delay, self.retry_base_delay * (2**attempt))
+        delay = random.uniform(0, cap)
+        retry_after = _retry_after_seconds(error) if error else None
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.retry_max_delay))
+        return delay
+
+    def call(self, fn: Callable[[OpenAI], T]) -> T:
+        """Run ``fn(client)``, retrying 429/5xx/connection errors up to ``max_retries`` times.
+        ``fn`` must be safe to repeat (e.g. rewind any file it uploads)."""
+        client = self.get()
+        self._count("calls")
+        attempt = 0
+        while True:
+            try:
+                return fn(client)
+            except Exception as e:
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    self._count("failures")
+                    raise
+                delay = self.backoff_delay(attempt, e)
+                logger.warning(
+                    "OpenAI call failed (%s); retry %d/%d in %.2fs",
+                    type(e).__name__,
+                    attempt + 1,
+                    self.max_retries,
+                    delay,
+                )
+                self._count("retries")
+                self._sleep(delay)
+                attempt += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        counters["connections_reused"] = max(
+            0, counters["http_requests"] - counters["connections_opened"]
+        )
+        return counters
+
+
+openai_clients = OpenAIClientManager()
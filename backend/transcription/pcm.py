@@ -0,0 +1,131 @@
+"""PCM/WAV helpers shared by the transcription pipeline stages (NumPy-based)."""
+
+import hashlib
+import wave
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+from typing import IO
+
+import numpy as np
+
+from config import TRANSCRIBE_SPOOL_MAX_MEMORY
+from transcription.ingest import SpooledAudio
+
+WAV_CONTENT_TYPES = {"audio/wav", "audio/x-wav", "audio/wave", "audio/vnd.wave"}
+
+
+@dataclass
+class WavInfo:
+    channels: int
+    sample_width: int
+    frame_rate: int
+    n_frames: int
+
+    @property
+    def duration(self) -> float:
+        return self.n_frames / self.frame_rate if self.frame_rate else 0.0
+
+
+def read_wav_info(f: IO[bytes]) -> WavInfo | None:
+    """Return the header of a PCM WAV file, or None if ``f`` is not one. Rewinds ``f``."""
+    f.seek(0)
+    try:
+        with wave.open(f, "rb") as w:
+            info = WavInfo(
+                channels=w.getnchannels(),
+                sample_width=w.getsampwidth(),
+                frame_rate=w.getframerate(),
+                n_frames=w.getnframes(),
+            )
+    except (wave.Error, EOFError):
+        return None
+    finally:
+        f.seek(0)
+    if info.sample_width not in (1, 2, 3, 4) or info.channels < 1 or info.frame_rate < 1:
+        return None
+    return info
+
+
+def pcm_to_float(raw: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """Decode interleaved PCM bytes into a float32 array of shape (frames, channels) in [-1, 1]."""
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        samples = ints.astype(np.float32) / 8388608.0
+    else:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    return samples.reshape(-1, channels)
+
+
+def float_to_pcm16(samples: np.ndarray) -> bytes:
+    """Encode a mono float array in [-1, 1] as little-endian 16-bit PCM."""
+    return (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+
+
+def window_rms_db(
+    f: IO[bytes], info: WavInfo, window_seconds: float, block_windows: int = 2048
+) -> np.ndarray:
+    """RMS level in dBFS of consecutive ``window_seconds`` windows, read block by block."""
+    window_frames = max(1, int(info.frame_rate * window_seconds))
+    levels: list[np.ndarray] = []
+    f.seek(0)
+    with wave.open(f, "rb") as w:
+        while True:
+            raw = w.readframes(window_frames * block_windows)
+            if not raw:
+                break
+            mono = pcm_to_float(raw, info.sample_width, info.channels).mean(axis=1)
+            n = len(mono) // window_frames
+            if n == 0:
+                break
+            windows = mono[: n * window_frames].reshape(n, window_frames)
+            rms = np.sqrt(np.mean(np.square(windows, dtype=np.float64), axis=1))
+            levels.append(20.0 * np.log10(np.maximum(rms, 1e-10)))
+    f.seek(0)
+    return np.concatenate(levels) if levels else np.zeros(0)
+
+
+def write_wav_segment(
+    src: IO[bytes],
+    info: WavInfo,
+    start_frame: int,
+    end_frame: int,
+    filename: str,
+    block_frames: int = 1 << 16,
+) -> SpooledAudio:
+    """Copy frames [start_frame, end_frame) of ``src`` into a new spooled WAV file."""
+    out = SpooledTemporaryFile(max_size=TRANSCRIBE_SPOOL_MAX_MEMORY)
+    src.seek(0)
+    with wave.open(src, "rb") as r, wave.open(out, "wb") as w:
+        w.setnchannels(info.channels)
+        w.setsampwidth(info.sample_width)
+        w.setframerate(info.frame_rate)
+        r.setpos(start_frame)
+        remaining = end_frame - start_frame
+        while remaining > 0:
+            raw = r.readframes(min(block_frames, remaining))
+            if not raw:
+                break
+            w.writeframes(raw)
+            remaining -= len(raw) // (info.channels * info.sample_width)
+    src.seek(0)
+    return spooled_audio_from(out, filename, "audio/wav")
+
+
+def spooled_audio_from(f: IO[bytes], filename: str, content_type: str | None) -> SpooledAudio:
+    """Wrap an already-written file as SpooledAudio, computing its size and digest."""
+    digest = hashlib.sha256()
+    size = 0
+    f.seek(0)
+    while chunk := f.read(1 << 20):
+        digest.update(chunk)
+        size += len(chunk)
+    f.seek(0)
+    return SpooledAudio(
+        file=f, filename=filename, content_type=content_type, size=size, sha256=digest.hexdigest()
+    )
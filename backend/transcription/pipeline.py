@@ -0,0 +1,52 @@
+"""The transcription path shared by /transcribe, /transcribe/stream and background jobs:
+transcript cache, then WAV preprocessing, then chunked transcription."""
+
+import asyncio
+
+from config import TRANSCRIBE_PREPROCESS
+from transcription.backends import TranscriptionBackend
+from transcription.cache import transcript_cache
+from transcription.chunking import transcribe_chunked
+from transcription.ingest import SpooledAudio
+from transcription.preprocess import preprocess_audio
+
+
+async def cached_transcript(backend: TranscriptionBackend, audio: SpooledAudio) -> str | None:
+    """Identical audio already transcribed by the same model is served from the cache."""
+    if not backend.cacheable:
+        return None
+    text = transcript_cache.get_memory(audio.sha256, backend.model)
+    if text is None:
+        text = await asyncio.to_thread(transcript_cache.get_persistent, audio.sha256, backend.model)
+    return text
+
+
+async def store_transcript(backend: TranscriptionBackend, audio: SpooledAudio, text: str) -> None:
+    if backend.cacheable:
+        await asyncio.to_thread(transcript_cache.put, audio.sha256, backend.model, text, audio.size)
+
+
+async def preprocessed(audio: SpooledAudio, preprocess: bool | None) -> tuple[SpooledAudio, float]:
+    """Shrink WAV uploads before sending them upstream; returns (audio, leading trim seconds)."""
+    if not (TRANSCRIBE_PREPROCESS if preprocess is None else preprocess):
+        return audio, 0.0
+    return await asyncio.to_thread(preprocess_audio, audio)
+
+
+async def transcribe_audio(
+    backend: TranscriptionBackend, audio: SpooledAudio, preprocess: bool | None = None
+) -> str:
+    """Transcript of ``audio``, from the cache or from the backend (then cached)."""
+    text = await cached_transcript(backend, audio)
+    if text is not None:
+        return text
+    upstream, _ = await preprocessed(audio, preprocess)
+    try:
+        # Long recordings are split at silence and the segments transcribed concurrently on
+        # the bounded transcription pool (backend calls are blocking)
+        text = await transcribe_chunked(upstream, backend.transcribe)
+    finally:
+        if upstream is not audio:
+            upstream.close()
+    await store_transcript(backend, audio, text)
+    return text
@@ -0,0 +1,180 @@
+"""Shrink PCM WAV uploads before sending them upstream: mono, 16 kHz, silence trimmed.
+
+Works block by block with NumPy so memory stays flat for long recordings. Anything that is
+not PCM WAV passes through unchanged.
+"""
+
+import logging
+import time
+import wave
+from pathlib import PurePath
+from tempfile import SpooledTemporaryFile
+
+import numpy as np
+
+from config import (
+    TRANSCRIBE_SILENCE_THRESHOLD_DB,
+    TRANSCRIBE_SPOOL_MAX_MEMORY,
+    TRANSCRIBE_TARGET_SAMPLE_RATE,
+    TRANSCRIBE_TRIM_PADDING_SECONDS,
+)
+from transcription.ingest import SpooledAudio
+from transcription.pcm import (
+    WavInfo,
+    float_to_pcm16,
+    pcm_to_float,
+    read_wav_info,
+    spooled_audio_from,
+    window_rms_db,
+)
+
+logger = logging.getLogger(__name__)
+
+TRIM_WINDOW_SECONDS = 0.02
+BLOCK_FRAMES = 1 << 16
+
+
+def _speech_bounds(
+    audio: SpooledAudio, info: WavInfo, threshold_db: float, padding: float
+) -> tuple[int, int] | None:
+    """Frame range from the first to the last window above ``threshold_db``, padded."""
+    levels = window_rms_db(audio.file, info, TRIM_WINDOW_SECONDS)
+    loud = np.flatnonzero(levels >= threshold_db)
+    if loud.size == 0:
+        return None
+    window_frames = max(1, int(info.frame_rate * TRIM_WINDOW_SECONDS))
+    pad = int(padding * info.frame_rate)
+    start = max(0, int(loud[0]) * window_frames - pad)
+    end = min(info.n_frames, (int(loud[-1]) + 1) * window_frames + pad)
+    return start, end
+
+
+class _Resampler:
+    """Streaming windowed-sinc resampler (downsampling only).
+
+    Each output sample is a Blackman-windowed sinc low-pass evaluated at its position in the
+    input, with the cutoff just below the output Nyquist, so content above it is attenuated
+    instead of folding back into the speech band. Taps come from a table of ``PHASES``
+    fractional offsets, so the filter is never recomputed per sample.
+    """
+
+    PHASES = 512
+    # Flat up to this fraction of the output Nyquist; the rest is the transition band
+    PASSBAND = 0.8
+    OUTPUT_CHUNK = 4096
+
+    def __init__(self, in_rate: int, out_rate: int):
+        self.step = in_rate / out_rate
+        nyquist = 0.5 / self.step  # in cycles per input sample
+        # A Blackman window's transition band is about 5.5 / taps wide
+        self.half = int(np.ceil(5.5 / (nyquist * (1 - self.PASSBAND)) / 2))
+        cutoff = nyquist * (1 + self.PASSBAND) / 2
+        frac = np.arange(self.PHASES + 1)[:, None] / self.PHASES
+        d = frac + self.half - 1 - np.arange(2 * self.half)[None, :]
+        angle = np.pi * d / self.half
+        window = 0.42 + 0.5 * np.cos(angle) + 0.08 * np.cos(2 * angle)
+        taps = 2 * cutoff * np.sinc(2 * cutoff * d) * np.where(np.abs(d) < self.half, window, 0.0)
+        self.table = (taps / taps.sum(axis=1, keepdims=True)).astype(np.float32)
+        # Input not yet behind every remaining output; starts with the zeros before sample 0
+        self.buffer = np.zeros(self.half - 1, dtype=np.float32)
+        self.buffer_start = -(self.half - 1)
+        self.consumed = 0  # input samples seen so far
+        self.next_out = 0  # index of the next output sample
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        self.buffer = np.concatenate((self.buffer, block.astype(np.float32, copy=False)))
+        self.consumed += len(block)
+        # Outputs whose every tap has arrived
+        ready = self.consumed - 1 - self.half
+        return self._emit(int(np.floor(ready / self.step)) + 1 if ready >= 0 else 0)
+
+    def flush(self) -> np.ndarray:
+        """The outputs still waiting on input past the end, which is taken to be silence."""
+        self.buffer = np.concatenate((self.buffer, np.zeros(self.half, dtype=np.float32)))
+        if self.consumed == 0:
+            return np.zeros(0, dtype=np.float32)
+        return self._emit(int(np.floor((self.consumed - 1) / self.step)) + 1)
+
+    def _emit(self, end_out: int) -> np.ndarray:
+        out = [np.zeros(0, dtype=np.float32)]
+        offsets = np.arange(2 * self.half)
+        for first in range(self.next_out, end_out, self.OUTPUT_CHUNK):
+            t = np.arange(first, min(first + self.OUTPUT_CHUNK, end_out)) * self.step
+            base = np.floor(t).astype(np.int64)
+            phase = np.rint((t - base) * self.PHASES).astype(np.int64)
+            rows = base - self.half + 1 - self.buffer_start
+            samples = self.buffer[rows[:, None] + offsets]
+            out.append(np.einsum("ij,ij->i", samples, self.table[phase]))
+        self.next_out = max(self.next_out, end_out)
+        # Drop input that no later output reaches back to
+        needed = int(np.floor(self.next_out * self.step)) - self.half + 1
+        if needed > self.buffer_start:
+            self.buffer = self.buffer[needed - self.buffer_start :]
+            self.buffer_start = needed
+        return np.concatenate(out).astype(np.float32)
+
+
+def preprocess_audio(
+    audio: SpooledAudio,
+    target_rate: int = TRANSCRIBE_TARGET_SAMPLE_RATE,
+    threshold_db: float = TRANSCRIBE_SILENCE_THRESHOLD_DB,
+    padding: float = TRANSCRIBE_TRIM_PADDING_SECONDS,
+) -> tuple[SpooledAudio, float]:
+    """Return (processed audio, seconds trimmed from the start).
+
+    The original ``audio`` is returned unchanged when it is not PCM WAV, is entirely silent,
+    or is already mono 16-bit at or below ``target_rate`` with nothing to trim.
+    """
+    started = time.perf_counter()
+    info = read_wav_info(audio.file)
+    if info is None:
+        return audio, 0.0
+    bounds = _speech_bounds(audio, info, threshold_db, padding)
+    if bounds is None:
+        return audio, 0.0
+    start_frame, end_frame = bounds
+    out_rate = min(info.frame_rate, target_rate)
+    if (
+        info.channels == 1
+        and info.sample_width == 2
+        and out_rate == info.frame_rate
+        and (start_frame, end_frame) == (0, info.n_frames)
+    ):
+        return audio, 0.0
+
+    resampler = _Resampler(info.frame_rate, out_rate) if out_rate != info.frame_rate else None
+    out = SpooledTemporaryFile(max_size=TRANSCRIBE_SPOOL_MAX_MEMORY)
+    audio.file.seek(0)
+    with wave.open(audio.file, "rb") as r, wave.open(out, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(out_rate)
+        r.setpos(start_frame)
+        remaining = end_frame - start_frame
+        while remaining > 0:
+            raw = r.readframes(min(BLOCK_FRAMES, remaining))
+            if not raw:
+                break
+            mono = pcm_to_float(raw, info.sample_width, info.channels).mean(axis=1)
+            remaining -= len(mono)
+            if resampler is not None:
+                mono = resampler.process(mono)
+            w.writeframes(float_to_pcm16(mono))
+        if resampler is not None:
+            w.writeframes(float_to_pcm16(resampler.flush()))
+    audio.file.seek(0)
+
+    stem = PurePath(audio.filename).stem or "audio"
+    processed = spooled_audio_from(out, f"{stem}.wav", "audio/wav")
+    logger.info(
+        "Preprocessed %s: %d -> %d bytes (saved %d, %d Hz x%d -> %d Hz mono) in %.1f ms",
+        audio.filename,
+        audio.size,
+        processed.size,
+        audio.size - processed.size,
+        info.frame_rate,
+        info.channels,
+        out_rate,
+        (time.perf_counter() - started) * 1000,
+    )
+    return processed, start_frame / info.frame_rate
@@ -0,0 +1,485 @@
+"""Opt-in in-memory authority for venue participant state.
+
+With VENUE_ENGINE_ENABLED, the first roll in a venue loads its participants into memory and
+later rolls are applied there without a database round trip. A background thread writes the
+changed participants back every ``flush_interval`` seconds with one executemany. Every roll
+is also appended to a journal of resulting participant states; a periodic flush rotates the
+journal and deletes the rotated file once its states are committed, and ``start()`` replays
+whatever a crashed process left behind.
+
+Code that reads participants from the database calls ``flush(venue_id)`` first, and code that
+rewrites them calls ``evict(venue_id)`` afterwards, so the database stays the source of truth
+for everything but rolls still inside the flush window.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, func, select, update
+
+from config import (
+    VENUE_ENGINE_ENABLED,
+    VENUE_ENGINE_FLUSH_INTERVAL_SECONDS,
+    VENUE_ENGINE_JOURNAL_PATH,
+)
+from database import SessionLocal
+from models.user import User
+from models.venue import Venue, VenueParticipant, VenueRound
+from racing_engine import roll as engine_roll
+
+logger = logging.getLogger(__name__)
+
+
+def apply_roll(participant, mode: str, dice: int, now: datetime) -> dict:
+    """Apply one roll to ``participant`` (a ``VenueParticipant`` row or a
+    ``ParticipantSnapshot``) and return the racing engine's result."""
+    result = engine_roll(
+        position=participant.position,
+        condition=participant.condition,
+        mode=mode,
+        dice=dice,
+    )
+    participant.roll_count += 1
+    participant.position = result["newPosition"]
+    participant.condition = result["newCondition"]
+    participant.mode = mode
+    participant.won = result["won"]
+    participant.game_over = result["gameOver"]
+    if (result["won"] or result["gameOver"]) and participant.finished_at is None:
+        participant.finished_at = now
+    return result
+
+
+@dataclass
+class ParticipantSnapshot:
+    id: int
+    user_id: int
+    username: str
+    position: int
+    condition: int
+    mode: str
+    won: bool
+    game_over: bool
+    roll_count: int
+    finished_at: datetime | None
+
+
+@dataclass(eq=False)
+class _VenueState:
+    venue_id: int
+    current_round: int
+    participants: dict[int, ParticipantSnapshot]  # by user id
+    finished: int = 0
+    dirty: set[int] = field(default_factory=set)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    # Set once the state has been written back and dropped; rolls holding it must reload
+    evicted: bool = False
+
+    def round_complete(self) -> bool:
+        return bool(self.participants) and self.finished == len(self.participants)
+
+    def take_dirty(self) -> list[dict]:
+        rows = [_row(self.venue_id, self.participants[user_id]) for user_id in self.dirty]
+        self.dirty.clear()
+        return rows
+
+
+def _row(venue_id: int, p: ParticipantSnapshot) -> dict:
+    """Bind parameters for ``_UPDATE`` (and a journal entry)."""
+    return {
+        "pid": p.id,
+        "venue_id": venue_id,
+        "user_id": p.user_id,
+        "position": p.position,
+        "condition": p.condition,
+        "mode": p.mode,
+        "won": p.won,
+        "game_over": p.game_over,
+        "roll_count": p.roll_count,
+        "finished_at": p.finished_at,
+    }
+
+
+_participants = VenueParticipant.__table__
+_UPDATE = (
+    update(_participants)
+    .where(_participants.c.id == bindparam("pid"))
+    .values(version=_participants.c.version + 1)
+)
+
+
+class VenueEngine:
+    def __init__(
+        self,
+        enabled: bool = VENUE_ENGINE_ENABLED,
+        flush_interval: float = VENUE_ENGINE_FLUSH_INTERVAL_SECONDS,
+        journal_path: str | None = VENUE_ENGINE_JOURNAL_PATH,
+    ):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.journal_path = journal_path or None
+        self._venues: dict[int, _VenueState] = {}
+        self._lock = threading.Lock()
+        # Bumped by evict() and clear(); a load that overlapped one may have read stale rows
+        self._generation = 0
+        # Serializes write-backs, so a slow flush never interleaves with an eviction
+        self._flush_lock = threading.Lock()
+        self._journal_lock = threading.Lock()
+        self._journal = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.loads = 0
+        self.rolls = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.replayed_rows = 0
+
+    @property
+    def _rotated_path(self) -> str | None:
+        return f"{self.journal_path}.1" if self.journal_path else None
+
+    def _load(self, venue_id: int) -> _VenueState:
+        db = SessionLocal()
+        try:
+            venue = db.get(Venue, venue_id)
+            if venue is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Venue not found")
+            rows = db.execute(
+                select(VenueParticipant, User.username)
+                .join(User, VenueParticipant.user_id == User.id)
+                .where(VenueParticipant.venue_id == venue_id)
+            ).all()
+            participants = {
+                p.user_id: ParticipantSnapshot(
+                    id=p.id,
+                    user_id=p.user_id,
+                    username=username,
+                    position=p.position,
+                    condition=p.condition,
+                    mode=p.mode,
+                    won=p.won,
+                    game_over=p.game_over,
+                    roll_count=p.roll_count,
+                    finished_at=p.finished_at,
+                )
+                for p, username in rows
+            }
+            finished = sum(p.finished_at is not None for p in participants.values())
+            return _VenueState(venue_id, venue.current_round, participants, finished)
+        finally:
+            db.close()
+
+    def _state(self, venue_id: int) -> _VenueState:
+        while True:
+            with self._lock:
+                state = self._venues.get(venue_id)
+                if state is not None:
+                    return state
+                generation = self._generation
+            # Load outside the engine-wide lock so a cold venue does not stall rolls in the
+            # others; concurrent loaders of the same venue converge on the first one stored
+            loaded = self._load(venue_id)
+            with self._lock:
+                if self._generation != generation:
+                    continue
+                state = self._venues.setdefault(venue_id, loaded)
+                if state is loaded:
+                    self.loads += 1
+                return state
+
+    def roll(
+        self, venue_id: int, user_id: int, mode: str, dice: int
+    ) -> tuple[dict, ParticipantSnapshot, bool]:
+        """Apply a roll in memory. Returns the racing engine's result, a copy of the
+        participant's new state and whether every participant has now finished."""
+        rolls, snapshot, complete = self.roll_many(venue_id, user_id, lambda _p: mode, [dice])
+        return rolls[0][2], snapshot, complete
+
+    def roll_many(
+        self,
+        venue_id: int,
+        user_id: int,
+        choose_mode: Callable[[ParticipantSnapshot], str],
+        dice: Iterable[int],
+    ) -> tuple[list[tuple[str, int, dict]], ParticipantSnapshot, bool]:
+        """Apply rolls in memory under one lock until ``dice`` runs out or the participant
+        finishes, picking each roll's mode from the participant's state. Returns (mode, dice,
+        result) per roll, a copy of the participant's new state and whether every
+        participant has now finished."""
+        while True:
+            state = self._state(venue_id)
+            with state.lock:
+                if state.evicted:
+                    continue
+                participant = state.participants.get(user_id)
+                if participant is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_403_FORBIDDEN,
+                        detail="Not in this venue; enter first",
+                    )
+                if participant.won or participant.game_over:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Already won" if participant.won else "Game over",
+                    )
+                rolls = []
+                now = datetime.now(UTC)
+                for value in dice:
+                    mode = choose_mode(participant)
+                    rolls.append((mode, value, apply_roll(participant, mode, value, now)))
+                    self._journal_append(state.current_round, _row(venue_id, participant))
+                    if participant.finished_at is not None:
+                        state.finished += 1
+                        break
+                state.dirty.add(user_id)
+                snapshot = replace(participant)
+                complete = state.round_complete()
+            with self._lock:
+                self.rolls += len(rolls)
+            return rolls, snapshot, complete
+
+    def _journal_append(self, round_number: int, row: dict) -> None:
+        if self.journal_path is None:
+            return
+        line = json.dumps({"round": round_number, **row}, default=datetime.isoformat)
+        with self._journal_lock:
+            if self._journal is None:
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+            self._journal.write(line + "\n")
+            # Hand it to the OS now: a crashed process must not take the roll with it
+            self._journal.flush()
+
+    def _rotate_journal(self) -> str | None:
+        """Move the journal aside; the rotated file may be deleted once everything dirty at
+        this point has been written."""
+        if self.journal_path is None:
+            return None
+        with self._journal_lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if not os.path.exists(self.journal_path):
+                return self._rotated_path if os.path.exists(self._rotated_path) else None
+            if os.path.exists(self._rotated_path):
+                # The previous flush failed; keep its entries along with the new ones
+                with open(self.journal_path, encoding="utf-8") as src:
+                    with open(self._rotated_path, "a", encoding="utf-8") as dst:
+                        dst.write(src.read())
+                os.remove(self.journal_path)
+            else:
+                os.replace(self.journal_path, self._rotated_path)
+            return self._rotated_path
+
+    def _write(self, rows: list[dict]) -> None:
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            db.execute(_UPDATE, [{**r, "updated_at": now} for r in rows])
+            venue_ids = {r["venue_id"] for r in rows}
+            db.execute(
+                update(Venue)
+                .where(Venue.id.in_(venue_ids))
+                .values(state_version=Venue.state_version + 1)
+            )
+            # Rolls applied here never went through the per-roll counter updates; recount the
+            # current rounds so the database path sees them
+            participants = select(func.count(VenueParticipant.id)).where(
+                VenueParticipant.venue_id == VenueRound.venue_id
+            )
+            db.execute(
+                update(VenueRound)
+                .where(
+                    VenueRound.venue_id.in_(venue_ids),
+                    VenueRound.round_number
+                    == select(Venue.current_round)
+                    .where(Venue.id == VenueRound.venue_id)
+                    .scalar_subquery(),
+                )
+                .values(
+                    participant_count=participants.scalar_subquery(),
+                    finished_count=participants.where(
+                        VenueParticipant.finished_at.is_not(None)
+                    ).scalar_subquery(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def flush(self, venue_id: int | None = None) -> int:
+        """Write changed participants (of one venue, or of all) to the database; returns the
+        number of rows written."""
+        with self._lock:
+            if venue_id is None:
+                states = list(self._venues.values())
+            else:
+                states = [self._venues[venue_id]] if venue_id in self._venues else []
+        if not states and (venue_id is not None or self.journal_path is None):
+            return 0
+        with self._flush_lock:
+            rotated = self._rotate_journal() if venue_id is None else None
+            rows: list[dict] = []
+            for state in states:
+                with state.lock:
+                    rows.extend(state.take_dirty())
+            if rows:
+                try:
+                    self._write(rows)
+                except Exception:
+                    self._mark_dirty(rows)
+                    raise
+            if rotated:
+                os.remove(rotated)
+        with self._lock:
+            self.flushes += 1
+            self.flushed_rows += len(rows)
+        return len(rows)
+
+    def _mark_dirty(self, rows: list[dict]) -> None:
+        for r in rows:
+            state = self._venues.get(r["venue_id"])
+            if state is not None:
+                with state.lock:
+                    state.dirty.add(r["user_id"])
+
+    def evict(self, venue_id: int) -> None:
+        """Write back and forget one venue's state so the next roll reloads it; call after
+        changing its participants in the database."""
+        with self._lock:
+            self._generation += 1
+            state = self._venues.get(venue_id)
+        if state is None:
+            return
+        with self._flush_lock, state.lock:
+            rows = state.take_dirty()
+            if rows:
+                try:
+                    self._write(rows)
+                except Exception:
+                    state.dirty.update(r["user_id"] for r in rows)
+                    raise
+            state.evicted = True
+            with self._lock:
+                if self._venues.get(venue_id) is state:
+                    del self._venues[venue_id]
+
+    def replay(self) -> set[int]:
+        """Write participant states journaled by a previous process to the database. Entries
+        for an earlier round or older than the stored row are skipped. Returns the ids of the
+        venues written to, whose rounds may have been completed by the replayed rolls."""
+        if self.journal_path is None:
+            return set()
+        paths = [p for p in (self._rotated_path, self.journal_path) if os.path.exists(p)]
+        if not paths:
+            return set()
+        latest: dict[int, dict] = {}
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line
+                    latest[entry["pid"]] = entry
+        db = SessionLocal()
+        try:
+            rounds = dict(db.execute(select(Venue.id, Venue.current_round)).all())
+            roll_counts = dict(
+                db.execute(
+                    select(VenueParticipant.id, VenueParticipant.roll_count).where(
+                        VenueParticipant.id.in_(list(latest))
+                    )
+                ).all()
+            )
+        finally:
+            db.close()
+        rows = []
+        for entry in latest.values():
+            round_number = entry.pop("round")
+            if rounds.get(entry["venue_id"]) != round_number:
+                continue
+            if entry["pid"] not in roll_counts or entry["roll_count"] <= roll_counts[entry["pid"]]:
+                continue
+            if entry["finished_at"]:
+                entry["finished_at"] = datetime.fromisoformat(entry["finished_at"])
+            rows.append(entry)
+        if rows:
+            self._write(rows)
+            logger.info("Replayed %d journaled venue participant states", len(rows))
+        for path in paths:
+            os.remove(path)
+        with self._lock:
+            self.replayed_rows += len(rows)
+        return {r["venue_id"] for r in rows}
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Venue state flush failed")
+
+    def start(self) -> set[int]:
+        """Replay a leftover journal, then (when enabled) start the write-behind thread.
+        Returns the ids of the venues the replay wrote to."""
+        replayed = self.replay()
+        if not self.enabled:
+            return replayed
+        with self._lock:
+            if self._thread is not None:
+                return replayed
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="venue-engine", daemon=True)
+            self._thread.start()
+        return replayed
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+        if self.enabled:
+            self.flush()
+
+    def clear(self) -> None:
+        """Forget all state and journal entries without writing them (the database was reset)."""
+        with self._flush_lock:
+            with self._lock:
+                states, self._venues = list(self._venues.values()), {}
+                self._generation += 1
+            for state in states:
+                with state.lock:
+                    state.evicted = True
+            with self._journal_lock:
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                for path in (self.journal_path, self._rotated_path):
+                    if path and os.path.exists(path):
+                        os.remove(path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "flush_interval_s": self.flush_interval,
+                "journal": self.journal_path is not None,
+                "venues": len(self._venues),
+                "dirty": sum(len(s.dirty) for s in self._venues.values()),
+                "loads": self.loads,
+                "rolls": self.rolls,
+                "flushes": self.flushes,
+                "flushed_rows": self.flushed_rows,
+                "replayed_rows": self.replayed_rows,
+            }
+
+
+venue_engine = VenueEngine()
@@ -0,0 +1,114 @@
+"""Fan-out of venue state changes to Server-Sent Events subscribers.
+
+Endpoints that change a venue publish once after committing. The event is serialized once
+and handed to every subscriber's queue on that subscriber's event loop, so the cost of a
+change does not grow with the number of watchers beyond a queue append each. A subscriber
+that falls ``queue_size`` events behind is disconnected; on reconnect it gets a fresh
+snapshot.
+
+The hub is per process: with several workers a subscriber only sees changes handled by its
+own worker, so clients keep revalidating GET /venues/{id} with If-None-Match while streaming.
+"""
+
+import asyncio
+import json
+import threading
+from dataclasses import dataclass, field
+
+from config import VENUE_EVENTS_QUEUE_SIZE
+
+
+@dataclass(eq=False)
+class VenueSubscription:
+    venue_id: int
+    loop: asyncio.AbstractEventLoop
+    # Serialized SSE messages; None means the stream should end
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(VENUE_EVENTS_QUEUE_SIZE))
+    overflowed: bool = False
+
+    def offer(self, payload: str | None) -> None:
+        """Runs on the subscriber's loop."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+def format_sse(event: str, data: dict, event_id: int | None = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class VenueEventHub:
+    def __init__(self):
+        self._subscribers: dict[int, set[VenueSubscription]] = {}
+        self._seq: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, venue_id: int) -> VenueSubscription:
+        """Register a subscriber on the running event loop."""
+        sub = VenueSubscription(venue_id=venue_id, loop=asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(venue_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: VenueSubscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.venue_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.venue_id]
+
+    def has_subscribers(self, venue_id: int) -> bool:
+        return bool(self._subscribers.get(venue_id))
+
+    def publish(self, venue_id: int, event: str, data: dict) -> None:
+        """Serialize once and queue for every subscriber of ``venue_id``. Safe to call from
+        any thread."""
+        with self._lock:
+            subs = list(self._subscribers.get(venue_id, ()))
+            if not subs:
+                return
+            seq = self._seq[venue_id] = self._seq.get(venue_id, 0) + 1
+            self.published += 1
+            self.delivered += len(subs)
+        payload = format_sse(event, data, seq)
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, payload)
+            except RuntimeError:
+                # The subscriber's loop has closed
+                self.unsubscribe(sub)
+
+    def close(self, venue_id: int | None = None) -> None:
+        """End the streams of one venue's subscribers, or of all of them."""
+        with self._lock:
+            if venue_id is None:
+                subs = [s for group in self._subscribers.values() for s in group]
+            else:
+                subs = list(self._subscribers.get(venue_id, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, None)
+            except RuntimeError:
+                self.unsubscribe(sub)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "venues": len(self._subscribers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "published": self.published,
+                "delivered": self.delivered,
+            }
+
+
+venue_events = VenueEventHub()